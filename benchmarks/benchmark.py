@@ -0,0 +1,333 @@
+"""
+Benchmark the profiling stages on reproducible synthetic datasets and compare a run with a stored baseline
+
+    python benchmarks/benchmark.py --scales small medium --output results.json --baseline baseline.json
+
+Run from a checkout with the package installed, pip install -e .
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from datadictionary.profiler import _FileObj
+from datadictionary.writers import _profile_writer, WRITERS
+
+# rows of the tall dataset at each scale, the other datasets are sized from it
+SCALES = {'small': 10000, 'medium': 100000, 'large': 1000000}
+# fraction of the scale rows and number of columns of each dataset
+DATASETS = {'wide': (0.05, 400), 'tall': (1, 8), 'high_cardinality': (1, 10), 'pii': (0.25, 10)}
+STAGES = ['read', 'data_types', 'text_distinct_values', 'numeric_value_distribution', 'primary_keys', 'sample',
+    'write']
+# a stage is a regression when it takes this much longer than the baseline, 0.2 is 20% longer
+REGRESSION_THRESHOLD = 0.2
+# stages faster than this in the baseline are too noisy to be compared
+MIN_BASELINE_SECONDS = 0.05
+RESULTS_VERSION = 1
+
+CATEGORIES = np.array(['north', 'south', 'east', 'west', 'central', 'unknown'])
+STREETS = np.array(['Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill', 'Park'])
+STREET_SUFFIXES = np.array(['St', 'Ave', 'Rd', 'Blvd', 'Ln', 'Dr'])
+FIRST_NAMES = np.array(['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+    'Elizabeth', 'Maria', 'Wei', 'Aisha', 'Carlos', 'Yuki'])
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Nguyen', 'Kim', 'Patel', 'Okafor', 'Silva'])
+
+
+def make_dataset(kind, rows, columns=None, seed=0):
+    """
+    Create a synthetic dataset, the same arguments always give the same dataset
+    parameter: kind - text, one of "wide" (many columns of every type), "tall" (few columns), "high_cardinality"
+        (unique identifiers, a two column key and text with a distinct value in most rows) or "pii" (names,
+        email addresses, telephone numbers and street addresses mixed with other columns)
+    parameter: rows - integer >= 0, number of rows
+    parameter: columns - integer > 0 default None, number of columns, the DATASETS default for the kind when None
+    parameter: seed - integer default 0, seed of the random values
+    returns: pandas DataFrame
+    """
+    if kind not in DATASETS:
+        raise Exception(f"'{kind}' is not a valid dataset, options are {list(DATASETS)}.")
+    columns = DATASETS[kind][1] if columns is None else columns
+    rng = np.random.default_rng(seed)
+    generators = {'wide': _wide_columns, 'tall': _tall_columns, 'high_cardinality': _high_cardinality_columns,
+        'pii': _pii_columns}
+    data = {}
+    for i, (name, values) in enumerate(generators[kind](rows, rng)):
+        if i >= columns:
+            break
+        data[name] = values
+    return pd.DataFrame(data)
+
+
+def _with_nulls(values, rng, fraction=0.05):
+    """
+    returns: Series of the values with a fraction of them replaced by NULL
+    """
+    values = pd.Series(values)
+    return values.mask(rng.random(len(values)) < fraction)
+
+
+def _mixed_columns(rows, rng, number):
+    """
+    returns: tuple of a column name and values, cycling through integer, decimal, category, date and text columns
+    """
+    kinds = ['int', 'amount', 'category', 'date', 'comment']
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    kind = kinds[number % len(kinds)]
+    name = f'{kind}_{number}'
+    if kind == 'int':
+        return name, rng.integers(-1000, 100000, rows)
+    if kind == 'amount':
+        return name, _with_nulls(rng.normal(500, 250, rows).round(2), rng)
+    if kind == 'category':
+        return name, _with_nulls(CATEGORIES[rng.integers(0, len(CATEGORIES), rows)], rng)
+    if kind == 'date':
+        return name, pd.Series(dates).dt.strftime('%Y-%m-%d')
+    return name, _with_nulls(pd.Series(rng.integers(0, rows // 10 + 1, rows)).astype(str).radd('comment '), rng, 0.2)
+
+
+def _wide_columns(rows, rng):
+    yield 'row_id', np.arange(rows)
+    number = 0
+    while True:
+        yield _mixed_columns(rows, rng, number)
+        number += 1
+
+
+def _tall_columns(rows, rng):
+    yield 'row_id', np.arange(rows)
+    yield 'customer_code', pd.Series(rng.integers(0, 5000, rows)).astype(str).str.zfill(6).radd('C')
+    yield 'amount', _with_nulls(rng.normal(500, 250, rows).round(2), rng)
+    yield 'quantity', rng.integers(1, 50, rows)
+    yield 'region', CATEGORIES[rng.integers(0, len(CATEGORIES), rows)]
+    yield 'order_date', pd.Series(pd.Timestamp('2015-01-01')
+        + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')).dt.strftime('%Y-%m-%d')
+    yield 'status', np.array(['open', 'closed', 'pending'])[rng.integers(0, 3, rows)]
+    yield 'discount', _with_nulls(rng.integers(0, 30, rows), rng, 0.5)
+    number = 0
+    while True:
+        yield _mixed_columns(rows, rng, number)
+        number += 1
+
+
+def _high_cardinality_columns(rows, rng):
+    yield 'row_id', np.arange(rows)
+    yield 'event_uid', pd.Series(rng.permutation(rows)).map('{:016x}'.format)
+    # order_id and line_number are only unique together
+    yield 'order_id', np.arange(rows) // 10
+    yield 'line_number', np.arange(rows) % 10
+    yield 'session', pd.Series(rng.integers(0, max(rows // 2, 1), rows)).astype(str).radd('s-')
+    yield 'measurement', rng.normal(0, 1, rows)
+    yield 'url_path', pd.Series(rng.integers(0, max(rows // 3, 1), rows)).astype(str).radd('/items/')
+    yield 'timestamp', pd.Series(pd.Timestamp('2020-01-01')
+        + pd.to_timedelta(rng.integers(0, 10 ** 8, rows), unit='s')).dt.strftime('%Y-%m-%d %H:%M:%S')
+    yield 'tag', pd.Series(rng.integers(0, 1000, rows)).astype(str).radd('tag')
+    yield 'score', rng.integers(0, 10 ** 9, rows)
+    number = 0
+    while True:
+        yield _mixed_columns(rows, rng, number)
+        number += 1
+
+
+def _pii_columns(rows, rng):
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), rows)]
+    numbers = pd.Series(rng.integers(0, 10 ** 7, rows)).astype(str)
+    area = pd.Series(rng.integers(200, 1000, rows)).astype(str)
+    yield 'person_key', np.arange(rows)
+    yield 'full_name', pd.Series(first) + ' ' + pd.Series(last)
+    # contact, notes and reference hold PII that is only found from their values
+    yield 'contact', _with_nulls(pd.Series(first).str.lower() + '.' + numbers + '@example.com', rng)
+    yield 'phone_number', '(' + area + ') ' + numbers.str.zfill(7).str[:3] + '-' + numbers.str.zfill(7).str[3:]
+    yield 'notes', _with_nulls(pd.Series(rng.integers(1, 9999, rows)).astype(str) + ' '
+        + STREETS[rng.integers(0, len(STREETS), rows)] + ' ' + STREET_SUFFIXES[rng.integers(0, len(STREET_SUFFIXES),
+        rows)], rng, 0.3)
+    yield 'reference', rng.integers(10 ** 9, 10 ** 10, rows)
+    yield 'segment', CATEGORIES[rng.integers(0, len(CATEGORIES), rows)]
+    yield 'balance', _with_nulls(rng.normal(1000, 400, rows).round(2), rng)
+    yield 'signup_date', pd.Series(pd.Timestamp('2010-01-01')
+        + pd.to_timedelta(rng.integers(0, 5000, rows), unit='D')).dt.strftime('%Y-%m-%d')
+    yield 'comment', _with_nulls(pd.Series(rng.integers(0, 500, rows)).astype(str).radd('note '), rng, 0.6)
+    number = 0
+    while True:
+        yield _mixed_columns(rows, rng, number)
+        number += 1
+
+
+def _measure(stage, memory):
+    """
+    Run a stage, tracing the memory it allocates when memory is True
+    returns: tuple of the stage's return value, the seconds taken and the peak MB allocated, None when not traced
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = stage()
+        seconds = time.perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20 if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return result, seconds, peak_mb
+
+
+def _profile_stages(path_obj, dest_dir, output_format, memory, **kwargs):
+    """
+    Profile a file one stage at a time
+    returns: dict of stage name and tuple of seconds and peak MB
+    """
+    measured = {}
+    fo, seconds, peak_mb = _measure(lambda: _FileObj(path_obj, **kwargs), memory)
+    measured['read'] = (seconds, peak_mb)
+    if not fo.has_data():
+        raise Exception(f'{path_obj.name} was not parsed')
+    sheets = {}
+    for stage, sheet, method in [('data_types', 'Data_Types', fo.get_data_types),
+            ('text_distinct_values', 'Text_Value_Dist', fo.get_text_distinct_values),
+            ('numeric_value_distribution', 'Numeric_Value_Dist', fo.get_numeric_value_distribution),
+            ('primary_keys', 'Potential_Primary_Keys', fo.get_primary_keys),
+            ('sample', 'Sample_Data', fo.create_sample)]:
+        sheets[sheet], seconds, peak_mb = _measure(method, memory)
+        measured[stage] = (seconds, peak_mb)
+
+    def write():
+        with _profile_writer(output_format, dest_dir, path_obj.stem) as writer:
+            for sheet, df in sheets.items():
+                writer.write_sheet(sheet, df)
+    _, seconds, peak_mb = _measure(write, memory)
+    measured['write'] = (seconds, peak_mb)
+    return measured
+
+
+def run_benchmark(scales=('small',), datasets=tuple(DATASETS), output_format='xlsx', repeat=3, memory=True,
+    seed=0, **kwargs):
+    """
+    Time each profiling stage on the synthetic datasets at each scale. The datasets are written to a temporary
+    directory as CSV files so that reading the file is timed too.
+    parameter: scales - list of SCALES names or integer row counts default ('small',)
+    parameter: datasets - list of DATASETS names default all of them
+    parameter: output_format - text default "xlsx", the writer timed by the write stage
+    parameter: repeat - integer > 0 default 3, times each dataset is profiled, the fastest time of a stage is kept
+    parameter: memory - boolean default True, profile each dataset once more with tracemalloc to record the peak
+        memory allocated by each stage, traced separately as tracing slows the stages down
+    parameter: seed - integer default 0, seed of the synthetic datasets
+    kwargs: _FileObj keyword arguments, ex. approximate_distinct=True
+    returns: dict of the environment, settings and a list of results, one for each dataset, scale and stage
+    """
+    if not isinstance(repeat, int) or repeat < 1:
+        raise Exception('repeat must be an integer > 0.')
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        for scale in scales:
+            if scale not in SCALES and not isinstance(scale, int):
+                raise Exception(f"'{scale}' is not a valid scale, options are {list(SCALES)} or a number of rows.")
+            scale_rows = SCALES.get(scale, scale)
+            for kind in datasets:
+                if kind not in DATASETS:
+                    raise Exception(f"'{kind}' is not a valid dataset, options are {list(DATASETS)}.")
+                df = make_dataset(kind, max(int(scale_rows * DATASETS[kind][0]), 1), seed=seed)
+                path_obj = temp_dir / f'{kind}_{scale}.csv'
+                df.to_csv(path_obj, index=False)
+                logging.getLogger().info(f'Benchmarking {path_obj.name}, {df.shape[0]} rows and {df.shape[1]} columns')
+                runs = [_profile_stages(path_obj, temp_dir, output_format, False, **kwargs) for _ in range(repeat)]
+                traced = _profile_stages(path_obj, temp_dir, output_format, True, **kwargs) if memory else None
+                for stage in STAGES:
+                    results.append({'dataset': kind, 'scale': scale, 'rows': df.shape[0], 'columns': df.shape[1],
+                        'stage': stage, 'seconds': min(run[stage][0] for run in runs),
+                        'peak_mb': traced[stage][1] if memory else None})
+    return {'version': RESULTS_VERSION, 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(), 'processor': platform.processor()},
+        'settings': {'output_format': output_format, 'repeat': repeat, 'memory': memory, 'seed': seed,
+            'kwargs': {key: repr(value) for key, value in kwargs.items()}},
+        'results': results}
+
+
+def save_results(results, path):
+    """
+    Write the results of run_benchmark() to a JSON file
+    """
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2)
+
+
+def load_results(path):
+    """
+    returns: the results of run_benchmark() saved to a JSON file
+    """
+    with open(path, encoding='utf-8') as handle:
+        results = json.load(handle)
+    if results.get('version') != RESULTS_VERSION:
+        raise Exception(f'{path} was written by a different version of the benchmark and cannot be compared')
+    return results
+
+
+def compare_results(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare the stages of a run with the same dataset, scale and stage of a baseline run
+    parameter: results - dict from run_benchmark() or load_results()
+    parameter: baseline - dict from run_benchmark() or load_results()
+    parameter: threshold - number default 0.2, a stage taking this fraction longer than the baseline is a regression
+    returns: dataframe of each stage in both runs with the seconds and peak MB of each, the ratio of the seconds
+        and a Regression flag
+    """
+    keys = ['dataset', 'scale', 'rows', 'columns', 'stage']
+    current = pd.DataFrame(results['results'])
+    previous = pd.DataFrame(baseline['results'])
+    if current.empty or previous.empty:
+        return pd.DataFrame(columns=keys + ['Baseline Seconds', 'Seconds', 'Ratio', 'Baseline Peak MB', 'Peak MB',
+            'Regression'])
+    for df in (current, previous):
+        df['scale'] = df['scale'].astype(str)
+    df = previous.merge(current, on=keys, suffixes=('_baseline', ''))
+    df['ratio'] = df['seconds'] / df['seconds_baseline']
+    df['Regression'] = (df['ratio'] > 1 + threshold) & (df['seconds_baseline'] >= MIN_BASELINE_SECONDS)
+    df = df.rename(columns={'seconds_baseline': 'Baseline Seconds', 'seconds': 'Seconds', 'ratio': 'Ratio',
+        'peak_mb_baseline': 'Baseline Peak MB', 'peak_mb': 'Peak MB'})
+    return df[keys + ['Baseline Seconds', 'Seconds', 'Ratio', 'Baseline Peak MB', 'Peak MB', 'Regression']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python benchmarks/benchmark.py',
+        description='Time and memory profile each profiling stage on synthetic datasets')
+    parser.add_argument('--scales', nargs='+', default=['small'],
+        help=f'scales to run, {list(SCALES)} or a number of rows (default small)')
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument('--output-format', default='xlsx', choices=list(WRITERS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run that records peak memory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help='profile with compact=True')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+        help='fraction slower than the baseline that is a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) if scale.isdigit() else scale for scale in args.scales]
+    kwargs = {'compact': True} if args.compact else {}
+    results = run_benchmark(scales, args.datasets, args.output_format, args.repeat, not args.no_memory, args.seed,
+        **kwargs)
+    if args.output:
+        save_results(results, args.output)
+    summary = pd.DataFrame(results['results'])
+    print(summary.to_string(index=False))
+    if args.baseline:
+        comparison = compare_results(results, load_results(args.baseline), args.threshold)
+        print()
+        print(comparison.to_string(index=False))
+        if comparison['Regression'].any():
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1,18 @@
-from .config import ProfileData
+# the public names and the module defining each, imported on first use so that importing the package, as the
+# command line does before parsing its arguments, does not import pandas
+_EXPORTS = {'ProfileData': 'config', 'PIIDetector': 'pii', 'register_pii_detector': 'pii'}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
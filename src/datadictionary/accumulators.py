@@ -0,0 +1,352 @@
+import re
+import numpy as np
+import pandas as pd
+from .patterns import PII_COL_PAT, NUMERIC_DTYPES
+from .datatypes import _column_stats, STAT_COLUMNS
+from .sketches import _HyperLogLog, _HeavyHitters, _TDigest, HEAVY_HITTERS_FACTOR
+from .numeric import _outlier_fences, _histogram, _digest_histogram
+from .pii import _PIIScanner, _pii_detail
+
+
+class _ColumnAccumulator:
+    """
+    Running statistics for a single column that are updated one chunk at a time and can be merged
+    with the statistics of another chunk, file or partition of the same column
+    """
+    def __init__(self, name, distinct_limit=100000, approximate_distinct=False, top_k=100, pii_scanner=None):
+        """
+        parameter: name - the column name
+        parameter: distinct_limit - maximum number of distinct values to count exactly, once exceeded the
+            column is sketched as with approximate_distinct, counting at most distinct_limit values
+        parameter: approximate_distinct - boolean default False, keep fixed size sketches of the distinct values
+            instead of counting them exactly
+        parameter: top_k - integer > 0 default 100, number of most frequent values reported by the sketches
+        parameter: pii_scanner - _PIIScanner default None, searches each chunk for PII, a scanner of the
+            default detectors when None
+        """
+        self.name = name
+        self.distinct_limit = distinct_limit
+        self.rows = 0
+        self.non_null = 0
+        # dtypes of the chunks that held at least one value
+        self.dtypes = set()
+        self.min_value = None
+        self.max_value = None
+        self.min_length = None
+        self.max_length = None
+        self.precision = None
+        self.scale = None
+        self.all_integral = True
+        # count, mean and sum of squared differences for numeric chunks
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # quantile sketch and exact zero and negative counts of the numeric chunks, in fixed memory
+        self.digest = _TDigest()
+        self.zeros = 0
+        self.negatives = 0
+        self.value_counts = None
+        # True once the distinct values outgrew distinct_limit and the column was sketched
+        self.counts_truncated = False
+        self.hll = None
+        self.heavy_hitters = None
+        if approximate_distinct:
+            self.hll = _HyperLogLog()
+            self.heavy_hitters = _HeavyHitters(top_k * HEAVY_HITTERS_FACTOR)
+        # reasons the column is flagged as potential PII, a flagged column is not scanned again
+        self.pii_scanner = pii_scanner or _PIIScanner()
+        self.pii_hits = set()
+        self.pii_scanned = 0
+        self.pii_values = 0
+        if re.search(PII_COL_PAT, name):
+            self.pii_hits.add('column name')
+
+    @property
+    def nulls(self):
+        return self.rows - self.non_null
+
+    def update(self, series, stats=None):
+        """
+        Add a chunk of the column to the running statistics
+        parameter: series - pandas series holding the chunk
+        parameter: stats - dict of statistics for the chunk from _column_stats(), computed when not given
+        """
+        if stats is None:
+            stats = _column_stats(series.to_frame(), moments=True).iloc[0].to_dict()
+        self.rows += stats['rows']
+        self._update_lengths(stats['min_length'], stats['max_length'])
+        if stats['non_null'] == 0:
+            return
+        self.non_null += stats['non_null']
+        col_dtype = stats['dtype']
+        self.dtypes.add(col_dtype)
+
+        if col_dtype in NUMERIC_DTYPES:
+            self._update_range(stats['min_value'], stats['max_value'])
+            self._update_moments(stats['non_null'], stats['mean'], stats['m2'])
+            self._update_precision(stats['precision'], stats['scale'], stats['all_integral'])
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+            self.digest.update(values)
+            self.zeros += np.count_nonzero(values == 0)
+            self.negatives += np.count_nonzero(values < 0)
+
+        self._merge_counts(series.value_counts(sort=False))
+        self._scan_pii(series)
+
+    def _update_range(self, min_value, max_value):
+        if self.min_value is None or min_value < self.min_value:
+            self.min_value = min_value
+        if self.max_value is None or max_value > self.max_value:
+            self.max_value = max_value
+
+    def _update_lengths(self, min_length, max_length):
+        if pd.isna(min_length):
+            return
+        if self.min_length is None or min_length < self.min_length:
+            self.min_length = min_length
+        if self.max_length is None or max_length > self.max_length:
+            self.max_length = max_length
+
+    def _update_precision(self, precision, scale, all_integral):
+        if pd.notna(precision) and (self.precision is None or precision > self.precision):
+            self.precision = precision
+        if pd.notna(scale) and (self.scale is None or scale > self.scale):
+            self.scale = scale
+        self.all_integral = self.all_integral and all_integral
+
+    def _update_moments(self, n, mean, m2):
+        # parallel variance algorithm (Chan et al.) so chunks can be combined in any order
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def _merge_counts(self, counts):
+        if self.hll is not None:
+            self.hll.update(counts.index)
+            self.heavy_hitters.merge_counts(counts)
+            return
+        if self.value_counts is None:
+            self.value_counts = counts
+        else:
+            self.value_counts = pd.concat([self.value_counts, counts]).groupby(level=0, sort=False).sum()
+        if len(self.value_counts) > self.distinct_limit:
+            self._to_sketches(self.distinct_limit)
+            self.counts_truncated = True
+
+    def _to_sketches(self, capacity):
+        """
+        Replace the exact value counts with sketches of every value counted so far, dropping values silently would
+        undercount them, the sketches report the distinct values and the error of the counts they keep
+        parameter: capacity - number of values the heavy hitters summary counts
+        """
+        self.hll = _HyperLogLog()
+        self.heavy_hitters = _HeavyHitters(capacity)
+        if self.value_counts is not None:
+            self.hll.update(self.value_counts.index)
+            self.heavy_hitters.merge_counts(self.value_counts)
+        self.value_counts = None
+
+    def _scan_pii(self, series):
+        if self.pii_hits:
+            return
+        detector, scanned, total = self.pii_scanner.scan(series)
+        self.pii_scanned += scanned
+        self.pii_values += total
+        if detector is not None:
+            self.pii_hits.add(detector)
+
+    def merge(self, other):
+        """
+        Combine the statistics of another accumulator for the same column into this one
+        parameter: other - _ColumnAccumulator
+        """
+        self.rows += other.rows
+        self.non_null += other.non_null
+        self.dtypes |= other.dtypes
+        if other.min_value is not None:
+            self._update_range(other.min_value, other.max_value)
+        if other.min_length is not None:
+            self._update_lengths(other.min_length, other.max_length)
+        self._update_precision(other.precision, other.scale, other.all_integral)
+        self._update_moments(other.n, other.mean, other.m2)
+        self.digest.merge(other.digest)
+        self.zeros += other.zeros
+        self.negatives += other.negatives
+        if other.hll is not None:
+            if self.hll is None:
+                self._to_sketches(other.heavy_hitters.capacity)
+            self.hll.merge(other.hll)
+            self.heavy_hitters.merge(other.heavy_hitters)
+        elif other.value_counts is not None:
+            self._merge_counts(other.value_counts)
+        self.counts_truncated = self.counts_truncated or other.counts_truncated
+        self.pii_hits |= other.pii_hits
+        self.pii_scanned += other.pii_scanned
+        self.pii_values += other.pii_values
+
+    def pii_detail(self):
+        """
+        returns: the PII Detail of the column, see _pii_detail()
+        """
+        if self.pii_hits:
+            return ', '.join(sorted(self.pii_hits))
+        return _pii_detail(None, self.pii_scanned, self.pii_values)
+
+    def final_dtype(self):
+        """
+        returns: string name of the dtype pandas would assign the whole column
+        """
+        dtypes = self.dtypes
+        if not dtypes:
+            # pandas reads a column of only NULL values as float
+            return 'float64'
+        if len(dtypes) == 1:
+            col_dtype = next(iter(dtypes))
+            if col_dtype.startswith('int') and self.nulls > 0:
+                return 'float64'
+            if col_dtype == 'bool' and self.nulls > 0:
+                return 'object'
+            return col_dtype
+        if all(col_dtype in NUMERIC_DTYPES for col_dtype in dtypes):
+            if all(col_dtype.startswith('int') for col_dtype in dtypes) and self.nulls == 0:
+                return 'int64'
+            return 'float64'
+        return 'object'
+
+    def stats(self):
+        """
+        returns: dict of the accumulated statistics in the format of _column_stats() for the dtype
+            pandas would assign the whole column
+        """
+        return {'dtype': self.final_dtype(), 'rows': self.rows, 'non_null': self.non_null,
+            'min_value': self.min_value, 'max_value': self.max_value,
+            'min_length': self.min_length, 'max_length': self.max_length,
+            'precision': self.precision, 'scale': self.scale, 'all_integral': self.all_integral,
+            'mean': self.mean if self.n else np.nan, 'm2': self.m2}
+
+    def std(self):
+        if self.n < 2:
+            return np.nan
+        return (self.m2 / (self.n - 1)) ** 0.5
+
+    def exact_counts(self):
+        """
+        returns: True when every distinct value was counted, not sketched
+        """
+        return self.hll is None and self.value_counts is not None
+
+    def distinct(self):
+        """
+        returns: number of distinct values, estimated when the column was sketched
+        """
+        if self.hll is not None:
+            return round(self.hll.estimate())
+        return 0 if self.value_counts is None else len(self.value_counts)
+
+    def estimated(self):
+        """
+        returns: list of the metrics of the column estimated from the sketches rather than counted
+        """
+        if self.exact_counts() or self.non_null == 0:
+            return []
+        return ['Distinct Values', 'Value Counts'] + (['Quantiles'] if self.n else [])
+
+    def quantile(self, q):
+        """
+        Linear interpolation between the closest ranks, the same method used by pandas. Estimated from the
+        t-digest when the distinct values were truncated or sketched
+        returns: the q quantile of the numeric values, NaN when there are none
+        """
+        if self.n == 0:
+            return np.nan
+        if not self.exact_counts():
+            return self.digest.quantile(q)
+        counts = self.value_counts.sort_index()
+        cumulative = counts.cumsum().to_numpy()
+        values = counts.index.to_numpy(dtype='float64')
+        position = (self.n - 1) * q
+        lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+    def outliers(self):
+        """
+        returns: number of numeric values outside Tukey's fences, estimated from the t-digest when the distinct
+            values were truncated or sketched
+        """
+        if self.n == 0:
+            return 0
+        lower, upper = _outlier_fences(self.quantile(.25), self.quantile(.75))
+        if self.exact_counts():
+            values = self.value_counts.index.to_numpy(dtype='float64')
+            return int(self.value_counts[(values < lower) | (values > upper)].sum())
+        below, above = self.digest.cdf(np.array([lower, upper]))
+        return int(round(self.n * (below + 1 - above)))
+
+    def histogram(self, bins):
+        """
+        returns: tuple of the edges and counts of bins equal width bins of the numeric values, see
+            numeric._histogram(), estimated from the t-digest when the distinct values were truncated or sketched
+        """
+        if not self.exact_counts():
+            return _digest_histogram(self.digest, bins)
+        return _histogram(self.value_counts.index.to_numpy(dtype='float64'), bins, self.value_counts.to_numpy())
+
+    def sorted_counts(self):
+        """
+        returns: pandas series of value counts, most frequent first, the counts of the heavy hitters summary when
+            the column was sketched
+        """
+        if self.heavy_hitters is not None:
+            return self.heavy_hitters.top()
+        if self.value_counts is None:
+            return pd.Series(dtype='int64')
+        return self.value_counts.sort_values(ascending=False, kind='stable')
+
+
+class _ProfileAccumulator:
+    """
+    A _ColumnAccumulator for every column of a file, fed one DataFrame chunk at a time
+    """
+    def __init__(self, columns, distinct_limit=100000, approximate_distinct=False, top_k=100, pii_scanner=None):
+        self.columns = list(columns)
+        self.rows = 0
+        self.column_accumulators = {col: _ColumnAccumulator(col, distinct_limit, approximate_distinct, top_k,
+            pii_scanner) for col in self.columns}
+
+    def update(self, df):
+        """
+        parameter: df - pandas DataFrame chunk with the same columns as the accumulator
+        """
+        self.rows += len(df)
+        stats = _column_stats(df, moments=True).to_dict('index')
+        for col in self.columns:
+            self.column_accumulators[col].update(df[col], stats[col])
+
+    def merge(self, other):
+        """
+        Combine the statistics of another accumulator, columns not yet seen are appended
+        parameter: other - _ProfileAccumulator
+        """
+        self.rows += other.rows
+        for col in other.columns:
+            if col in self.column_accumulators:
+                self.column_accumulators[col].merge(other.column_accumulators[col])
+            else:
+                self.columns.append(col)
+                self.column_accumulators[col] = other.column_accumulators[col]
+
+    def stats(self):
+        """
+        returns: dataframe of the accumulated statistics of every column in the format of _column_stats()
+        """
+        return pd.DataFrame.from_dict({col: self.column_accumulators[col].stats() for col in self.columns},
+            orient='index', columns=STAT_COLUMNS)
+
+    def __getitem__(self, col):
+        return self.column_accumulators[col]
+
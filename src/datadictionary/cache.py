@@ -0,0 +1,204 @@
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+# directory of the user cache the caches of every destination directory are kept in, one file for each
+CACHE_DIR_NAME = 'datadictionary'
+CACHE_FILE_SUFFIX = '.sqlite'
+# bump when the cached profile state changes so entries written by older versions are not reused
+CACHE_VERSION = 5
+HASH_BLOCK_BYTES = 2 ** 20
+
+# read_csv arguments that change which rows are read, a file read with them is always profiled in full
+TAIL_UNSAFE_KWARGS = ['skiprows', 'skipfooter', 'nrows', 'header', 'names', 'index_col', 'usecols']
+
+
+class _ProfileCache:
+    """
+    SQLite store of the files profiled into a destination directory. A file is keyed by its path and the
+    profiling options, and recognised as unchanged by its size and modification time, or its size and a hash
+    of its contents. Streamed text files also keep their accumulated statistics so that rows appended to the
+    file can be profiled on their own and merged in.
+
+    The statistics are pickled, and unpickling runs code, so the cache is trusted as much as the account running
+    the profile. It is kept in the user's cache directory, readable and writable by the user only, rather than in
+    the destination directory, which may be shared.
+    """
+    def __init__(self, dest_dir, content_hash=False):
+        """
+        parameter: dest_dir - directory the profiles are written to, the cache is kept for it in the user cache
+        parameter: content_hash - boolean default False, recognise unchanged files by a hash of their contents
+            instead of their modification time, reads every file in full to hash it
+        """
+        self.dest_dir = dest_dir
+        self.path = _cache_path(dest_dir)
+        self.content_hash = content_hash
+        with closing(self._connect()) as conn, conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != CACHE_VERSION:
+                # entries written by other versions are not reused, the table of a version may have other columns
+                conn.execute('DROP TABLE IF EXISTS profiles')
+                conn.execute(f'PRAGMA user_version = {CACHE_VERSION}')
+            conn.execute('CREATE TABLE IF NOT EXISTS profiles (path TEXT, options TEXT, size INTEGER, '
+                'mtime_ns INTEGER, content_hash TEXT, ends_with_newline INTEGER, profile_file TEXT, state BLOB, '
+                'updated REAL, PRIMARY KEY (path, options))')
+
+    def _connect(self):
+        # worker processes of process_directory share the cache, wait for each other's writes
+        return sqlite3.connect(self.path, timeout=60)
+
+    def lookup(self, path_obj, options):
+        """
+        Compare a file with its cached entry, before the file is read
+        parameter: path_obj - the file to profile
+        parameter: options - dict of the profiling options
+        returns: tuple of 'unchanged', 'appended' or 'changed', the cached entry as a dict (None when there is none)
+            and a dict of the size, modification time and content hash (None when not computed) of the file now,
+            the snapshot store() records so rows written while the file is read are profiled on the next run
+        """
+        stat = path_obj.stat()
+        snapshot = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'content_hash': None}
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM profiles WHERE path = ? AND options = ?',
+                (str(path_obj.resolve()), _options_key(options))).fetchone()
+        entry = None if row is None else dict(row)
+        if entry is not None and not (self.dest_dir / entry['profile_file']).exists():
+            entry = None
+
+        appendable = (entry is not None and stat.st_size > entry['size'] and entry['state'] is not None
+            and entry['ends_with_newline'] and entry['content_hash'] is not None
+            and not any(key in options for key in TAIL_UNSAFE_KWARGS))
+        prefix_hash = None
+        if self.content_hash or appendable:
+            # one read hashes the first size bytes of an appended file, which must not have changed for the tail
+            # to be profiled on its own, and the whole file kept for store()
+            prefix_hash, snapshot['content_hash'] = _file_digest(path_obj, entry['size'] if appendable else None,
+                stat.st_size)
+
+        if entry is None:
+            return 'changed', None, snapshot
+        if stat.st_size == entry['size']:
+            if self.content_hash and entry['content_hash'] is not None:
+                unchanged = snapshot['content_hash'] == entry['content_hash']
+            else:
+                unchanged = stat.st_mtime_ns == entry['mtime_ns']
+            return ('unchanged' if unchanged else 'changed'), entry, snapshot
+        if appendable and prefix_hash == entry['content_hash']:
+            return 'appended', entry, snapshot
+        return 'changed', entry, snapshot
+
+    def load_state(self, entry):
+        """
+        returns: the profile state saved with the entry, see _StreamingFileObj.cache_state()
+        """
+        # only this user can write the cache, see _cache_path()
+        return pickle.loads(entry['state'])
+
+    def store(self, path_obj, options, profile_file, snapshot, state=None):
+        """
+        Save or replace the entry of a file once its profile is written. The file is recorded as it was when
+        lookup() took the snapshot, or up to the offset its rows were read to when it was streamed, so rows written
+        to it while it was profiled are not taken as profiled
+        parameter: path_obj - the file profiled
+        parameter: options - dict of the profiling options
+        parameter: profile_file - path of the profile written
+        parameter: snapshot - dict returned by lookup() before the file was read
+        parameter: state - dict from _StreamingFileObj.cache_state() to profile appended rows with, None when the
+            rows cannot be resumed
+        """
+        size, content_hash = snapshot['size'], snapshot['content_hash']
+        if state is not None and (state['offset'] != size or content_hash is None):
+            # the hash of a streamed file checks that rows were only appended to it, of the bytes read
+            size = state['offset']
+            content_hash = _file_digest(path_obj, size=size)[1]
+        with open(path_obj, 'rb') as handle:
+            handle.seek(max(size - 1, 0))
+            ends_with_newline = handle.read(1) == b'\n'
+        with closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(path_obj.resolve()), _options_key(options), size, snapshot['mtime_ns'], content_hash,
+                ends_with_newline, profile_file.name, None if state is None else pickle.dumps(state), time.time()))
+
+
+def _cache_path(dest_dir):
+    """
+    Create the user cache directory, $XDG_CACHE_HOME/datadictionary or ~/.cache/datadictionary (%LOCALAPPDATA% on
+    Windows), readable by the user only. Raises an Exception when another user owns it or can write to it, as the
+    cached statistics are unpickled
+    returns: path of the cache of dest_dir, named by a hash of its absolute path
+    """
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        root = Path(os.environ['LOCALAPPDATA'])
+    else:
+        root = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    cache_dir = root / CACHE_DIR_NAME
+    cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, 'getuid'):
+        stat = cache_dir.stat()
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+            raise Exception(f'{cache_dir} must be owned by and only writable by the user profiling with cache=True')
+    name = hashlib.sha256(str(Path(dest_dir).resolve()).encode()).hexdigest()[:32]
+    return cache_dir / f'{name}{CACHE_FILE_SUFFIX}'
+
+
+def _options_key(options):
+    """
+    returns: text key of the profiling options, the same options always give the same key, also in another process
+    """
+    return hashlib.sha256(_stable_repr(options).encode()).hexdigest()
+
+
+def _stable_repr(value):
+    """
+    returns: repr of an option value without the memory addresses the repr of functions and plain objects hold,
+        a function is named by its module and qualified name and a hash of its code
+    """
+    if isinstance(value, dict):
+        items = sorted((_stable_repr(key), _stable_repr(item)) for key, item in value.items())
+        return '{' + ', '.join(f'{key}: {item}' for key, item in items) + '}'
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__ + '(' + ', '.join(_stable_repr(item) for item in value) + ')'
+    if isinstance(value, (set, frozenset)):
+        return 'set(' + ', '.join(sorted(_stable_repr(item) for item in value)) + ')'
+    if isinstance(value, functools.partial):
+        return f'partial({_stable_repr(value.func)}, {_stable_repr(value.args)}, {_stable_repr(value.keywords)})'
+    if callable(value) and hasattr(value, '__qualname__'):
+        name = f'{getattr(value, "__module__", None)}.{value.__qualname__}'
+        code = getattr(value, '__code__', None)
+        # lambdas share a qualified name, their code tells them apart
+        return name if code is None else f'{name}:{hashlib.sha256(code.co_code).hexdigest()[:16]}'
+    if type(value).__repr__ is object.__repr__:
+        attributes = getattr(value, '__dict__', {})
+        return f'{type(value).__module__}.{type(value).__qualname__}({_stable_repr(attributes)})'
+    return repr(value)
+
+
+def _file_digest(path_obj, prefix_size=None, size=None):
+    """
+    Hash the contents of a file in one read
+    parameter: prefix_size - integer default None, bytes at the start of the file hashed on their own as well
+    parameter: size - integer default None, bytes of the file hashed, the whole file when None
+    returns: tuple of the hash of the first prefix_size bytes (None when prefix_size is None) and of the first size
+        bytes
+    """
+    digest = hashlib.blake2b()
+    prefix_digest = hashlib.blake2b().hexdigest() if prefix_size == 0 else None
+    position = 0
+    with open(path_obj, 'rb') as handle:
+        while size is None or position < size:
+            block_size = HASH_BLOCK_BYTES if size is None else min(HASH_BLOCK_BYTES, size - position)
+            if prefix_size is not None and position < prefix_size:
+                block_size = min(block_size, prefix_size - position)
+            block = handle.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+            position += len(block)
+            if position == prefix_size:
+                prefix_digest = digest.hexdigest()
+    return prefix_digest, digest.hexdigest()
@@ -0,0 +1,223 @@
+"""
+The datadictionary command. pandas is only imported once the arguments are checked, so --help, --check and
+argument errors return without paying for it
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+from pathlib import Path
+
+# writers.WRITERS and metrics.METRICS_OUTPUTS, listed here as importing those modules imports pandas
+OUTPUT_FORMATS = ['xlsx', 'xlsx_streaming', 'json', 'parquet', 'arrow']
+METRICS_OUTPUTS = ['sheet', 'json']
+
+# type of the profile keyword arguments checked before profiling, others are passed to pandas unchecked
+BOOLEAN_OPTIONS = ['streaming', 'interpret_date_timestamp', 'approximate_distinct', 'compact', 'numeric_detail',
+    'cache', 'cache_content_hash']
+INTEGER_OPTIONS = ['top_k', 'pii_sample', 'profile_sample', 'column_workers', 'histogram_bins', 'sample_data']
+NUMBER_OPTIONS = ['max_memory_mb']
+# options that can be None in a config file
+NONE_OPTIONS = ['pii_sample', 'profile_sample', 'column_workers', 'sample_data', 'sheet_name', 'percentiles']
+CHOICE_OPTIONS = {'output_format': OUTPUT_FORMATS, 'metrics': METRICS_OUTPUTS + [None],
+    'interpret_date_timestamp_errors': ['raise', 'ignore', 'coerce']}
+# arguments of the ProfileData methods that are set with their own flags, not profile keyword arguments
+METHOD_OPTIONS = ['contain', 'not_contain', 'workers', 'pool_memory_mb', 'pipeline_depth', 'poll_seconds',
+    'max_polls']
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{text} is not an integer > 0')
+    return value
+
+
+def _positive_number(text):
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f'{text} is not a number > 0')
+    return value
+
+
+def _option(text):
+    """
+    returns: tuple of the name and value of a --option KEY=VALUE argument, the value read as JSON when it is
+        JSON and as text otherwise
+    """
+    if '=' not in text:
+        raise argparse.ArgumentTypeError(f'{text} is not KEY=VALUE')
+    key, value = text.split('=', 1)
+    try:
+        return key.strip(), json.loads(value)
+    except ValueError:
+        return key.strip(), value
+
+
+def _check_option(key, value):
+    """
+    Check the type of a profile keyword argument read from a config file or --option, raises an Exception
+    """
+    if key in METHOD_OPTIONS:
+        raise Exception(f'{key} cannot be set in a config file or with --option, use its flag')
+    if value is None and key in NONE_OPTIONS:
+        return
+    if key in BOOLEAN_OPTIONS and not isinstance(value, bool):
+        raise Exception(f"'{value}' is not a valid value for {key}, use true or false.")
+    if key in INTEGER_OPTIONS and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+        raise Exception(f'{key} must be an integer > 0.')
+    if key in NUMBER_OPTIONS and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+        raise Exception(f'{key} must be a number > 0.')
+    if key in CHOICE_OPTIONS and value not in CHOICE_OPTIONS[key]:
+        raise Exception(f"'{value}' is not a valid value for {key}, options are {CHOICE_OPTIONS[key]}.")
+    if key == 'percentiles' and (not isinstance(value, list) or not value or not all(
+            isinstance(q, (int, float)) and not isinstance(q, bool) and 0 <= q <= 1 for q in value)):
+        raise Exception('percentiles must be a list of numbers from 0 to 1 or None.')
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='datadictionary', description='Profile data files and create data '
+        'dictionaries. Keyword arguments of ProfileData not set with a flag, and pandas arguments such as sep or '
+        'encoding, are set in a JSON config file or with --option.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    profile = argparse.ArgumentParser(add_help=False)
+    profile.add_argument('--config', type=Path, metavar='FILE', help='JSON file of an object of profile keyword '
+        'arguments, the flags below take precedence')
+    profile.add_argument('--option', type=_option, action='append', default=[], metavar='KEY=VALUE',
+        help='a profile or pandas keyword argument, VALUE is read as JSON or else as text. Repeat for each')
+    profile.add_argument('--output-format', choices=OUTPUT_FORMATS, help='default xlsx')
+    profile.add_argument('--streaming', action='store_true', default=None,
+        help='read text, columnar and xlsx files in chunks')
+    profile.add_argument('--max-memory-mb', type=_positive_number, help='memory budget of a streamed file')
+    profile.add_argument('--cache', action='store_true', default=None,
+        help='skip files unchanged since they were profiled into dest_dir')
+    profile.add_argument('--approximate-distinct', action='store_true', default=None,
+        help='count distinct values with fixed size sketches')
+    profile.add_argument('--profile-sample', type=_positive_int, metavar='ROWS',
+        help='profile this many rows chosen at random')
+    profile.add_argument('--all-sheets', action='store_const', const=None, default=False, dest='sheet_name',
+        help='profile every sheet of Excel workbooks')
+    profile.add_argument('--metrics', choices=METRICS_OUTPUTS, help='record the time and memory of each stage')
+    profile.add_argument('--check', action='store_true', help='check the arguments and print the keyword '
+        'arguments of the profile without profiling')
+    profile.add_argument('-q', '--quiet', action='store_true', help='only log warnings and errors')
+
+    directory = argparse.ArgumentParser(add_help=False)
+    directory.add_argument('source_dir', type=Path, help='directory of the files to profile')
+    directory.add_argument('dest_dir', type=Path, help='directory the profiles are written to')
+    filters = directory.add_mutually_exclusive_group()
+    filters.add_argument('--contain', help='only profile files whose name matches this pattern')
+    filters.add_argument('--not-contain', help='only profile files whose name does not match this pattern')
+    directory.add_argument('--workers', type=_positive_int, help='number of processes profiling files in parallel')
+
+    command = commands.add_parser('file', parents=[profile], help='profile one file',
+        description='Profile one file.')
+    command.add_argument('file_path', type=Path, help='file to profile')
+    command.add_argument('dest_dir', type=Path, help='directory the profile is written to')
+    command.set_defaults(command_parser=command)
+
+    command = commands.add_parser('directory', parents=[directory, profile], help='profile the files of a directory',
+        description='Profile the files of a directory and print a summary of each file.')
+    command.add_argument('--pool-memory-mb', type=_positive_number,
+        help='total memory budget of the files profiled in parallel')
+    command.add_argument('--pipeline-depth', type=_positive_int,
+        help='read and write files in background threads, at most this many files ahead')
+    command.set_defaults(command_parser=command)
+
+    command = commands.add_parser('watch', parents=[directory, profile], help='keep profiling the files that land '
+        'in a directory', description='Keep profiling the files that land in a directory, or change, until '
+        'interrupted. One process, and its workers, stay running so Python and pandas are only started once.')
+    command.add_argument('--poll-seconds', type=_positive_number, default=5,
+        help='seconds between polls of the directory, default 5')
+    command.add_argument('--max-polls', type=_positive_int, help='stop after this many polls')
+    command.set_defaults(command_parser=command)
+    return parser
+
+
+def _profile_kwargs(args):
+    """
+    Combine the config file, --option arguments and flags into the profile keyword arguments, raises an Exception
+    for a value of the wrong type or a missing path
+    returns: dict of keyword arguments
+    """
+    kwargs = {}
+    if args.config is not None:
+        try:
+            with open(args.config, encoding='utf-8') as handle:
+                config = json.load(handle)
+        except (OSError, ValueError) as error:
+            raise Exception(f'{args.config} is not a readable JSON file - {error}')
+        if not isinstance(config, dict):
+            raise Exception(f'{args.config} must hold a JSON object of keyword arguments')
+        kwargs.update(config)
+    kwargs.update(args.option)
+    flags = {'output_format': args.output_format, 'streaming': args.streaming, 'max_memory_mb': args.max_memory_mb,
+        'cache': args.cache, 'approximate_distinct': args.approximate_distinct,
+        'profile_sample': args.profile_sample, 'metrics': args.metrics}
+    kwargs.update({key: value for key, value in flags.items() if value is not None})
+    if args.sheet_name is None:
+        kwargs['sheet_name'] = None
+    for key, value in kwargs.items():
+        _check_option(key, value)
+
+    source = args.file_path if args.command == 'file' else args.source_dir
+    if args.command == 'file' and not source.is_file():
+        raise Exception(f'{source} is not a file')
+    if args.command != 'file' and not source.is_dir():
+        raise Exception(f'{source} is not a directory')
+    if not args.dest_dir.is_dir():
+        raise Exception(f'{args.dest_dir} is not a directory')
+    return kwargs
+
+
+def _stop(signum, frame):
+    # a watch stopped by a service manager finishes the files in progress as it does on Ctrl+C
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    """
+    Run the datadictionary command
+    parameter: argv - list of arguments default None, the arguments of the process when None
+    returns: exit status, 1 when a file of a directory failed
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    try:
+        kwargs = _profile_kwargs(args)
+    except Exception as error:
+        # reported with the usage of the command
+        args.command_parser.error(str(error))
+    if args.check:
+        print(json.dumps(kwargs, indent=2, sort_keys=True))
+        return 0
+
+    from .config import ProfileData
+    profiler = ProfileData()
+    if args.quiet:
+        profiler.log.setLevel(logging.WARNING)
+    try:
+        if args.command == 'file':
+            profiler.process_file(args.file_path, args.dest_dir, **kwargs)
+        elif args.command == 'directory':
+            summary = profiler.process_directory(args.source_dir, args.dest_dir, contain=args.contain,
+                not_contain=args.not_contain, workers=args.workers, pool_memory_mb=args.pool_memory_mb,
+                pipeline_depth=args.pipeline_depth, **kwargs)
+            print(summary.to_string(index=False))
+            return 1 if (summary['Status'] == 'failed').any() else 0
+        else:
+            signal.signal(signal.SIGTERM, _stop)
+            profiler.watch_directory(args.source_dir, args.dest_dir, contain=args.contain,
+                not_contain=args.not_contain, workers=args.workers, poll_seconds=args.poll_seconds,
+                max_polls=args.max_polls, **kwargs)
+    except Exception as error:
+        profiler.log.error(str(error))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
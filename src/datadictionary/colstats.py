@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+class _ColumnStats:
+    """
+    Statistics of the columns of a dataframe shared by the sheets of a profile, each computed the first time a
+    sheet asks for it and at most once for each column. A column is factorized once into an integer code per row
+    and its distinct values, the value counts, distinct count, NULL count and row hashes are derived from the codes.
+    """
+    def __init__(self, df):
+        """
+        parameter: df - pandas DataFrame, the statistics are only valid while its columns are not replaced
+        """
+        self.df = df
+        self._non_null = None
+        self._factorized = {}
+        self._value_counts = {}
+
+    def non_null(self, col=None):
+        """
+        returns: number of non NULL values of col, or a series of them for every column when col is None
+        """
+        if self._non_null is None:
+            self._non_null = self.df.count()
+        return self._non_null if col is None else self._non_null[col]
+
+    def nulls(self, col):
+        """
+        returns: number of NULL values of col
+        """
+        return len(self.df) - self.non_null(col)
+
+    def factorize(self, col):
+        """
+        returns: tuple of an array of the code of each row, -1 for NULL values, and an Index of the distinct values
+            in the order they are first seen
+        """
+        if col not in self._factorized:
+            codes, uniques = pd.factorize(self.df[col])
+            uniques = pd.Index(uniques)
+            if isinstance(uniques, pd.CategoricalIndex):
+                uniques = uniques.astype(uniques.categories.dtype)
+            elif isinstance(uniques.dtype, pd.StringDtype):
+                uniques = uniques.astype('object')
+            if len(uniques) < np.iinfo('int32').max:
+                codes = codes.astype('int32')
+            self._factorized[col] = (codes, uniques)
+        return self._factorized[col]
+
+    def is_factorized(self, col):
+        return col in self._factorized
+
+    def add_factorized(self, factorized):
+        """
+        Keep columns factorized elsewhere, by the worker processes of colworkers._column_map()
+        parameter: factorized - dict of the factorize() result of each column name
+        """
+        self._factorized.update(factorized)
+
+    def distinct(self, col):
+        """
+        returns: Index of the distinct non NULL values of col in the order they are first seen
+        """
+        return self.factorize(col)[1]
+
+    def distinct_count(self, col):
+        return len(self.distinct(col))
+
+    def value_counts(self, col):
+        """
+        returns: series of the count of each distinct non NULL value of col, the same as value_counts() of the
+            column read as text
+        """
+        if col not in self._value_counts:
+            codes, uniques = self.factorize(col)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            counts = pd.Series(counts, index=uniques, name='count')
+            counts.index.name = col
+            # value_counts() ranks the counts of the values in the order they are first seen the same way
+            self._value_counts[col] = counts.sort_values(ascending=False)
+        return self._value_counts[col]
+
+    def hashes(self, col):
+        """
+        returns: array of a 64 bit hash of the value of each row of col, the same for equal values. Hashes are
+            only used once, they are not kept
+        """
+        codes, _ = self.factorize(col)
+        return pd.util.hash_array(codes.astype('int64'))
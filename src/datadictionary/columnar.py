@@ -0,0 +1,128 @@
+import importlib.util
+import numpy as np
+import pandas as pd
+
+COLUMNAR_SUFFIXES = ['.parquet', '.feather', '.arrow']
+
+# read_csv arguments the streamed Arrow CSV reader understands, others are only supported by pandas
+ARROW_CSV_KWARGS = ['engine', 'sep', 'delimiter', 'encoding', 'columns']
+
+
+def _require_pyarrow(path_obj):
+    if importlib.util.find_spec('pyarrow') is None:
+        raise Exception(f'{path_obj.name} cannot be read, Parquet, Feather and engine="pyarrow" require pyarrow, '
+            'install it with: pip install pyarrow')
+
+
+def _read_columnar(path_obj, columns=None, **kwargs):
+    """
+    Read a Parquet or Feather (Arrow IPC) file through a memory map, only the columns listed are read. The
+    dataframe is shared by every sheet of the profile, the columns a sheet does not need are not left out for it
+    parameter: columns - list of column names default None, all columns when None
+    kwargs: keyword arguments for pyarrow.parquet.read_table or pyarrow.feather.read_table
+    returns: pandas DataFrame
+    """
+    _require_pyarrow(path_obj)
+    import pyarrow.feather
+    import pyarrow.parquet
+    if path_obj.suffix == '.parquet':
+        table = pyarrow.parquet.read_table(path_obj, columns=columns, memory_map=True, **kwargs)
+    else:
+        table = pyarrow.feather.read_table(path_obj, columns=columns, memory_map=True, **kwargs)
+    # split_blocks keeps each column in its own block rather than copying columns of a dtype into one 2D block
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _iter_columnar(path_obj, batch_rows, columns=None):
+    """
+    Read a Parquet or Feather (Arrow IPC) file through a memory map one batch of rows at a time
+    parameter: batch_rows - integer > 0, most rows in a batch
+    parameter: columns - list of column names default None, all columns when None
+    returns: generator of pandas DataFrames
+    """
+    _require_pyarrow(path_obj)
+    import pyarrow
+    import pyarrow.parquet
+    if path_obj.suffix == '.parquet':
+        parquet_file = pyarrow.parquet.ParquetFile(pyarrow.memory_map(str(path_obj)))
+        for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas(split_blocks=True)
+        return
+    reader = pyarrow.ipc.open_file(pyarrow.memory_map(str(path_obj)))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns is not None:
+            batch = batch.select(columns)
+        for start in range(0, max(batch.num_rows, 1), batch_rows):
+            yield batch.slice(start, batch_rows).to_pandas(split_blocks=True)
+
+
+def _iter_arrow_csv(path_obj, block_bytes, handle=None, columns=None, sep=',', delimiter=None, encoding=None,
+    engine='pyarrow'):
+    """
+    Read a text file with the multithreaded Arrow CSV reader one block of bytes at a time. Column types are
+    inferred from the first block, a later value that does not fit the type stops the read.
+    parameter: block_bytes - integer > 0, bytes of the file parsed at a time
+    parameter: handle - binary file object of the file default None, read in place of opening path_obj
+    parameter: columns - list of column names default None, all columns when None
+    returns: generator of pandas DataFrames
+    """
+    _require_pyarrow(path_obj)
+    import pyarrow.csv
+    read_options = pyarrow.csv.ReadOptions(block_size=block_bytes, use_threads=True, encoding=encoding or 'utf8')
+    parse_options = pyarrow.csv.ParseOptions(delimiter=delimiter or sep)
+    convert_options = pyarrow.csv.ConvertOptions(include_columns=columns)
+    source = path_obj if handle is None else handle
+    with pyarrow.csv.open_csv(source, read_options=read_options, parse_options=parse_options,
+            convert_options=convert_options) as reader:
+        for batch in reader:
+            yield batch.to_pandas(split_blocks=True)
+
+
+def _columnar_metadata(path_obj, columns=None):
+    """
+    Collect column statistics from the metadata of a Parquet file without decoding any values. The count of
+    non NULL values is kept for columns that are not floating point (NaN may be stored as a value), the
+    minimum and maximum only for integer columns, where they match the values pandas reads. Only the Data_Types
+    sheet uses them, the value counts, numeric distribution and keys decode the values.
+    parameter: columns - list of column names default None, all columns when None
+    returns: dataframe indexed by column name with rows, non_null, min_value and max_value, NaN where the metadata
+        does not have the statistic, None for files without metadata statistics
+    """
+    if path_obj.suffix != '.parquet':
+        return None
+    _require_pyarrow(path_obj)
+    import pyarrow
+    import pyarrow.parquet
+    parquet_file = pyarrow.parquet.ParquetFile(pyarrow.memory_map(str(path_obj)))
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    stats = {}
+    for i in range(metadata.num_columns):
+        name = metadata.schema.column(i).path
+        if '.' in name or name not in schema.names or (columns is not None and name not in columns):
+            # nested columns are flattened in the metadata
+            continue
+        arrow_type = schema.field(name).type
+        nulls = 0
+        min_value = max_value = None
+        for row_group in range(metadata.num_row_groups):
+            column_stats = metadata.row_group(row_group).column(i).statistics
+            if column_stats is None or not column_stats.has_null_count:
+                nulls = None
+                break
+            nulls += column_stats.null_count
+            if metadata.row_group(row_group).num_rows > column_stats.null_count:
+                if not column_stats.has_min_max:
+                    min_value = max_value = np.nan
+                elif min_value is not np.nan:
+                    min_value = column_stats.min if min_value is None else min(min_value, column_stats.min)
+                    max_value = column_stats.max if max_value is None else max(max_value, column_stats.max)
+        non_null = np.nan if nulls is None or pyarrow.types.is_floating(arrow_type) else metadata.num_rows - nulls
+        if not pyarrow.types.is_integer(arrow_type) or nulls is None:
+            min_value = max_value = np.nan
+        stats[name] = {'rows': metadata.num_rows, 'non_null': non_null,
+            'min_value': np.nan if min_value is None else min_value,
+            'max_value': np.nan if max_value is None else max_value}
+    return pd.DataFrame.from_dict(stats, orient='index', columns=['rows', 'non_null', 'min_value', 'max_value'],
+        dtype='object')
@@ -0,0 +1,45 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# columns sent to a worker process at a time
+COLUMNS_PER_TASK = 4
+
+# _FileObj the forked worker processes of _column_map() call, inherited rather than sent to them
+_shared_fileobj = None
+
+
+def _column_map(fileobj, method, cols, workers=None):
+    """
+    Call a method of a _FileObj for each column across worker processes. The processes are forked when the
+    method is about to run, so they read the dataframe and the column statistics computed so far from the memory
+    of this process (pages are only copied where a process writes to them), and only the columns and the results
+    are sent between processes. Where processes cannot be forked, or while other threads run (the reader and
+    writer threads of a pipeline), threads are used, which only run pandas and numpy work that releases the GIL in
+    parallel.
+    parameter: fileobj - _FileObj, read only in the worker processes, changes made there are not seen here
+    parameter: method - name of the method, called with one column and returning a picklable result
+    parameter: cols - list of columns passed to the method, names or positions
+    parameter: workers - integer > 0 default None, number of processes, the method is called in this process when
+        None or 1
+    returns: list of the results in the order of cols
+    """
+    global _shared_fileobj
+    if workers is None or workers == 1 or len(cols) < 2:
+        return [getattr(fileobj, method)(col) for col in cols]
+    workers = min(workers, len(cols))
+    # a process forked while another thread holds a lock (logging, a file being written) inherits the lock held
+    # and deadlocks on it, spawned processes would have to be sent a copy of the dataframe
+    if 'fork' not in multiprocessing.get_all_start_methods() or threading.active_count() > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(getattr(fileobj, method), cols))
+    _shared_fileobj = fileobj
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            return list(executor.map(_call, [method] * len(cols), cols, chunksize=COLUMNS_PER_TASK))
+    finally:
+        _shared_fileobj = None
+
+
+def _call(method, col):
+    return getattr(_shared_fileobj, method)(col)
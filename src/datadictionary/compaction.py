@@ -0,0 +1,82 @@
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# text columns with at most this share of distinct values are held as categoricals, one code per row
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _compact(df):
+    """
+    Hold the columns of a dataframe in less memory. Text columns with few distinct values become categoricals,
+    the other text columns Arrow backed strings when pyarrow is installed, integer columns the smallest integer
+    dtype that holds their values. Decimal columns are kept as they are, float32 would change the precision and
+    scale of the values. Columns of mixed values are kept as they are.
+    parameter: df - pandas DataFrame
+    returns: dataframe with the same values, df itself when no column is compacted
+    """
+    string_dtype = None if importlib.util.find_spec('pyarrow') is None else 'string[pyarrow]'
+    rows = len(df)
+    compacted = {}
+    for i, col_dtype in enumerate(df.dtypes):
+        series = df.iloc[:, i]
+        if col_dtype == 'object':
+            if rows == 0 or pd.api.types.infer_dtype(series, skipna=True) != 'string':
+                continue
+            codes, categories = pd.factorize(series)
+            if len(categories) <= rows * CATEGORY_MAX_RATIO:
+                # categories in the order first seen, the order value_counts() ranks values of the same count
+                compacted[i] = pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index,
+                    name=series.name)
+            elif string_dtype is not None:
+                compacted[i] = series.astype(string_dtype)
+        elif isinstance(col_dtype, np.dtype) and col_dtype.kind == 'i' and col_dtype.itemsize > 1:
+            downcast = pd.to_numeric(series, downcast='integer')
+            if downcast.dtype != col_dtype:
+                compacted[i] = downcast
+    if not compacted:
+        return df
+    df = df.copy(deep=False)
+    for i, series in compacted.items():
+        df.isetitem(i, series)
+    return df
+
+
+def _is_compact_text(dtype):
+    """
+    returns: True for the dtypes _compact() holds text columns in
+    """
+    return isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def _dtype_name(dtype):
+    """
+    returns: name of the dtype the profile reports, compacted text columns are reported as object like the text
+        columns they were read as
+    """
+    return 'object' if _is_compact_text(dtype) else str(dtype)
+
+
+def _used_categories(series):
+    """
+    returns: Series of the categories of a categorical column that are the value of at least one row
+    """
+    codes = series.cat.codes.to_numpy()
+    used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+    return pd.Series(series.cat.categories[used], name=series.name)
+
+
+def _value_counts(series, sort=True):
+    """
+    returns: series.value_counts() without the categories of a categorical column no row has, indexed by the
+        values rather than a CategoricalIndex
+    """
+    counts = series.value_counts(sort=sort)
+    if isinstance(counts.dtype, pd.ArrowDtype):
+        # Arrow backed strings are counted as int64[pyarrow], padded with <NA> rather than NaN on the sheets
+        counts = counts.astype('int64')
+        counts.index = counts.index.astype('object')
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(series.cat.categories.dtype)
+    return counts
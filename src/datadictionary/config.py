@@ -1,8 +1,19 @@
 import pandas as pd
 from pathlib import Path
-import logging
 import re
+import time
 from .profiler import _FileObj
+from .logs import _root_logger
+from .streaming import _StreamingFileObj
+from .sql import _QueryFileObj, _table_query
+from .parallel import _run_pool, _physical_memory_mb, SUMMARY_COLUMNS
+from .pipeline import _run_pipeline
+from .watch import _watch
+from .cache import _ProfileCache
+from .columnar import COLUMNAR_SUFFIXES
+from .excel import _sheet_units, _sheet_stem, _unit_name, EXCEL_STREAM_SUFFIXES
+from .writers import _profile_writer, _check_output_format, PROFILE_SUFFIXES
+from .metrics import _ProfileMetrics, _check_metrics, _stage, METRICS_SUFFIX
 
 
 class ProfileData():
@@ -11,16 +22,12 @@ class ProfileData():
     """
     def __init__(self):
         # Initialize logging
-        self.log = logging.getLogger()
-        self.log.handlers = []
-        self.log.setLevel(logging.INFO)
-        log_fmt = logging.Formatter('%(levelname)s: %(asctime)s %(thread)d %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-        screen = logging.StreamHandler()
-        screen.setFormatter(log_fmt)
-        self.log.addHandler(screen)
+        self.log = _root_logger()
         self.source_filepath = None
         self.source_dir = None
         self.destination_dir = None
+        # date format found for each column name, tried first for columns of the same name in later files
+        self.date_formats = {}
         
 
     def process_file(self, file_path, dest_dir, **kwargs):
@@ -31,25 +38,54 @@ class ProfileData():
         parameter: colname_chars_replace_underscore - string of invalid characters to be replaced with an underscore
         parameter: colname_chars_replace_custom - dict of characters and their replacement value
         parameter: colname_chars_remove - string of characters to be removed
-        parameter: sample_data - None or integer > 0 default is 500; number of records to include in a sample_data sheet in output, 
+        parameter: sample_data - None or integer > 0 default is 500; number of records chosen at random to include in a sample_data sheet in output, 
             disable with sample_data=None
         parameter: interpret_date_timestamp - boolean default False, attempt to convert string fields to date or timestamp 
         parameter: interpret_date_timestamp_errors - text default "raise", options are "raise", "ignore", "coerce".
             "raise" will raise errors on values that cannot be converted, "ignore" will not raise errors and returns the 
             input data, "coerce" will return NaT values when they cannot be converted.
+        parameter: streaming - boolean default False, read text, parquet, feather, arrow and xlsx files in chunks
+            instead of loading the whole file
+        parameter: sheet_name - text, integer, list or None default 0, the sheets of Excel workbooks profiled as in
+            pandas.read_excel, None for every sheet. Each sheet of a list or None is profiled on its own as
+            <file>_<sheet>
+        parameter: max_memory_mb - number > 0 default 256, memory budget for a streamed file
+        parameter: output_format - text default "xlsx", options are "xlsx", "xlsx_streaming" (written row by row in
+            constant memory), "json", "parquet" and "arrow" (a directory with a file for each sheet, require pyarrow)
+        parameter: metrics - text default None, options are "sheet" (a Profile_Metrics sheet in the profile) and "json"
+            (a <name>_profile_metrics.json file next to the profile) with the wall time, CPU time, peak memory and
+            rows and columns of each stage of the profile
+        parameter: metrics_callback - callable default None, called with a dict of each stage's metrics as the stage
+            ends, in the worker process when profiling a directory with workers
+        parameter: cache - boolean default False, keep a cache of the files profiled into dest_dir, unchanged files are
+            skipped and rows appended to a streamed file are profiled on their own and merged into its cached statistics
+        parameter: cache_content_hash - boolean default False, recognise unchanged files by a hash of their contents
+            instead of their modification time
+        parameter: pii_sample - None or integer > 0 default None, most values of each column searched for PII, chosen
+            at random, the confidence is reported in a PII Detail column
+        parameter: pii_detectors - list of PIIDetector default None, detectors searched for in addition to telephone,
+            email and street address
+        parameter: profile_sample - None or integer > 0 default None, profile this many rows chosen at random instead of
+            every row, estimated metrics are marked and null rates and distinct values reported with their intervals
+        parameter: compact - boolean default False, hold the text columns of the file as categoricals or Arrow backed
+            strings and integers in the smallest integer dtype once read, the same profile in less memory
+        parameter: column_workers - None or integer > 0 default None, number of processes the per column work of one
+            file (date detection, PII scan and distinct values) is spread across, the profile is the same
+        parameter: percentiles - list of numbers from 0 to 1 default None, percentiles on the Numeric_Value_Dist sheet,
+            the 25th, 50th and 75th when None
+        parameter: numeric_detail - boolean default False, add zero, negative and outlier counts to the
+            Numeric_Value_Dist sheet and a Numeric_Histogram sheet with histogram_bins equal width bins per column
+        parameter: histogram_bins - integer > 0 default 10, bins of each column on the Numeric_Histogram sheet
         kwargs: pandas keyword arguments to read text files
         """
         self.source_filepath = Path(file_path)
         self.destination_dir = Path(dest_dir)
-        self.log.info(f'Processing {self.source_filepath.name}')
-        fo = _FileObj(self.source_filepath, **kwargs)
-        if fo.df is None:
-            pass
-        else:
-            self._create_profile(fo)
+        for path_obj, sheet in _sheet_units([self.source_filepath], kwargs.get('sheet_name', 0)):
+            self._process_file(path_obj, sheet, **kwargs)
 
     
-    def process_directory(self, source_dir, dest_dir, contain=None, not_contain=None, **kwargs):
+    def process_directory(self, source_dir, dest_dir, contain=None, not_contain=None, workers=None,
+        pool_memory_mb=None, pipeline_depth=None, **kwargs):
         """
         Profile all files in the source directory depending on use of contain and not_contain kwargs
         parameter: source_dir - directory to scan for files to profile
@@ -59,18 +95,139 @@ class ProfileData():
         parameter: colname_chars_replace_underscore - string of invalid characters to be replaced with an underscore
         parameter: colname_chars_replace_custom - dict of characters and their replacement value
         parameter: colname_chars_remove - string of characters to be removed
-        parameter: sample_data - None or integer > 0; number of records to include in a sample_data sheet in output, 
+        parameter: sample_data - None or integer > 0; number of records chosen at random to include in a sample_data sheet in output, 
                     default is 500, disable with sample_data=None
         parameter: interpret_date_timestamp - boolean default False, attempt to convert string fields to date or timestamp 
         parameter: interpret_date_timestamp_errors - text default "raise", options are "raise", "ignore", "coerce".
             "raise" will raise errors on values that cannot be converted, "ignore" will not raise errors and returns the 
             input data, "coerce" will return NaT values when they cannot be converted.
+        parameter: streaming - boolean default False, read text, parquet, feather, arrow and xlsx files in chunks
+            instead of loading the whole file
+        parameter: sheet_name - text, integer, list or None default 0, the sheets of Excel workbooks profiled as in
+            pandas.read_excel, None for every sheet. Each sheet of a list or None is profiled on its own as
+            <file>_<sheet>
+        parameter: max_memory_mb - number > 0 default 256, memory budget for a streamed file
+        parameter: output_format - text default "xlsx", options are "xlsx", "xlsx_streaming" (written row by row in
+            constant memory), "json", "parquet" and "arrow" (a directory with a file for each sheet, require pyarrow)
+        parameter: metrics - text default None, options are "sheet" (a Profile_Metrics sheet in the profile) and "json"
+            (a <name>_profile_metrics.json file next to the profile) with the wall time, CPU time, peak memory and
+            rows and columns of each stage of the profile
+        parameter: metrics_callback - callable default None, called with a dict of each stage's metrics as the stage
+            ends, in the worker process when profiling a directory with workers
+        parameter: cache - boolean default False, keep a cache of the files profiled into dest_dir, unchanged files are
+            skipped and rows appended to a streamed file are profiled on their own and merged into its cached statistics
+        parameter: cache_content_hash - boolean default False, recognise unchanged files by a hash of their contents
+            instead of their modification time
+        parameter: workers - None or integer > 0 default None, number of processes used to profile files in
+            parallel, largest files first
+        parameter: pool_memory_mb - None or number > 0 default None, total memory budget for the files being profiled
+            in parallel, defaults to half of physical memory
+        parameter: pipeline_depth - None or integer > 0 default None, read the next files and write the profiles of the
+            previous files in background threads while a file is profiled, at most this many files are read ahead
+            and this many profiles wait to be written. Used when workers is None or 1
+        parameter: pii_sample - None or integer > 0 default None, most values of each column searched for PII, chosen
+            at random, the confidence is reported in a PII Detail column
+        parameter: pii_detectors - list of PIIDetector default None, detectors searched for in addition to telephone,
+            email and street address
+        parameter: profile_sample - None or integer > 0 default None, profile this many rows chosen at random instead of
+            every row, estimated metrics are marked and null rates and distinct values reported with their intervals
+        parameter: compact - boolean default False, hold the text columns of the file as categoricals or Arrow backed
+            strings and integers in the smallest integer dtype once read, the same profile in less memory
+        parameter: column_workers - None or integer > 0 default None, number of processes the per column work of one
+            file (date detection, PII scan and distinct values) is spread across, the profile is the same
+        parameter: percentiles - list of numbers from 0 to 1 default None, percentiles on the Numeric_Value_Dist sheet,
+            the 25th, 50th and 75th when None
+        parameter: numeric_detail - boolean default False, add zero, negative and outlier counts to the
+            Numeric_Value_Dist sheet and a Numeric_Histogram sheet with histogram_bins equal width bins per column
+        parameter: histogram_bins - integer > 0 default 10, bins of each column on the Numeric_Histogram sheet
         kwargs: pandas keyword arguments to read text files
+        returns: dataframe summary with the size, status ('profiled', 'appended', 'cached', 'not parsed' or 'failed'),
+            seconds taken and error of each file
         """
         # add logic to process all files
         self.source_dir = Path(source_dir)
         self.destination_dir = Path(dest_dir)
+        self._set_filters(contain, not_contain)
+        self.date_formats = {}
         
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise Exception('workers must be an integer > 0 or None.')
+        if pipeline_depth is not None and (not isinstance(pipeline_depth, int) or pipeline_depth < 1):
+            raise Exception('pipeline_depth must be an integer > 0 or None.')
+        _check_output_format(kwargs.get('output_format', 'xlsx'))
+        _check_metrics(kwargs.get('metrics'), kwargs.get('metrics_callback'))
+
+        # workbooks are split into their sheets when several are selected, each sheet is profiled on its own
+        units = _sheet_units(self._list_files(), kwargs.get('sheet_name', 0))
+        if (workers is None or workers == 1) and pipeline_depth is not None:
+            self.log.info(f'Profiling {len(units)} files in a pipeline of depth {pipeline_depth}')
+            return _run_pipeline(self, units, pipeline_depth, self.log, **kwargs)
+        if workers is None or workers == 1:
+            results = []
+            for item, sheet in units:
+                start = time.perf_counter()
+                # taken before profiling, the file may be moved away once it is profiled
+                size_mb = round(item.stat().st_size / 2 ** 20, 3)
+                status = self._process_file(item, sheet, **kwargs)
+                results.append([_unit_name(item, sheet), size_mb, status, round(time.perf_counter() - start, 3), None])
+            return pd.DataFrame(results, columns=SUMMARY_COLUMNS)
+
+        if pool_memory_mb is None:
+            physical_memory_mb = _physical_memory_mb()
+            pool_memory_mb = physical_memory_mb / 2 if physical_memory_mb else None
+        self.log.info(f'Profiling {len(units)} files with {workers} workers')
+        summary = _run_pool(units, self.destination_dir, workers, pool_memory_mb, self.log, **kwargs)
+        profiled = (summary['Status'] == 'profiled').sum()
+        failed = (summary['Status'] == 'failed').sum()
+        self.log.info(f'Profiled {profiled} of {len(summary)} files, {failed} failed')
+        return summary
+
+
+    def watch_directory(self, source_dir, dest_dir, contain=None, not_contain=None, workers=None, poll_seconds=5,
+        max_polls=None, file_callback=None, **kwargs):
+        """
+        Keep profiling the files that land in the source directory, or change, until interrupted. The directory is
+        polled every poll_seconds and a file is profiled once its size and modification time are unchanged between
+        two polls, so files still being copied in are not read. The worker processes are started once and reused,
+        so the cost of starting Python and importing pandas is paid once rather than for each file.
+        parameter: source_dir - path to the directory watched
+        parameter: dest_dir - directory for profiles to be written
+        parameter: contain - text default None, only profile files whose name matches this pattern
+        parameter: not_contain - text default None, only profile files whose name does not match this pattern
+        parameter: workers - None or integer > 0 default None, number of processes profiling files in parallel, files
+            are profiled one at a time in this process when None or 1
+        parameter: poll_seconds - number > 0 default 5, seconds between polls of the source directory
+        parameter: max_polls - None or integer > 0 default None, return after this many polls instead of running
+            until interrupted, the files queued by the last poll are profiled before returning
+        parameter: file_callback - callable default None, called with a dict of the File, Size MB, Status, Seconds
+            and Error of each file as it finishes
+        kwargs: the keyword arguments of process_file, with cache=True files profiled before a restart are skipped
+        returns: number of files finished, profiled or not
+        """
+        self.source_dir = Path(source_dir)
+        self.destination_dir = Path(dest_dir)
+        self._set_filters(contain, not_contain)
+        self.date_formats = {}
+
+        if not self.source_dir.is_dir():
+            raise Exception(f'{self.source_dir} is not a directory.')
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise Exception('workers must be an integer > 0 or None.')
+        if not isinstance(poll_seconds, (int, float)) or isinstance(poll_seconds, bool) or poll_seconds <= 0:
+            raise Exception('poll_seconds must be a number > 0.')
+        if max_polls is not None and (not isinstance(max_polls, int) or max_polls < 1):
+            raise Exception('max_polls must be an integer > 0 or None.')
+        if file_callback is not None and not callable(file_callback):
+            raise Exception('file_callback must be callable or None.')
+        _check_output_format(kwargs.get('output_format', 'xlsx'))
+        _check_metrics(kwargs.get('metrics'), kwargs.get('metrics_callback'))
+        return _watch(self, poll_seconds, workers, max_polls, file_callback, **kwargs)
+
+
+    def _set_filters(self, contain=None, not_contain=None):
+        """
+        Check and set the contain and not_contain filters of the files of a directory, see _list_files()
+        """
         if contain is not None and not_contain is not None:
             raise Exception('Cannot use both "contain" and "not_contain" to process a directory')
         elif contain is not None and not isinstance(contain, str):
@@ -79,20 +236,28 @@ class ProfileData():
             raise Exception(f'"not_contain" expects a string {type(not_contain)} used.')
         self.contain = contain
         self.not_contain = not_contain
-        
+
+
+    def _list_files(self):
+        """
+        returns: list of files in the source directory to be profiled, filtered with contain and not_contain
+        """
+        files = []
         for item in self.source_dir.iterdir():
-            if '~$' in item.stem[:2] or item.name.endswith('_profile.xlsx'):
+            if '~$' in item.stem[:2] or item.name.endswith(PROFILE_SUFFIXES + (METRICS_SUFFIX,)):
                 continue
             if item.is_file() and item.suffix != '.lnk':
                 if self.contain is not None and re.search(f'{self.contain}', item.name):
-                    self._process_file(item, **kwargs)
+                    files.append(item)
                 elif self.not_contain is not None and not re.search(f'{self.not_contain}', item.name):
-                    self._process_file(item, **kwargs)
+                    files.append(item)
                 elif self.contain is None and self.not_contain is None:
-                    self._process_file(item, **kwargs)
+                    files.append(item)
+        return files
 
         
-    def process_dataframe(self, dest_dir, dataframe=None, dataframe_name=None, **kwargs):
+    def process_dataframe(self, dest_dir, dataframe=None, dataframe_name=None, output_format='xlsx', metrics=None,
+        metrics_callback=None, **kwargs):
         """
         Profile a pandas dataframe
         parameter: dest_dir - directory for profile to be written        
@@ -101,42 +266,244 @@ class ProfileData():
         parameter: colname_chars_replace_underscore - string of invalid characters to be replaced with an underscore
         parameter: colname_chars_replace_custom - dict of characters and their replacement value
         parameter: colname_chars_remove - string of characters to be removed
-        parameter: sample_data - None or integer > 0; number of records to include in a sample_data sheet in output, 
+        parameter: sample_data - None or integer > 0; number of records chosen at random to include in a sample_data sheet in output, 
                     default is 500, disable with sample_data=None
         parameter: interpret_date_timestamp - boolean default False, attempt to convert string fields to date or timestamp 
         parameter: interpret_date_timestamp_errors - text default "raise", options are "raise", "ignore", "coerce".
             "raise" will raise errors on values that cannot be converted, "ignore" will not raise errors and returns the 
             input data, "coerce" will return NaT values when they cannot be converted.
+        parameter: pii_sample - None or integer > 0 default None, most values of each column searched for PII, chosen
+            at random, the confidence is reported in a PII Detail column
+        parameter: pii_detectors - list of PIIDetector default None, detectors searched for in addition to telephone,
+            email and street address
+        parameter: profile_sample - None or integer > 0 default None, profile this many rows chosen at random instead of
+            every row, estimated metrics are marked and null rates and distinct values reported with their intervals
+        parameter: compact - boolean default False, hold the text columns of the file as categoricals or Arrow backed
+            strings and integers in the smallest integer dtype once read, the same profile in less memory
+        parameter: column_workers - None or integer > 0 default None, number of processes the per column work of one
+            file (date detection, PII scan and distinct values) is spread across, the profile is the same
+        parameter: percentiles - list of numbers from 0 to 1 default None, percentiles on the Numeric_Value_Dist sheet,
+            the 25th, 50th and 75th when None
+        parameter: numeric_detail - boolean default False, add zero, negative and outlier counts to the
+            Numeric_Value_Dist sheet and a Numeric_Histogram sheet with histogram_bins equal width bins per column
+        parameter: histogram_bins - integer > 0 default 10, bins of each column on the Numeric_Histogram sheet
+        parameter: output_format - text default "xlsx", options are "xlsx", "xlsx_streaming" (written row by row in
+            constant memory), "json", "parquet" and "arrow" (a directory with a file for each sheet, require pyarrow)
+        parameter: metrics - text default None, options are "sheet" (a Profile_Metrics sheet in the profile) and "json"
+            (a <name>_profile_metrics.json file next to the profile) with the wall time, CPU time, peak memory and
+            rows and columns of each stage of the profile
+        parameter: metrics_callback - callable default None, called with a dict of each stage's metrics as the stage
+            ends, in the worker process when profiling a directory with workers
         """
         self.destination_dir = Path(dest_dir)
-        fo = _FileObj('dataframe', dataframe=dataframe, dataframe_name=dataframe_name)
-        self._create_profile(fo)
+        _check_output_format(output_format)
+        profile_metrics = None
+        if metrics is not None or metrics_callback is not None:
+            profile_metrics = _ProfileMetrics(dataframe_name, metrics, metrics_callback)
+        with _stage(profile_metrics, 'read'):
+            fo = _FileObj('dataframe', dataframe=dataframe, dataframe_name=dataframe_name, **kwargs)
+            if profile_metrics is not None:
+                profile_metrics.rows, profile_metrics.columns = fo.data_shape()
+        self._create_profile(fo, output_format, profile_metrics)
 
 
-    def _process_file(self, path_obj, **kwargs):
-        self.log.info(f'Processing {path_obj.name}')
-        fo = _FileObj(path_obj, **kwargs)
-        if fo.df is None:
-            pass
-        else:
-            self._create_profile(fo)
+    def process_query(self, connection, query, dest_dir, query_name, params=None, output_format='xlsx', metrics=None,
+        metrics_callback=None, **kwargs):
+        """
+        Profile the rows of a SQL query read from a DB-API connection in batches, the result set is not held in memory
+        parameter: connection - open DB-API 2.0 connection ex. sqlite3, psycopg, pyodbc or oracledb, left open
+        parameter: query - text, a SELECT statement
+        parameter: dest_dir - directory for profile to be written
+        parameter: query_name - text string used to name the profile created
+        parameter: params - sequence or dict default None, parameters of the query in the paramstyle of the driver
+        parameter: pushdown - boolean default True, count the rows and the distinct values of each column in the
+            database with one aggregate query, distinct values and primary keys are then exact when the values are
+            too many to count in max_memory_mb or approximate_distinct is used
+        parameter: max_memory_mb - number > 0 default 256, memory budget for the fetched batches and counted values
+        parameter: colname_chars_replace_underscore - string of invalid characters to be replaced with an underscore
+        parameter: colname_chars_replace_custom - dict of characters and their replacement value
+        parameter: colname_chars_remove - string of characters to be removed
+        parameter: sample_data - None or integer > 0 default is 500; number of records chosen at random to include in a sample_data
+            sheet in output, disable with sample_data=None
+        parameter: interpret_date_timestamp - boolean default False, attempt to convert string fields to date or timestamp
+        parameter: interpret_date_timestamp_errors - text default "raise", options are "raise", "ignore", "coerce"
+        parameter: approximate_distinct - boolean default False, count distinct values with fixed size sketches
+        parameter: top_k - integer > 0 default 100, most frequent values reported with approximate_distinct
+        parameter: pii_sample - None or integer > 0 default None, most values of each column searched for PII
+        parameter: pii_detectors - list of PIIDetector default None, detectors searched for in addition to telephone,
+            email and street address
+        parameter: percentiles - list of numbers from 0 to 1 default None, percentiles on the Numeric_Value_Dist sheet,
+            the 25th, 50th and 75th when None
+        parameter: numeric_detail - boolean default False, add zero, negative and outlier counts to the
+            Numeric_Value_Dist sheet and a Numeric_Histogram sheet with histogram_bins equal width bins per column
+        parameter: histogram_bins - integer > 0 default 10, bins of each column on the Numeric_Histogram sheet
+        parameter: output_format - text default "xlsx", options are "xlsx", "xlsx_streaming", "json", "parquet" and
+            "arrow"
+        parameter: metrics - text default None, options are "sheet" and "json", see process_file
+        parameter: metrics_callback - callable default None, called with a dict of each stage's metrics as the stage ends
+        """
+        self.destination_dir = Path(dest_dir)
+        _check_output_format(output_format)
+        profile_metrics = None
+        if metrics is not None or metrics_callback is not None:
+            profile_metrics = _ProfileMetrics(query_name, metrics, metrics_callback)
+        with _stage(profile_metrics, 'read'):
+            fo = _QueryFileObj(connection, query, query_name, params=params, date_formats=self.date_formats, **kwargs)
+            if profile_metrics is not None:
+                profile_metrics.rows, profile_metrics.columns = fo.data_shape()
+        if not fo.has_data():
+            return
+        self._create_profile(fo, output_format, profile_metrics)
 
 
-    def _create_profile(self, fo):
+    def process_table(self, connection, table, dest_dir, columns=None, **kwargs):
+        """
+        Profile a database table read from a DB-API connection in batches, named <table>_profile
+        parameter: connection - open DB-API 2.0 connection, left open
+        parameter: table - text, name of the table or view, schema.table for a table in another schema
+        parameter: dest_dir - directory for profile to be written
+        parameter: columns - list of column names default None, every column when None
+        kwargs: the keyword arguments of process_query
+        """
+        self.process_query(connection, _table_query(table, columns), dest_dir, table, **kwargs)
+
+
+    def _process_file(self, path_obj, sheet=None, **kwargs):
+        """
+        Profile a file, or one sheet of a workbook, into self.destination_dir
+        kwargs: keyword arguments of _read_file()
+        returns: 'profiled', 'appended' when only rows appended since the cached profile were read,
+            'cached' when the cached profile was reused, or 'not parsed'
+        """
+        job = self._read_file(path_obj, sheet, **kwargs)
+        if isinstance(job, str):
+            return job
+        results_file = self._create_profile(job['fo'], job['output_format'], job['metrics'])
+        return self._finish_file(job, results_file)
+
+
+    def _read_file(self, path_obj, sheet=None, streaming=False, max_memory_mb=256, cache=False,
+        cache_content_hash=False, output_format='xlsx', metrics=None, metrics_callback=None, **kwargs):
+        """
+        Read a file to be profiled, unless its cached profile can be kept
+        parameter: sheet - name of a sheet of a workbook default None, the sheet is read in place of the sheet_name
+            keyword argument and profiled as <file>_<sheet>
+        returns: dict of the FileObj read and what is needed to write and cache its profile, or the status 'cached'
+            or 'not parsed'
+        """
+        self.log.info(f'Processing {_unit_name(path_obj, sheet)}')
+        _check_output_format(output_format)
+        _check_metrics(metrics, metrics_callback)
+        if sheet is not None:
+            kwargs['sheet_name'] = sheet
+        can_stream = path_obj.suffix in ['.csv', '.tsv', '.txt'] + COLUMNAR_SUFFIXES + EXCEL_STREAM_SUFFIXES
+        profile_cache = None
+        resume_state = None
+        options = None
+        snapshot = None
+        if cache:
+            profile_cache = _ProfileCache(self.destination_dir, cache_content_hash)
+            options = dict(kwargs, streaming=streaming, max_memory_mb=max_memory_mb, output_format=output_format,
+                metrics=metrics)
+            # taken before the file is read, rows written to it while it is profiled are left for the next run
+            change, entry, snapshot = profile_cache.lookup(path_obj, options)
+            if change == 'unchanged':
+                self.log.info(f'{_unit_name(path_obj, sheet)} is unchanged, keeping {entry["profile_file"]}')
+                return 'cached'
+            if change == 'appended' and streaming and path_obj.suffix in ['.csv', '.tsv', '.txt']:
+                resume_state = profile_cache.load_state(entry)
+
+        profile_metrics = None
+        if metrics is not None or metrics_callback is not None:
+            profile_metrics = _ProfileMetrics(_unit_name(path_obj, sheet), metrics, metrics_callback)
+        with _stage(profile_metrics, 'read'):
+            if streaming and kwargs.get('profile_sample') is not None:
+                self.log.info(f'{path_obj.name} is sampled in chunks, streaming is not needed')
+                fo = _FileObj(path_obj, date_formats=self.date_formats, **kwargs)
+            elif streaming and can_stream:
+                fo = _StreamingFileObj(path_obj, max_memory_mb=max_memory_mb, resume_state=resume_state,
+                    date_formats=self.date_formats, **kwargs)
+            else:
+                if streaming:
+                    self.log.warning(f'{path_obj.name} cannot be streamed, reading the whole file')
+                fo = _FileObj(path_obj, date_formats=self.date_formats, **kwargs)
+            if profile_metrics is not None:
+                profile_metrics.rows, profile_metrics.columns = fo.data_shape()
+        if not fo.has_data():
+            return 'not parsed'
+        if sheet is not None:
+            fo.df_name = _sheet_stem(path_obj, sheet)
+        return {'path_obj': path_obj, 'sheet': sheet, 'fo': fo, 'output_format': output_format,
+            'metrics': profile_metrics, 'cache': profile_cache, 'options': options, 'snapshot': snapshot,
+            'resume_state': resume_state}
+
+
+    def _finish_file(self, job, results_file):
+        """
+        Cache the profile written for a file read by _read_file()
+        returns: 'appended' when only rows appended since the cached profile were read, otherwise 'profiled'
+        """
+        if job['cache'] is not None:
+            fo = job['fo']
+            state = fo.cache_state() if isinstance(fo, _StreamingFileObj) else None
+            job['cache'].store(job['path_obj'], job['options'], results_file, job['snapshot'], state)
+        return 'appended' if job['resume_state'] is not None else 'profiled'
+
+
+    def _create_profile(self, fo, output_format='xlsx', metrics=None):
+        """
+        Write the profile sheets of a FileObj with the writer for output_format
+        parameter: metrics - _ProfileMetrics default None, records each sheet as a stage and the write of each sheet
+        returns: path of the profile written
+        """
         self.log.info('Creating Output File')
-        if fo.df_name is not None:
-            results_file = self.destination_dir / f'{fo.df_name}_profile.xlsx'
-        else:
-            results_file = self.destination_dir / f'{fo.path_obj.stem}_profile.xlsx'
-        # kwargs for ExcelWriter that may help with datatime formatting issues
-        # datetime_format="yyyy-mm-dd hh:mm:ss", date_format="yyyy-mm-dd"
-        with pd.ExcelWriter(results_file) as excel_writer:
-            fo.get_data_types().to_excel(excel_writer, sheet_name='Data_Types', index=False)
-            fo.get_text_distinct_values().to_excel(excel_writer, sheet_name='Text_Value_Dist', index=False)
-            fo.get_numeric_value_distribution().to_excel(excel_writer, sheet_name='Numeric_Value_Dist', index=False)
-            fo.get_primary_keys().to_excel(excel_writer, sheet_name='Potential_Primary_Keys', index=False)
-            if fo.sample_data is not None:
-                fo.create_sample().to_excel(excel_writer, sheet_name='Sample_Data', index=False)
-        self.log.info(f'Output File {results_file} Complete')
+        # each sheet is handed to the writer as soon as it is computed
+        return self._write_profile(fo, self._profile_sheets(fo, metrics), output_format, metrics)
 
-        
+
+    def _profile_sheets(self, fo, metrics=None):
+        """
+        Compute the profile sheets of a FileObj one at a time
+        returns: generator of tuples of the sheet name and its dataframe
+        """
+        fo.metrics = metrics
+        sheets = [('Data_Types', 'data_types', fo.get_data_types),
+            ('Text_Value_Dist', 'text_value_dist', fo.get_text_distinct_values),
+            ('Numeric_Value_Dist', 'numeric_value_dist', fo.get_numeric_value_distribution),
+            ('Potential_Primary_Keys', 'primary_keys', fo.get_primary_keys)]
+        if fo.numeric_detail:
+            sheets.insert(3, ('Numeric_Histogram', 'numeric_histogram', fo.get_numeric_histogram))
+        if fo.sample_data is not None:
+            sheets.append(('Sample_Data', 'sample_data', fo.create_sample))
+        for sheet, stage, get_sheet in sheets:
+            with _stage(metrics, stage, sheet) as record:
+                df = get_sheet()
+                record['output_rows'] = len(df)
+            yield sheet, df
+
+
+    def _write_profile(self, fo, sheets, output_format='xlsx', metrics=None):
+        """
+        Write the profile sheets of a FileObj with the writer for output_format
+        parameter: sheets - iterable of tuples of the sheet name and its dataframe, see _profile_sheets()
+        returns: path of the profile written
+        """
+        stem = fo.df_name if fo.df_name is not None else fo.path_obj.stem
+        writer = _profile_writer(output_format, self.destination_dir, stem)
+        writer.open()
+        try:
+            for sheet, df in sheets:
+                with _stage(metrics, 'write', sheet):
+                    writer.write_sheet(sheet, df)
+            if metrics is not None and metrics.output == 'sheet':
+                # stages until now, closing the file is not included
+                writer.write_sheet('Profile_Metrics', metrics.frame())
+        finally:
+            with _stage(metrics, 'close'):
+                writer.close()
+        self.log.info(f'Output File {writer.path} Complete')
+        if metrics is not None:
+            metrics.finish()
+            if metrics.output == 'json':
+                metrics.write_json(self.destination_dir / f'{stem}{METRICS_SUFFIX}')
+        return writer.path
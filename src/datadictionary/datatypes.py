@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+from .patterns import DATA_TYPE_NAMES
+from .compaction import _dtype_name, _is_compact_text
+
+INT_DTYPES = ['int', 'int64', 'int32', 'int16', 'int8']
+FLOAT_DTYPES = ['float', 'float64', 'float32']
+
+# length of the text pandas renders for a NULL value ('nan' or 'NaT') with astype(str)
+NULL_TEXT_LENGTH = 3
+
+# floats between these bounds are rendered positionally by repr(), others use scientific notation
+POSITIONAL_MIN = 1e-4
+POSITIONAL_MAX = 1e16
+# the scale of a float is found numerically while value * 10 ** scale is exactly representable
+EXACT_MAX = 2.0 ** 50
+MAX_SCALE = 22
+
+# powers of ten used to count the digits of a number without rendering it as text
+INT_POWERS_OF_TEN = np.array([10 ** i for i in range(20)], dtype='uint64')
+FLOAT_POWERS_OF_TEN = 10.0 ** np.arange(17)
+
+STAT_COLUMNS = ['dtype', 'rows', 'non_null', 'min_value', 'max_value', 'min_length', 'max_length',
+    'precision', 'scale', 'all_integral', 'mean', 'm2']
+
+
+def _column_stats(df, moments=False, metadata=None, column_stats=None):
+    """
+    Compute the statistics behind the Data_Types sheet for every column of a dataframe, one
+    vectorized pass for each group of columns that share a dtype.
+    Lengths are the lengths of all values rendered as text by astype(str), NULL values included,
+    precision and scale are the digits before and after the decimal point in the same text.
+    parameter: df - pandas DataFrame
+    parameter: moments - boolean default False, also compute the mean and sum of squared differences
+        of numeric columns
+    parameter: metadata - dataframe default None, non_null, min_value and max_value already known for some
+        columns, from _columnar_metadata(), these are not computed again where they are not NaN
+    parameter: column_stats - colstats._ColumnStats of df default None, the NULL counts are taken from it and
+        text lengths measured on the distinct values it holds rather than every row
+    returns: dataframe of statistics indexed by column name
+    """
+    stats = pd.DataFrame(index=df.columns, columns=STAT_COLUMNS, dtype='object')
+    stats['dtype'] = [_dtype_name(dtype) for dtype in df.dtypes]
+    stats['rows'] = len(df)
+    stats['all_integral'] = True
+    known = None
+    if metadata is not None and df.columns.is_unique:
+        known = metadata.reindex(df.columns)
+    if known is None and column_stats is not None and df.columns.is_unique:
+        stats['non_null'] = column_stats.non_null()
+    elif known is None:
+        stats['non_null'] = df.count()
+    else:
+        unknown = known['non_null'].isna().to_numpy()
+        stats['non_null'] = known['non_null']
+        if unknown.any():
+            stats.loc[unknown, 'non_null'] = df.loc[:, unknown].count()
+
+    groups = {}
+    for col, col_dtype in stats['dtype'].items():
+        groups.setdefault(col_dtype, []).append(col)
+
+    for col_dtype, cols in groups.items():
+        group = df[cols]
+        if col_dtype in INT_DTYPES:
+            _int_stats(group, stats, known)
+        elif col_dtype in FLOAT_DTYPES:
+            _float_stats(group, stats, known)
+        elif col_dtype == 'bool':
+            # True and False render as text of length 4 and 5
+            any_true = group.any()
+            all_true = group.all()
+            stats.loc[cols, 'min_length'] = np.where(any_true, 4, 5)
+            stats.loc[cols, 'max_length'] = np.where(all_true, 4, 5)
+        else:
+            for col in cols:
+                lengths = None
+                if column_stats is not None and df.columns.is_unique:
+                    lengths = _distinct_lengths(group[col], column_stats)
+                if lengths is None:
+                    lengths = _text_lengths(group[col])
+                    lengths = (lengths.min(), lengths.max())
+                stats.at[col, 'min_length'], stats.at[col, 'max_length'] = lengths
+
+        if moments and (col_dtype in INT_DTYPES or col_dtype in FLOAT_DTYPES):
+            mean = group.mean()
+            stats.loc[cols, 'mean'] = mean
+            stats.loc[cols, 'm2'] = ((group - mean) ** 2).sum()
+
+    return stats
+
+
+def _range_stats(group, stats, known):
+    """
+    Set min_value and max_value of the columns of group, from known where both are known
+    """
+    cols = group.columns
+    if known is not None:
+        from_metadata = (known.loc[cols, 'min_value'].notna() & known.loc[cols, 'max_value'].notna()).to_numpy()
+        stats.loc[cols[from_metadata], ['min_value', 'max_value']] = known.loc[cols[from_metadata],
+            ['min_value', 'max_value']].to_numpy()
+        cols = cols[~from_metadata]
+        group = group[cols]
+    if len(cols):
+        stats.loc[cols, 'min_value'] = group.min()
+        stats.loc[cols, 'max_value'] = group.max()
+
+
+def _int_stats(group, stats, known=None):
+    cols = group.columns
+    if group.empty:
+        return
+    _range_stats(group, stats, known)
+    values = group.to_numpy(dtype='int64')
+    lengths = _int_digits(values) + (values < 0)
+    stats.loc[cols, 'min_length'] = lengths.min(axis=0)
+    stats.loc[cols, 'max_length'] = lengths.max(axis=0)
+    # an integer column read as a decimal is rendered as 'n.0'
+    stats.loc[cols, 'precision'] = lengths.max(axis=0) + 1
+    stats.loc[cols, 'scale'] = 1
+
+
+def _float_stats(group, stats, known=None):
+    cols = group.columns
+    if group.empty:
+        return
+    _range_stats(group, stats, known)
+    values = group.to_numpy()
+    nulls = np.isnan(values)
+    precision, scale, integral = _float_precision_scale(values)
+    # fmax and fmin ignore NaN, columns of only NULL values reduce to NaN
+    stats.loc[cols, 'precision'] = np.fmax.reduce(precision + scale, axis=0)
+    stats.loc[cols, 'scale'] = np.fmax.reduce(scale, axis=0)
+    stats.loc[cols, 'all_integral'] = (integral | nulls).all(axis=0)
+    # the decimal point is the only character that is not a digit or sign, NULL values are rendered as 'nan'
+    lengths = np.where(nulls, NULL_TEXT_LENGTH, precision + np.where(np.isnan(scale), 0, scale + 1))
+    stats.loc[cols, 'min_length'] = lengths.min(axis=0)
+    stats.loc[cols, 'max_length'] = lengths.max(axis=0)
+
+
+def _float_precision_scale(values):
+    """
+    Count the characters before the decimal point (sign included) and the digits after it in the text
+    repr() gives each value, without rendering the values as text.
+    Values repr() renders in scientific notation, or that are too large to scale exactly, fall back to text.
+    parameter: values - numpy array of floats of any shape
+    returns: tuple of arrays the shape of values, characters before the point, digits after it (NaN
+        when the text has no decimal point or the value is NULL) and True where the value is integral
+    """
+    shape = values.shape
+    values = values.ravel()
+    abs_values = np.abs(values)
+    nulls = np.isnan(values)
+    scale = np.full(len(values), np.nan)
+    positional = ((abs_values >= POSITIONAL_MIN) & (abs_values < POSITIONAL_MAX)) | (values == 0)
+    if values.dtype != 'float64':
+        # repr() of a float32 is shorter than the float64 it converts to
+        positional[:] = False
+
+    remaining = np.flatnonzero(positional)
+    for decimals in range(MAX_SCALE + 1):
+        if remaining.size == 0:
+            break
+        power = 10.0 ** decimals
+        remaining_values = values[remaining]
+        scaled = remaining_values * power
+        exact = np.abs(scaled) < EXACT_MAX
+        found = exact & (np.rint(scaled) / power == remaining_values)
+        scale[remaining[found]] = decimals
+        # values that can no longer be scaled exactly are resolved as text below
+        remaining = remaining[~found & exact]
+
+    resolved = ~np.isnan(scale)
+    precision = np.where(resolved, _int_digits(np.trunc(np.where(resolved, abs_values, 0))) + np.signbit(values),
+        np.nan)
+    integral = nulls | (scale == 0)
+    # repr() of an integral float ends in '.0'
+    scale = np.where(resolved, np.maximum(scale, 1), np.nan)
+
+    unresolved = np.flatnonzero(~resolved & ~nulls)
+    if unresolved.size:
+        text = pd.Series(values[unresolved]).astype('str')
+        parts = text.str.split('.', n=1, expand=True)
+        if 1 not in parts:
+            parts[1] = None
+        precision[unresolved] = parts[0].str.len()
+        scale[unresolved] = parts[1].str.len()
+        integral[unresolved] = parts[1].fillna('0').str.strip('0') == ''
+    return precision.reshape(shape), scale.reshape(shape), integral.reshape(shape)
+
+
+def _int_digits(values):
+    """
+    returns: array of the number of digits of each value, sign excluded
+    """
+    if values.dtype.kind == 'f':
+        digits = np.searchsorted(FLOAT_POWERS_OF_TEN, values, side='right')
+    else:
+        digits = np.searchsorted(INT_POWERS_OF_TEN, np.abs(values).astype('uint64'), side='right')
+    return np.maximum(digits, 1)
+
+
+def _text_lengths(series):
+    """
+    returns: series of the length of each value rendered as text by astype(str)
+    """
+    values = series
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # the length of each category, taken by the code of each row
+        lengths = _text_lengths(pd.Series(values.cat.categories)).to_numpy()
+        codes = values.cat.codes.to_numpy()
+        lengths = lengths[np.maximum(codes, 0)]
+        if (codes < 0).any():
+            # NULL values of a text column read from a file render as 'nan', lengths are floats as with object
+            lengths = np.where(codes >= 0, lengths, NULL_TEXT_LENGTH).astype('float64')
+        return pd.Series(lengths, index=values.index)
+    if isinstance(values.dtype, pd.StringDtype):
+        lengths = values.str.len()
+        if lengths.isna().any():
+            return lengths.astype('float64').fillna(NULL_TEXT_LENGTH)
+        return lengths.astype('int64')
+    try:
+        lengths = values.str.len()
+    except AttributeError:
+        return values.astype('str').str.len()
+    # NULL values and values in an object column that are not strings
+    not_text = lengths.isna()
+    if not_text.any():
+        lengths[not_text] = values[not_text].astype('str').str.len()
+    return lengths
+
+
+def _distinct_lengths(series, column_stats):
+    """
+    Shortest and longest text of a text column measured on its distinct values and kinds of NULL value, rather
+    than on every row
+    returns: tuple of the min and max length, floats when the column has NULL values as with _text_lengths(),
+        None when the column holds values that are not strings
+    """
+    codes, uniques = column_stats.factorize(series.name)
+    if _dtype_name(series.dtype) != 'object' or pd.api.types.infer_dtype(uniques, skipna=True) not in ['string',
+            'empty']:
+        # equal values of different types, 1 and 1.0, are one distinct value but render as different text
+        return None
+    lengths = uniques.str.len().to_numpy() if len(uniques) else np.array([], dtype='int64')
+    nulls = np.flatnonzero(codes < 0)
+    if nulls.size:
+        if _is_compact_text(series.dtype):
+            null_lengths = [NULL_TEXT_LENGTH]
+        else:
+            # None renders as 'None' and NaN as 'nan', each kind of NULL value is measured once
+            null_lengths = pd.Series(pd.unique(series.iloc[nulls].to_numpy())).astype('str').str.len().to_numpy()
+        lengths = np.concatenate([lengths, null_lengths]).astype('float64')
+    if lengths.size == 0:
+        return None
+    return lengths.min(), lengths.max()
+
+
+def _data_types_frame(stats):
+    """
+    Build the data type and length, value, precision and scale columns of the Data_Types sheet
+    parameter: stats - dataframe of column statistics from _column_stats()
+    returns: dataframe with columns Column Name, Data Type, Min Length|Value/Precision,
+        Max Length|Value/Scale, Nullable
+    """
+    col_dtype = stats['dtype']
+    has_values = stats['non_null'] > 0
+    has_nulls = stats['rows'] > stats['non_null']
+    is_text = col_dtype.isin(['object', 'bool']) | col_dtype.str.contains('datetime')
+    is_int = col_dtype.isin(INT_DTYPES)
+    is_float = col_dtype.isin(FLOAT_DTYPES)
+
+    unsupported = pd.Series('dtype not supported', index=stats.index, dtype='object')
+    min_values = (unsupported.mask(is_float, stats['precision']).mask(is_int, stats['min_value'])
+        .mask(is_text, stats['min_length']).mask(~has_values, 0))
+    max_values = (unsupported.mask(is_float, stats['scale']).mask(is_int, stats['max_value'])
+        .mask(is_text, stats['max_length']).mask(~has_values, 0))
+
+    data_type = col_dtype.where(~(is_float & stats['all_integral'].astype(bool)), 'decimal or integer')
+    data_type = data_type.where(has_values, 'N/A')
+
+    df = pd.DataFrame({
+        'Column Name': stats.index,
+        'Data Type': data_type.replace(to_replace=DATA_TYPE_NAMES).to_numpy(),
+        'Min Length|Value/Precision': min_values.to_numpy(),
+        'Max Length|Value/Scale': max_values.to_numpy(),
+        'Nullable': np.where(has_nulls, True, None),
+    })
+    return df
@@ -0,0 +1,143 @@
+import warnings
+import numpy as np
+import pandas as pd
+from .compaction import _dtype_name
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    from pandas.core.tools.datetimes import guess_datetime_format
+
+# values of a column checked for a date format before the whole column is parsed
+DATE_PROBE_ROWS = 200
+# formats guessed from the probe values that did not parse with the formats already tried
+MAX_FORMAT_GUESSES = 4
+# longest text that is checked for a date, longer values are free text
+MAX_DATE_LENGTH = 40
+
+
+def _convert_to_datetime(col, errors='raise', date_formats=None):
+    """
+    Convert a text column to datetimes when it holds dates. A probe of values spread through the column is
+    checked first, so columns that are not dates are rejected without parsing every value, and the one format
+    the probe values share is detected. The whole column is then parsed with that format in one call.
+    parameter: col - pandas Series, text, categorical and Arrow string columns are converted
+    parameter: errors - text default "raise", options are "raise" and "ignore" (the column is only converted when
+        every value is a date) and "coerce" (values that are not dates become NaT)
+    parameter: date_formats - dict default None, format detected for each column name, tried first and updated
+    returns: tuple of the converted Series, or col when it is not converted, and the format used, None when
+        col is not converted
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # each category is converted once, the rows take the converted category of their code
+        used = col.cat.remove_unused_categories()
+        categories, date_format = _convert_to_datetime(pd.Series(used.cat.categories, name=col.name), errors,
+            date_formats)
+        if not pd.api.types.is_datetime64_any_dtype(categories):
+            return col, None
+        return pd.Series(categories.array.take(used.cat.codes.to_numpy(), allow_fill=True), index=col.index,
+            name=col.name), date_format
+    if _dtype_name(col.dtype) != 'object':
+        return col, None
+    values = col.dropna()
+    if values.empty:
+        return col, None
+    if len(values) > DATE_PROBE_ROWS:
+        values = values.iloc[np.linspace(0, len(values) - 1, DATE_PROBE_ROWS).astype(int)]
+    if not all(isinstance(value, str) for value in values):
+        # dates and timestamps read from Excel are converted as they are
+        return _to_datetime(col, errors), None
+
+    known = date_formats.get(col.name) if date_formats is not None else None
+    date_format = _detect_format(values, errors, known)
+    if date_format is None:
+        return col, None
+    new_col = _to_datetime(col, errors, date_format)
+    if new_col is col:
+        return col, None
+    if date_formats is not None:
+        date_formats[col.name] = date_format
+    return new_col, date_format
+
+
+def _detect_format(probe, errors='raise', known=None):
+    """
+    Find the format of the dates in a probe of text values, the format a column was parsed with before is tried
+    first, then formats guessed from the values that did not parse
+    returns: the strftime format, "ISO8601", "mixed", or None when the values are not dates
+    """
+    lengths = probe.str.len()
+    has_digit = probe.str.contains(r'\d', regex=True)
+    if errors == 'coerce':
+        if not (has_digit & (lengths <= MAX_DATE_LENGTH)).any():
+            return None
+    elif not has_digit.all() or lengths.max() > MAX_DATE_LENGTH:
+        return None
+
+    candidates = [] if known is None else [known]
+    tried = []
+    best, best_parsed = None, 0
+    unparsed = probe
+    while len(tried) < MAX_FORMAT_GUESSES:
+        date_format = candidates.pop(0) if candidates else _guess_format(unparsed)
+        if date_format is None or date_format in tried:
+            break
+        tried.append(date_format)
+        count, unparsed = _count_parsed(probe, date_format, unparsed)
+        if count == len(probe):
+            return date_format
+        if count > best_parsed:
+            best, best_parsed = date_format, count
+    # ISO 8601 dates and times of different precision or with and without a time zone share no one format, and
+    # dates pandas guesses no format for, such as two digit years, are parsed one value at a time as pandas does
+    # without a format
+    for date_format in ['ISO8601', 'mixed']:
+        if date_format in tried:
+            continue
+        count, unparsed = _count_parsed(probe, date_format, unparsed)
+        if count == len(probe):
+            return date_format
+        if count > best_parsed:
+            best, best_parsed = date_format, count
+    return best if errors == 'coerce' else None
+
+
+def _count_parsed(probe, date_format, unparsed):
+    """
+    returns: tuple of the number of probe values parsed with the format and the values it did not parse, unparsed
+        when it parsed none
+    """
+    parsed = _to_datetime(probe, 'coerce', date_format)
+    if parsed is probe:
+        return 0, unparsed
+    return parsed.notna().sum(), probe[parsed.isna()]
+
+
+def _guess_format(values):
+    """
+    returns: the format pandas guesses from the first of the values it recognises, None when it recognises none
+    """
+    with warnings.catch_warnings():
+        # guessing warns that day first formats are parsed day first
+        warnings.simplefilter('ignore')
+        for value in values.iloc[:MAX_FORMAT_GUESSES]:
+            date_format = guess_datetime_format(value)
+            if date_format is not None:
+                return date_format
+    return None
+
+
+def _to_datetime(col, errors, date_format=None):
+    """
+    returns: col parsed as datetimes, or col itself when it could not be parsed, none of it are dates, or the
+        values have different time zones
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            new_col = pd.to_datetime(col, errors='coerce' if errors == 'coerce' else 'raise', format=date_format,
+                utc=False)
+    except (ValueError, TypeError, OverflowError):
+        return col
+    if new_col.count() == 0 or not pd.api.types.is_datetime64_any_dtype(new_col):
+        return col
+    return new_col
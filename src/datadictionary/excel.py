@@ -0,0 +1,223 @@
+import itertools
+import re
+import numpy as np
+import pandas as pd
+
+EXCEL_SUFFIXES = ['.xls', '.xlsx', '.xlsm']
+# workbooks openpyxl reads row by row, .xls workbooks are only read whole by pandas
+EXCEL_STREAM_SUFFIXES = ['.xlsx', '.xlsm']
+
+# characters of a sheet name replaced in the name of its profile
+INVALID_NAME_CHARS = r'[^\w\-.]+'
+
+# read_excel arguments understood when a sheet is read row by row, others are only supported by pandas
+EXCEL_STREAM_KWARGS = ['sheet_name', 'header', 'skiprows', 'nrows', 'usecols', 'na_values', 'keep_default_na']
+
+# text read as NULL by pandas.read_excel unless keep_default_na=False, the default na_values of pandas
+DEFAULT_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+def _excel_sheets(path_obj, sheet_name=None):
+    """
+    List the sheets of a workbook selected by sheet_name, read from the workbook's index of sheets
+    parameter: sheet_name - None for every sheet, or a list of sheet names and positions as in pandas.read_excel
+    returns: list of sheet names in the order selected
+    """
+    if path_obj.suffix in EXCEL_STREAM_SUFFIXES:
+        import openpyxl
+        workbook = openpyxl.load_workbook(path_obj, read_only=True)
+        try:
+            names = workbook.sheetnames
+        finally:
+            workbook.close()
+    else:
+        with pd.ExcelFile(path_obj) as workbook:
+            names = workbook.sheet_names
+    if sheet_name is None:
+        return names
+    sheets = []
+    for sheet in sheet_name:
+        if isinstance(sheet, int) and not isinstance(sheet, bool) and 0 <= sheet < len(names):
+            sheets.append(names[sheet])
+        elif sheet in names:
+            sheets.append(sheet)
+        else:
+            raise Exception(f'{path_obj.name} has no sheet {sheet!r}, its sheets are {names}')
+    return sheets
+
+
+def _sheet_units(files, sheet_name=0):
+    """
+    Split workbooks into the sheets profiled on their own when sheet_name selects several sheets
+    parameter: files - list of paths to profile
+    parameter: sheet_name - sheet_name keyword argument of the run, None or a list select several sheets
+    returns: list of tuples of a path and the name of its sheet, None when the file is profiled as a whole
+    """
+    units = []
+    for path_obj in files:
+        if path_obj.suffix in EXCEL_SUFFIXES and (sheet_name is None or isinstance(sheet_name, list)):
+            try:
+                units += [(path_obj, sheet) for sheet in _excel_sheets(path_obj, sheet_name)]
+                continue
+            except Exception:
+                # read as a whole, the file is then reported as not parsed
+                pass
+        units.append((path_obj, None))
+    return units
+
+
+def _unit_name(path_obj, sheet=None):
+    """
+    returns: name of a file or one of its sheets in the summary of a run
+    """
+    return path_obj.name if sheet is None else f'{path_obj.name}:{sheet}'
+
+
+def _sheet_stem(path_obj, sheet):
+    """
+    returns: name of the profile of one sheet of a workbook, the characters of the sheet name that are not valid
+        in file names replaced with an underscore
+    """
+    return f'{path_obj.stem}_{re.sub(INVALID_NAME_CHARS, "_", str(sheet)).strip("_")}'
+
+
+def _iter_excel(path_obj, chunk_rows, sheet_name=0, header=0, skiprows=None, nrows=None, usecols=None,
+    na_values=None, keep_default_na=True):
+    """
+    Read a sheet of an .xlsx workbook with openpyxl in read only mode, which parses the rows of the sheet as
+    they are iterated rather than loading the workbook, one chunk of rows at a time. Blank rows before the first
+    row are skipped, blank rows after it are read as rows of NULL values and blank rows at the end of the sheet are
+    dropped, blank or repeated column names are named as pandas.read_excel names them. Column types are inferred
+    for each chunk from the cell values, text that looks like a number is kept as text. Blank cells and the cells
+    pandas.read_excel reads as NULL ('NULL', 'N/A', 'NaN' and the other default NA values) are NaN, a blank cell
+    is '' when keep_default_na=False and na_values does not list ''.
+    parameter: chunk_rows - integer > 0, most rows in a chunk
+    parameter: sheet_name - name or position of the sheet default 0
+    parameter: header - 0 or None default 0, whether the first row read holds the column names
+    parameter: skiprows - integer default None, rows skipped at the top of the sheet
+    parameter: nrows - integer default None, most rows read after the header
+    parameter: usecols - list of column names default None, all columns when None
+    parameter: na_values - value, list or dict of lists by column default None, more cell values read as NULL
+    parameter: keep_default_na - boolean default True, also read the default NA values as NULL
+    returns: generator of pandas DataFrames
+    """
+    import openpyxl
+    if header not in [0, None]:
+        raise Exception(f'{path_obj.name} cannot be read row by row with header={header!r}, only 0 or None')
+    workbook = openpyxl.load_workbook(path_obj, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = _sheet_rows(worksheet, skiprows)
+        first = next(rows, None)
+        if first is None:
+            return
+        width = max((i + 1 for i, value in enumerate(first) if value is not None), default=0)
+        if header is None:
+            columns = list(range(width))
+            pending = [first[:width]]
+        else:
+            columns = _column_names(first[:width])
+            pending = []
+        read = len(pending)
+        chunk = pending
+        nulls = _null_values(columns, na_values, keep_default_na)
+        for row in rows:
+            if nrows is not None and read >= nrows:
+                break
+            # read only sheets drop blank cells at the end of a row
+            chunk.append(row[:width] + (None,) * (width - len(row)))
+            read += 1
+            if len(chunk) >= chunk_rows:
+                yield _excel_frame(chunk, columns, usecols, nulls)
+                chunk = []
+        if chunk or read == 0:
+            yield _excel_frame(chunk, columns, usecols, nulls)
+    finally:
+        workbook.close()
+
+
+def _sheet_rows(worksheet, skiprows=None):
+    """
+    returns: generator of the rows of a sheet from the first row that is not blank, a blank row after it is an empty
+        tuple and blank rows at the end of the sheet are left out, as pandas.read_excel reads them
+    """
+    blank = 0
+    started = False
+    for row in worksheet.iter_rows(min_row=(skiprows or 0) + 1, values_only=True):
+        if all(value is None for value in row):
+            # counted rather than held, formatted sheets may end in many blank rows
+            blank += started
+            continue
+        started = True
+        yield from itertools.repeat((), blank)
+        blank = 0
+        yield row
+
+
+def _column_names(values):
+    """
+    returns: list of column names of a header row, blank names as "Unnamed: <position>" and repeated names with
+        a ".<n>" suffix as pandas.read_excel names them
+    """
+    names = []
+    seen = {}
+    for i, value in enumerate(values):
+        name = f'Unnamed: {i}' if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _null_values(columns, na_values=None, keep_default_na=True):
+    """
+    returns: dict of the list of cell values read as NULL in each column, as pandas.read_excel reads them
+    """
+    nulls = {}
+    for col in columns:
+        values = na_values.get(col, []) if isinstance(na_values, dict) else na_values
+        if values is None:
+            values = []
+        elif isinstance(values, str) or not hasattr(values, '__iter__'):
+            values = [values]
+        nulls[col] = (DEFAULT_NA_VALUES if keep_default_na else []) + list(values)
+    return nulls
+
+
+def _excel_frame(rows, columns, usecols=None, nulls=None):
+    """
+    parameter: nulls - dict of the list of cell values read as NULL in each column, see _null_values()
+    returns: dataframe of the rows of a sheet, the null values of each column as NaN, blank cells as NaN when ''
+        is a null value of the column and as '' otherwise
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    if usecols is not None:
+        df = df[usecols]
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        null_values = DEFAULT_NA_VALUES if nulls is None else nulls[col]
+        # openpyxl reads a blank cell as None, pandas readers as NaN or '' when it is not a null value
+        blank = values.isna()
+        null = values.isin(null_values) if null_values else blank & False
+        if '' in null_values:
+            null |= blank
+        elif blank.any():
+            values = values.astype('object').mask(blank, '')
+        if null.any() or blank.any():
+            df.isetitem(i, values.mask(null, np.nan))
+    return df.infer_objects()
+
+
+def _excel_stream_kwargs(path_obj, kwargs):
+    """
+    returns: the read_excel keyword arguments _iter_excel() understands, raises an Exception for any others
+    """
+    unsupported = [key for key in kwargs if key not in EXCEL_STREAM_KWARGS]
+    if unsupported:
+        raise Exception(f'{unsupported} cannot be used to read {path_obj.name} row by row, '
+            f'only {EXCEL_STREAM_KWARGS} are supported')
+    return kwargs
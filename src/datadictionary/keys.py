@@ -0,0 +1,107 @@
+import itertools
+import math
+import numpy as np
+import pandas as pd
+
+# rows of the random sample a combination of columns must be unique in before it is checked against every row
+SCREEN_ROWS = 100000
+# most columns in a key, and most combinations of columns checked for a file
+MAX_KEY_COLUMNS = 3
+MAX_COMBINATIONS = 5000
+# most combinations of a size enumerated before they are ordered, only the columns with the most distinct
+# values are combined when there are more
+MAX_ENUMERATED = 200000
+# odd 64 bit constant used to combine the hashes of the columns of a combination
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _find_keys(df, candidates, max_columns=MAX_KEY_COLUMNS, screen_rows=SCREEN_ROWS,
+    max_combinations=MAX_COMBINATIONS, seed=0, column_stats=None):
+    """
+    Find the minimal sets of columns whose values are distinct in every row, a set is minimal when no smaller
+    set within it is unique. Each row of a combination is fingerprinted by combining 64 bit hashes of its
+    columns, so no grouping or aggregation of the dataframe is needed. Combinations are checked smallest first
+    and most distinct values first, skipping combinations that contain a key already found or whose distinct
+    values multiplied together are fewer than the rows. On a large dataframe a combination must be unique
+    in a random sample of the rows before it is checked against every row.
+    parameter: df - pandas DataFrame
+    parameter: candidates - list of column names that can be part of a key, columns with NULL values are skipped
+    parameter: max_columns - integer > 0, most columns in a key
+    parameter: screen_rows - integer > 0, rows of the sample combinations are screened against
+    parameter: max_combinations - integer > 0, most combinations of two or more columns checked
+    parameter: seed - integer, seed of the random sample
+    parameter: column_stats - colstats._ColumnStats of df default None, the NULL counts, distinct counts and row
+        hashes are taken from it rather than computed again
+    returns: tuple of the list of keys, each a tuple of column names, and True when every combination was checked
+    """
+    rows = len(df)
+    if column_stats is None:
+        candidates = [col for col in dict.fromkeys(candidates) if df[col].notna().all()]
+    else:
+        candidates = [col for col in dict.fromkeys(candidates) if column_stats.nulls(col) == 0]
+    if rows == 0 or not candidates:
+        return [], True
+
+    if column_stats is None:
+        hashes = {col: pd.util.hash_pandas_object(df[col], index=False).to_numpy() for col in candidates}
+        cardinality = {col: len(pd.unique(hashes[col])) for col in candidates}
+    else:
+        hashes = {col: column_stats.hashes(col) for col in candidates}
+        cardinality = {col: column_stats.distinct_count(col) for col in candidates}
+    candidates.sort(key=lambda col: cardinality[col], reverse=True)
+    screen = None
+    if rows > screen_rows:
+        screen = np.sort(np.random.default_rng(seed).choice(rows, screen_rows, replace=False))
+
+    # a single column is unique when it has a distinct value in every row
+    keys = [(col,) for col in candidates if cardinality[col] == rows]
+    remaining = [col for col in candidates if cardinality[col] < rows]
+    found = set(frozenset(key) for key in keys)
+    checked = 0
+    complete = True
+    for size in range(2, min(max_columns, len(remaining)) + 1):
+        columns = remaining
+        while math.comb(len(columns), size) > MAX_ENUMERATED:
+            columns = columns[:-1]
+            complete = False
+        combinations = []
+        for combination in itertools.combinations(columns, size):
+            if math.prod(cardinality[col] for col in combination) < rows:
+                continue
+            # a combination containing a key is not minimal
+            if any(frozenset(subset) in found for smaller in range(1, size)
+                    for subset in itertools.combinations(combination, smaller)):
+                continue
+            combinations.append(combination)
+        combinations.sort(key=lambda combination: math.prod(cardinality[col] for col in combination), reverse=True)
+
+        for combination in combinations:
+            if checked >= max_combinations:
+                return keys, False
+            checked += 1
+            if screen is not None and not _is_unique(combination, hashes, screen):
+                continue
+            if _is_unique(combination, hashes):
+                keys.append(combination)
+                found.add(frozenset(combination))
+    return keys, complete
+
+
+def _is_unique(combination, hashes, positions=None):
+    """
+    returns: True if the combination of columns has a distinct fingerprint in every row, or every row at positions
+    """
+    fingerprint = None
+    for col in combination:
+        values = hashes[col] if positions is None else hashes[col][positions]
+        fingerprint = values.copy() if fingerprint is None else fingerprint * HASH_MULTIPLIER + values
+    return len(pd.unique(fingerprint)) == len(fingerprint)
+
+
+def _keys_frame(keys):
+    """
+    parameter: keys - list of tuples of column names
+    returns: dataframe for the Potential_Primary_Keys sheet, one row for each column of each key numbered from 1
+    """
+    return pd.DataFrame([[number, col] for number, key in enumerate(keys, 1) for col in key],
+        columns=['Key', 'Column Name'])
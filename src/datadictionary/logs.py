@@ -0,0 +1,22 @@
+import logging
+
+LOG_FORMAT = '%(levelname)s: %(asctime)s %(thread)d %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# the handler every ProfileData and FileObj logs through, created once for the process
+_screen = logging.StreamHandler()
+_screen.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+
+
+def _root_logger():
+    """
+    Route the root logger to the datadictionary handler at INFO level. It is only set up when another handler
+    was added since, so a long running process creating many FileObj does not rebuild it each time and a level
+    set after the first call is kept
+    returns: the root logger
+    """
+    log = logging.getLogger()
+    if log.handlers != [_screen]:
+        log.handlers = [_screen]
+        log.setLevel(logging.INFO)
+    return log
@@ -0,0 +1,185 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import pandas as pd
+
+# where the metrics of a profile are written, "sheet" adds a Profile_Metrics sheet, "json" writes a sidecar file
+METRICS_OUTPUTS = ['sheet', 'json']
+METRICS_SUFFIX = '_profile_metrics.json'
+METRICS_COLUMNS = {'file': 'File', 'stage': 'Stage', 'sheet': 'Sheet', 'rows': 'Rows', 'columns': 'Columns',
+    'output_rows': 'Output Rows', 'wall_seconds': 'Wall Seconds', 'cpu_seconds': 'CPU Seconds',
+    'peak_rss_mb': 'Peak RSS MB', 'started': 'Started'}
+
+# _ProfileMetrics with a stage running, in any thread of the process
+_running = set()
+_running_lock = threading.Lock()
+
+
+class _ProfileMetrics:
+    """
+    Records the wall time, CPU time, peak resident memory of the process and size of the data for each stage of
+    a profile. Stages can be nested, pii_scan is recorded within data_types. The peak memory of a stage is
+    measured from its start on Linux, elsewhere it is the peak of the process so far. The CPU time and peak are of
+    the whole process, the CPU time includes the threads a stage starts (the Arrow CSV reader, column workers
+    run as threads), so neither is recorded (None) for a stage that overlaps a stage of another file profiled in
+    another thread, as in a pipeline, nor the CPU time of the total of a file with such a stage. The peak is not
+    reset while another file's stage runs.
+    """
+    def __init__(self, name, output=None, callback=None):
+        """
+        parameter: name - name of the file or dataframe profiled
+        parameter: output - None, "sheet" or "json", where the metrics are written once the profile is complete
+        parameter: callback - callable default None, called with a dict of each stage's metrics as the stage ends
+        """
+        _check_metrics(output, callback)
+        self.name = name
+        self.output = output
+        self.callback = callback
+        self.records = []
+        self.rows = None
+        self.columns = None
+        self.log = logging.getLogger()
+        self._stack = []
+        self._started = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        # a stage of this file overlapped a stage of another file, the CPU time of the process is shared
+        self._overlapped = False
+
+    @contextmanager
+    def stage(self, stage, sheet=None):
+        """
+        Measure the code run within the context as a stage, yields the stage's dict to add details to
+        """
+        record = {'file': self.name, 'stage': stage, 'sheet': sheet, 'rows': None, 'columns': None,
+            'output_rows': None, 'wall_seconds': None, 'cpu_seconds': None, 'peak_rss_mb': None,
+            'started': time.strftime('%Y-%m-%d %H:%M:%S')}
+        with _running_lock:
+            others = [metrics for metrics in _running if metrics is not self]
+            if others:
+                # the peak of the process is shared with the stages of the other files
+                record['concurrent'] = True
+                for metrics in others + [self]:
+                    for running in metrics._stack:
+                        running['concurrent'] = True
+            else:
+                if self._stack:
+                    # the peak is reset for the nested stage, keep the peak the enclosing stage reached so far
+                    self._stack[-1]['child_peak'] = _max_value(self._stack[-1].get('child_peak'), _peak_rss_mb())
+                _reset_peak_rss()
+            self._stack.append(record)
+            _running.add(self)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall
+            record['cpu_seconds'] = time.process_time() - cpu
+            with _running_lock:
+                self._stack.pop()
+                if not self._stack:
+                    _running.discard(self)
+            record['peak_rss_mb'] = _max_value(record.pop('child_peak', None), _peak_rss_mb())
+            if record.pop('concurrent', False):
+                record['peak_rss_mb'] = None
+                record['cpu_seconds'] = None
+                self._overlapped = True
+            elif self._stack:
+                self._stack[-1]['child_peak'] = _max_value(self._stack[-1].get('child_peak'), record['peak_rss_mb'])
+            record['rows'] = self.rows
+            record['columns'] = self.columns
+            self._add(record)
+
+    def finish(self):
+        """
+        Record the total of every stage since the metrics were created
+        """
+        peaks = [record['peak_rss_mb'] for record in self.records if record['peak_rss_mb'] is not None]
+        self._add({'file': self.name, 'stage': 'total', 'sheet': None, 'rows': self.rows, 'columns': self.columns,
+            'output_rows': None, 'wall_seconds': time.perf_counter() - self._wall,
+            'cpu_seconds': None if self._overlapped else time.process_time() - self._cpu, 'peak_rss_mb': max(peaks) if peaks else None,
+            'started': self._started})
+
+    def _add(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            try:
+                self.callback(dict(record))
+            except Exception as error:
+                # monitoring must not stop the profile
+                self.log.exception(f'metrics_callback failed for stage {record["stage"]}, it is not called again for '
+                    f'{self.name} - {error}')
+                self.callback = None
+
+    def frame(self):
+        """
+        returns: dataframe for the Profile_Metrics sheet, one row for each stage recorded so far
+        """
+        return pd.DataFrame(self.records, columns=list(METRICS_COLUMNS)).rename(columns=METRICS_COLUMNS)
+
+    def write_json(self, path):
+        """
+        Write the stages recorded to a JSON file
+        """
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({'file': self.name, 'started': self._started, 'rows': self.rows, 'columns': self.columns,
+                'stages': self.records}, handle, indent=2, default=str)
+
+
+def _check_metrics(metrics, metrics_callback=None):
+    if metrics is not None and metrics not in METRICS_OUTPUTS:
+        raise Exception(f"'{metrics}' is not a valid value for metrics, options are {METRICS_OUTPUTS} or None.")
+    if metrics_callback is not None and not callable(metrics_callback):
+        raise Exception('metrics_callback must be callable or None.')
+
+
+def _stage(metrics, stage, sheet=None):
+    """
+    returns: context measuring a stage, or doing nothing when metrics is None
+    """
+    if metrics is None:
+        return nullcontext({})
+    return metrics.stage(stage, sheet)
+
+
+def _max_value(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _peak_rss_mb():
+    """
+    returns: peak resident memory of the process in MB, since the last _reset_peak_rss() on Linux, None when it
+        cannot be determined on this platform
+    """
+    try:
+        with open('/proc/self/status') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _reset_peak_rss():
+    """
+    Reset the peak resident memory of the process to its current size, only supported on Linux
+    returns: True when the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as handle:
+            handle.write('5')
+    except OSError:
+        return False
+    return True
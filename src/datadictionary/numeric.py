@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# percentiles reported by default, those of pandas.DataFrame.describe()
+DEFAULT_PERCENTILES = [.25, .5, .75]
+# values further than this many interquartile ranges below the first or above the third quartile are outliers
+OUTLIER_IQR_FACTOR = 1.5
+HISTOGRAM_BINS = 10
+
+HISTOGRAM_COLUMNS = ['Column Name', 'Bin', 'Lower', 'Upper', 'Count']
+
+
+def _check_percentiles(percentiles):
+    """
+    returns: the percentiles sorted with the median included as describe() reports them, raises an Exception
+        for values that are not numbers from 0 to 1
+    """
+    if percentiles is None:
+        return DEFAULT_PERCENTILES
+    if (not isinstance(percentiles, (list, tuple)) or not percentiles
+            or not all(isinstance(q, (int, float)) and not isinstance(q, bool) and 0 <= q <= 1 for q in percentiles)):
+        raise Exception('percentiles must be a list of numbers from 0 to 1 or None.')
+    return sorted(set(percentiles) | {.5})
+
+
+def _percentile_label(q):
+    """
+    returns: name of the row of a percentile, "25%" for .25 as describe() names it
+    """
+    return f'{round(q * 100, 6):g}%'
+
+
+def _outlier_fences(q1, q3):
+    """
+    returns: tuple of the lowest and highest values that are not outliers, Tukey's fences
+    """
+    iqr = q3 - q1
+    return q1 - OUTLIER_IQR_FACTOR * iqr, q3 + OUTLIER_IQR_FACTOR * iqr
+
+
+def _shape_counts(df):
+    """
+    Count the zero, negative and outlying values of numeric columns held in memory
+    parameter: df - pandas DataFrame of numeric columns
+    returns: dataframe of the zeros, negatives and outliers counts of each column, indexed by those names
+    """
+    quartiles = df.quantile([.25, .75])
+    results = {}
+    for col in df.columns:
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        lower, upper = _outlier_fences(quartiles.loc[.25, col], quartiles.loc[.75, col])
+        results[col] = [np.count_nonzero(values == 0), np.count_nonzero(values < 0),
+            np.count_nonzero((values < lower) | (values > upper))]
+    return pd.DataFrame(results, index=['zeros', 'negatives', 'outliers'], columns=df.columns)
+
+
+def _histogram(values, bins, weights=None):
+    """
+    parameter: values - array of numbers, NaN values are ignored
+    parameter: weights - array default None, the count of each value when values are distinct values
+    returns: tuple of the bin edges, bins equal width bins from the minimum to the maximum, and the count of
+        each bin. The last bin includes the maximum
+    """
+    kept = ~np.isnan(values)
+    if not kept.any():
+        return np.array([]), np.array([], dtype='int64')
+    counts, edges = np.histogram(values[kept], bins=bins, weights=None if weights is None else weights[kept])
+    return edges, counts.astype('int64')
+
+
+def _digest_histogram(digest, bins):
+    """
+    returns: tuple of the bin edges and the count of each bin estimated from a sketches._TDigest, the counts
+        add up to the values of the digest
+    """
+    if digest.n == 0:
+        return np.array([]), np.array([], dtype='int64')
+    if digest.min_value == digest.max_value:
+        return _histogram(np.array([digest.min_value]), bins, np.array([digest.n]))
+    edges = np.linspace(digest.min_value, digest.max_value, bins + 1)
+    cumulative = np.round(digest.cdf(edges) * digest.n)
+    cumulative[0], cumulative[-1] = 0, digest.n
+    return edges, np.diff(cumulative).astype('int64')
+
+
+def _histogram_frame(histograms):
+    """
+    parameter: histograms - dict of a tuple of bin edges and counts for each column name
+    returns: dataframe of the Numeric_Histogram sheet, one row for each bin of each column
+    """
+    rows = []
+    for col, (edges, counts) in histograms.items():
+        for i, count in enumerate(counts):
+            rows.append([col, i + 1, edges[i], edges[i + 1], int(count)])
+    return pd.DataFrame(rows, columns=HISTOGRAM_COLUMNS)
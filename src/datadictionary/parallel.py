@@ -0,0 +1,153 @@
+import os
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from .columnar import COLUMNAR_SUFFIXES
+from .excel import _unit_name, EXCEL_STREAM_SUFFIXES
+
+# rough ratio of the memory pandas needs to the size of the file on disk
+TEXT_MEMORY_FACTOR = 6
+EXCEL_MEMORY_FACTOR = 12
+# parquet and feather files are compressed, memory mapped columns without NULL values are not copied
+COLUMNAR_MEMORY_FACTOR = 8
+
+SUMMARY_COLUMNS = ['File', 'Size MB', 'Status', 'Seconds', 'Error']
+
+# ProfileData of a worker process, created by its first file
+_worker_profiler = None
+
+
+def _physical_memory_mb():
+    """
+    returns: total physical memory in MB, None when it cannot be determined on this platform
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2 ** 20
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _estimate_memory_mb(path_obj, size, streaming=False, max_memory_mb=256):
+    """
+    Estimate the peak memory needed to profile a file
+    parameter: size - integer, size of the file in bytes
+    returns: estimated memory in MB
+    """
+    size_mb = size / 2 ** 20
+    if path_obj.suffix in ['.csv', '.tsv', '.txt']:
+        if streaming:
+            return max_memory_mb
+        return size_mb * TEXT_MEMORY_FACTOR
+    if path_obj.suffix in COLUMNAR_SUFFIXES:
+        if streaming:
+            return max_memory_mb
+        return size_mb * COLUMNAR_MEMORY_FACTOR
+    if streaming and path_obj.suffix in EXCEL_STREAM_SUFFIXES:
+        return max_memory_mb
+    return size_mb * EXCEL_MEMORY_FACTOR
+
+
+def _profile_file(path_obj, sheet, dest_dir, kwargs):
+    """
+    Profile one file, or one sheet of a workbook, in a worker process
+    returns: tuple of the status returned by ProfileData._process_file and the seconds taken
+    """
+    global _worker_profiler
+    # imported here because config imports this module
+    from .config import ProfileData
+    # one ProfileData for each worker process, the date formats it finds are tried first in its later files
+    if _worker_profiler is None:
+        _worker_profiler = ProfileData()
+    profiler = _worker_profiler
+    profiler.destination_dir = Path(dest_dir)
+    start = time.perf_counter()
+    status = profiler._process_file(path_obj, sheet, **kwargs)
+    return status, time.perf_counter() - start
+
+
+def _run_pool(units, dest_dir, workers, memory_budget_mb, log, **kwargs):
+    """
+    Profile files across a pool of processes, largest files first. A file is only started while the
+    estimated memory of the files in progress stays within memory_budget_mb, a file larger than the
+    budget is profiled on its own. A file that fails does not stop the others. When a worker dies the files
+    running in its pool are profiled again once, each on its own, so only a file that kills its worker again fails.
+    The sheets of a workbook split into its sheets are profiled in parallel like files, each estimated to
+    need an equal share of the memory of the workbook.
+    parameter: units - list of tuples of a path and a sheet of it or None, see excel._sheet_units()
+    parameter: dest_dir - directory for profiles to be written
+    parameter: workers - integer > 0, number of processes
+    parameter: memory_budget_mb - number > 0 or None, total memory budget for the files in progress
+    kwargs: keyword arguments passed to ProfileData._process_file
+    returns: dataframe summary with one row for each file
+    """
+    # the sizes are taken once, a file may be moved away once it is profiled
+    sizes = {unit: unit[0].stat().st_size for unit in units}
+    pending = sorted(units, key=lambda unit: sizes[unit], reverse=True)
+    sheets = {}
+    for path_obj, _ in pending:
+        sheets[path_obj] = sheets.get(path_obj, 0) + 1
+    estimates = {}
+    for path_obj, sheet in pending:
+        streamed = kwargs.get('streaming', False) and path_obj.suffix in EXCEL_STREAM_SUFFIXES
+        estimate = _estimate_memory_mb(path_obj, sizes[path_obj, sheet], kwargs.get('streaming', False),
+            kwargs.get('max_memory_mb', 256))
+        # a streamed sheet is held to max_memory_mb, the sheets read whole share the memory of the workbook
+        estimates[path_obj, sheet] = estimate if streamed else estimate / sheets[path_obj]
+    results = []
+    running = {}
+    # files running when a worker died, profiled again on their own
+    retried = set()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            in_use = sum(estimates[unit] for unit in running.values())
+            while pending and len(running) < workers:
+                if running:
+                    if any(unit in retried for unit in pending + list(running.values())):
+                        # wait for the others to finish, a file profiled again runs alone
+                        break
+                    fits = [unit for unit in pending
+                        if memory_budget_mb is None or in_use + estimates[unit] <= memory_budget_mb]
+                    if not fits:
+                        break
+                    unit = fits[0]
+                else:
+                    unit = next((unit for unit in pending if unit in retried), pending[0])
+                pending.remove(unit)
+                in_use += estimates[unit]
+                running[executor.submit(_profile_file, *unit, dest_dir, kwargs)] = unit
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                unit = running.pop(future)
+                name = _unit_name(*unit)
+                size_mb = round(sizes[unit] / 2 ** 20, 3)
+                try:
+                    status, seconds = future.result()
+                    results.append([name, size_mb, status, round(seconds, 3), None])
+                    log.info(f'{name} {status} in {seconds:.2f}s')
+                except BrokenProcessPool as error:
+                    broken = True
+                    if unit in retried:
+                        results.append([name, size_mb, 'failed', None, f'worker process died - {error}'])
+                        log.error(f'{name} failed, the worker process died')
+                    else:
+                        # the worker may have been killed by another file of the pool
+                        retried.add(unit)
+                        pending.append(unit)
+                        log.warning(f'{name} is profiled again, a worker process died')
+                except Exception as error:
+                    results.append([name, size_mb, 'failed', None, str(error)])
+                    log.error(f'{name} failed - {error}')
+
+            if broken:
+                # files still running in the broken pool fail on the next wait and are profiled again, start a new
+                # pool for them and the rest
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(wait=True)
+    return pd.DataFrame(results, columns=SUMMARY_COLUMNS)
@@ -0,0 +1,24 @@
+import re
+
+# column names that look like identifiers or codes
+ID_COL_PAT = re.compile(r"(?:^id$|^ID$)|(?:[-_\s]+id|[-_\s]+ID$)|(?:[a-z]+ID$)|(?:[-_\s]+code)",)
+
+# column names that suggest the column holds PII
+PII_COL_PAT = re.compile(r'(?:last|full|first|family|given)\s*\S*(?:name|nm)|' \
+                        r'\S*\s*(?:address|addr)|(?:e\S*\s*mail)|' \
+                        r'(?:tel|tele)\S*(?:phone|no)|(?:phone)', re.IGNORECASE)
+
+# values that suggest the column holds PII
+TELEPHONE_PAT = re.compile(r'\d{10,13}') # re.compile(r'(?:\(*\+*\d+\-*\.*\s*\(*\d+\)*\-*\.*\s*\d+\-*\.*\s*\d+)')
+# text with 10 or more digits once separators are removed, TELEPHONE_PAT without stripping the non digits first
+TELEPHONE_TEXT_PAT = re.compile(r'(?:\d\D*){9}\d')
+EMAIL_PAT = re.compile(r'(?:\S+@\S+\.\S+)')
+STREET_ADDRESS_PAT = re.compile(r'(?:\d+\s+[a-zA-Z0-9\-]+\s*[a-zA-Z0-9\-]*)')
+
+# pandas dtypes treated as numeric by the profile sheets
+NUMERIC_DTYPES = ['int', 'int64', 'int32', 'int16', 'int8', 'float', 'float64', 'float32']
+
+# replace obscure data type names with clear names
+DATA_TYPE_NAMES = {'datetime64[ns]': 'date/datetime', 'object':'text', 'int': 'integer',
+    'int8': 'integer', 'int16': 'integer', 'int32': 'integer', 'int64': 'integer', 'float': 'decimal', 
+    'float32': 'decimal', 'float64': 'decimal',}
@@ -0,0 +1,174 @@
+import re
+import pandas as pd
+from .patterns import TELEPHONE_PAT, TELEPHONE_TEXT_PAT, EMAIL_PAT, STREET_ADDRESS_PAT, NUMERIC_DTYPES
+from .compaction import _dtype_name, _used_categories
+
+# values searched at a time, a column stops being scanned after the first block with a match
+SCAN_BLOCK_ROWS = 10000
+# confidence level of the match rate bound reported for sampled columns
+CONFIDENCE = 0.95
+
+COLUMN_KINDS = ('text', 'numeric', 'other')
+
+
+class PIIDetector:
+    """
+    A pattern that flags a column as a potential PII column when any value of the column matches it
+    """
+    def __init__(self, name, pattern, kinds=('text',)):
+        """
+        parameter: name - string reported for the columns the detector flags ex. 'ssn'
+        parameter: pattern - regular expression string or compiled pattern, searched for in each value rendered as text
+        parameter: kinds - tuple of the kinds of column searched default ('text',), options are 'text' (object dtype),
+            'numeric' (integer and decimal dtypes) and 'other' (boolean, date/datetime and other dtypes)
+        """
+        if not isinstance(name, str) or not name:
+            raise Exception('PII detector name must be a non-empty string.')
+        if isinstance(kinds, str):
+            kinds = (kinds,)
+        if not kinds or any(kind not in COLUMN_KINDS for kind in kinds):
+            raise Exception(f"PII detector kinds must be one or more of {COLUMN_KINDS}.")
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.kinds = tuple(kinds)
+
+    def __repr__(self):
+        return f'PIIDetector({self.name!r}, {self.pattern.pattern!r}, kinds={self.kinds})'
+
+
+# detectors every column is scanned with, in the order a column's match is reported
+PII_DETECTORS = [
+    PIIDetector('telephone', TELEPHONE_TEXT_PAT, kinds=('text',)),
+    PIIDetector('telephone', TELEPHONE_PAT, kinds=('numeric', 'other')),
+    PIIDetector('email', EMAIL_PAT, kinds=COLUMN_KINDS),
+    PIIDetector('street_address', STREET_ADDRESS_PAT, kinds=('text',)),
+]
+
+
+def register_pii_detector(name, pattern, kinds=('text',)):
+    """
+    Add a detector that every profile created afterwards in this process scans columns with. To use a detector
+    in the worker processes of process_directory(workers=...), pass it with pii_detectors= instead.
+    ex. register_pii_detector('ssn', r'\\b\\d{3}-\\d{2}-\\d{4}\\b')
+    parameter: name - string reported for the columns the detector flags
+    parameter: pattern - regular expression string or compiled pattern
+    parameter: kinds - tuple of the kinds of column searched default ('text',), see PIIDetector
+    returns: the PIIDetector added
+    """
+    detector = PIIDetector(name, pattern, kinds)
+    PII_DETECTORS.append(detector)
+    return detector
+
+
+class _PIIScanner:
+    """
+    Search the values of a column for every PII detector at once. All the detectors that apply to a kind of
+    column are fused into one regular expression, so each value is rendered as text and searched once, and
+    a column is only searched until the first block of values with a match.
+    """
+    def __init__(self, detectors=None, sample=None, seed=0):
+        """
+        parameter: detectors - list of PIIDetector default None, detectors used in addition to PII_DETECTORS
+        parameter: sample - integer > 0 default None, most non NULL values searched in each column (or chunk
+            of a streamed column), chosen at random. All values are searched when None
+        parameter: seed - integer default 0, seed of the random sample
+        """
+        self.detectors = list(PII_DETECTORS) + list(detectors or [])
+        self.sample = sample
+        self.seed = seed
+        self._patterns = {}
+
+    def _fused_pattern(self, kind):
+        if kind not in self._patterns:
+            detectors = [detector for detector in self.detectors if kind in detector.kinds]
+            pattern = None
+            if detectors:
+                try:
+                    pattern = re.compile('|'.join(_scoped(detector.pattern) for detector in detectors))
+                except re.error as error:
+                    raise Exception(f'PII detector patterns cannot be combined, check for repeated group names - {error}')
+            self._patterns[kind] = (detectors, pattern)
+        return self._patterns[kind]
+
+    def scan(self, series, distinct=None):
+        """
+        parameter: series - pandas series of the column values
+        parameter: distinct - Index default None, the distinct non NULL values of the column in the order they are
+            first seen, searched instead of the rows when every value is searched
+        returns: tuple of the name of the first detector matching a value (None when no value matched),
+            the number of values searched and the number of non NULL values
+        """
+        detectors, pattern = self._fused_pattern(_column_kind(series))
+        total = series.count()
+        if pattern is None or total == 0:
+            # no detector applies to the column
+            return None, total, total
+        if self.sample is not None and total > self.sample:
+            values = series.dropna().sample(n=self.sample, random_state=self.seed)
+        elif distinct is not None:
+            # the first value to match is the same, the rows holding it are all searched
+            name = self._search(pd.Series(distinct), pattern, detectors)
+            return name, total, total
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            return self._search(_used_categories(series), pattern, detectors), total, total
+        else:
+            values = series.dropna()
+
+        scanned = 0
+        for start in range(0, len(values), SCAN_BLOCK_ROWS):
+            block = values.iloc[start:start + SCAN_BLOCK_ROWS]
+            scanned += len(block)
+            name = self._search(block, pattern, detectors)
+            if name is not None:
+                return name, scanned, total
+        return None, scanned, total
+
+    def _search(self, values, pattern, detectors):
+        """
+        returns: name of the first detector matching the first value that matches any detector, None when no
+            value matches
+        """
+        for start in range(0, len(values), SCAN_BLOCK_ROWS):
+            # repeated values are only searched once
+            text = pd.Series(pd.unique(values.iloc[start:start + SCAN_BLOCK_ROWS].to_numpy())).astype(str)
+            matches = text[text.str.contains(pattern, regex=True)]
+            if not matches.empty:
+                value = matches.iloc[0]
+                return next(detector.name for detector in detectors if detector.pattern.search(value))
+        return None
+
+
+def _scoped(pattern):
+    """
+    returns: the pattern as a non capturing group keeping its own flags, so it can be combined with others
+    """
+    flags = ''.join(letter for letter, flag in [('i', re.IGNORECASE), ('m', re.MULTILINE), ('s', re.DOTALL),
+        ('x', re.VERBOSE)] if pattern.flags & flag)
+    return f'(?{flags}:{pattern.pattern})'
+
+
+def _column_kind(series):
+    col_dtype = _dtype_name(series.dtype)
+    if col_dtype == 'object':
+        return 'text'
+    if col_dtype in NUMERIC_DTYPES:
+        return 'numeric'
+    return 'other'
+
+
+def _pii_detail(detector, scanned, total):
+    """
+    Describe why a column was or was not flagged as a potential PII column
+    parameter: detector - name of the detector that matched, None when no value matched
+    parameter: scanned - number of values searched
+    parameter: total - number of non NULL values
+    returns: the detector name, None when every value was searched without a match, otherwise the upper bound
+        of the share of values that could match given no match in the sample searched
+    """
+    if detector is not None:
+        return detector
+    if scanned >= total:
+        return None
+    # with no match in n random values the match rate is below 1 - (1 - confidence) ** (1 / n)
+    bound = 1 - (1 - CONFIDENCE) ** (1 / scanned)
+    return f'no match in {scanned} of {total} values, under {bound:.2%} match ({CONFIDENCE:.0%} confidence)'
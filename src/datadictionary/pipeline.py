@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+import pandas as pd
+from .parallel import SUMMARY_COLUMNS
+from .excel import _unit_name
+
+# marks the end of the files passed between the stages of the pipeline
+_DONE = object()
+
+
+def _run_pipeline(profiler, units, depth, log, **kwargs):
+    """
+    Profile files in three overlapping stages: a reader thread reads the next files, this thread computes the
+    sheets of the current file, and a writer thread writes the profiles of the files already computed. The stages
+    are joined by queues of at most depth files, a stage waits while the next one is behind, so at most depth files
+    are read ahead and depth profiles wait to be written. The threads overlap waiting on disk and network reads and
+    writes with profiling, pandas and the writers hold the GIL for most of their other work. A file that fails
+    does not stop the others.
+    parameter: profiler - ProfileData, its destination_dir is where the profiles are written
+    parameter: units - list of tuples of a path and a sheet of it or None, see excel._sheet_units(), in the order
+        they are profiled
+    parameter: depth - integer > 0, most files waiting between two stages
+    kwargs: keyword arguments passed to ProfileData._read_file
+    returns: dataframe summary with one row for each file
+    """
+    read_queue = queue.Queue(maxsize=depth)
+    write_queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    results = {}
+    # size of each file when it was read, a file may be moved away once it is profiled
+    sizes = {}
+
+    def record(unit, start, status, error=None):
+        path_obj, sheet = unit
+        seconds = None if status == 'failed' else round(time.perf_counter() - start, 3)
+        size_mb = round(sizes[unit] / 2 ** 20, 3) if unit in sizes else None
+        results[unit] = [_unit_name(path_obj, sheet), size_mb, status, seconds, error]
+        if error is not None:
+            log.error(f'{_unit_name(path_obj, sheet)} failed - {error}')
+
+    def put(stage_queue, item):
+        # a stage stops waiting for room once the pipeline is stopped
+        while not stop.is_set():
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def get(stage_queue):
+        while not stop.is_set():
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def read():
+        for unit in units:
+            if stop.is_set():
+                break
+            start = time.perf_counter()
+            try:
+                sizes[unit] = unit[0].stat().st_size
+                job = profiler._read_file(*unit, **kwargs)
+            except Exception as error:
+                record(unit, start, 'failed', str(error))
+                continue
+            if isinstance(job, str):
+                record(unit, start, job)
+            else:
+                put(read_queue, (start, job))
+        put(read_queue, _DONE)
+
+    def write():
+        while True:
+            item = get(write_queue)
+            if item is _DONE:
+                return
+            start, job, sheets = item
+            try:
+                results_file = profiler._write_profile(job['fo'], sheets, job['output_format'], job['metrics'])
+                record((job['path_obj'], job['sheet']), start, profiler._finish_file(job, results_file))
+            except Exception as error:
+                record((job['path_obj'], job['sheet']), start, 'failed', str(error))
+
+    reader = threading.Thread(target=read, name='datadictionary-reader', daemon=True)
+    writer = threading.Thread(target=write, name='datadictionary-writer', daemon=True)
+    reader.start()
+    writer.start()
+    try:
+        while True:
+            item = get(read_queue)
+            if item is _DONE:
+                break
+            start, job = item
+            try:
+                profiler.log.info('Creating Output File')
+                sheets = list(profiler._profile_sheets(job['fo'], job['metrics']))
+            except Exception as error:
+                record((job['path_obj'], job['sheet']), start, 'failed', str(error))
+                continue
+            # only the sheets wait to be written, not the data they were computed from
+            job['fo'].release_data()
+            put(write_queue, (start, job, sheets))
+        put(write_queue, _DONE)
+        writer.join()
+    finally:
+        stop.set()
+        reader.join()
+        writer.join()
+    return pd.DataFrame([results[unit] for unit in units if unit in results], columns=SUMMARY_COLUMNS)
@@ -1,18 +1,39 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-import logging
 import re
+from .patterns import ID_COL_PAT, PII_COL_PAT, NUMERIC_DTYPES
+from .datatypes import _column_stats, _data_types_frame
+from .sketches import _HyperLogLog, _HeavyHitters, _sketch_distinct_values, HEAVY_HITTERS_FACTOR
+from .pii import PIIDetector, _PIIScanner, _pii_detail
+from .keys import _find_keys, _keys_frame, MAX_COMBINATIONS
+from .columnar import _read_columnar, _iter_columnar, _columnar_metadata, COLUMNAR_SUFFIXES
+from .sampling import _reservoir_sample, _sample_rows, _sample_row_groups, _sample_estimates, _sample_basis, SAMPLE_CHUNK_ROWS
+from .metrics import _stage
+from .logs import _root_logger
+from .dates import _convert_to_datetime
+from .compaction import _compact, _value_counts, _dtype_name
+from .colstats import _ColumnStats
+from .colworkers import _column_map
+from .numeric import _check_percentiles, _shape_counts, _histogram, _histogram_frame, HISTOGRAM_BINS
+from .excel import _iter_excel, EXCEL_SUFFIXES, EXCEL_STREAM_SUFFIXES, EXCEL_STREAM_KWARGS
+
+# rows fed to the approximate distinct value sketches at a time
+SKETCH_ROWS = 100000
 
 class _FileObj:
     def __init__(self, path_obj, dataframe=None, dataframe_name=None, 
     colname_chars_replace_underscore="", colname_chars_replace_custom={},
     colname_chars_remove="", sample_data=500, interpret_date_timestamp=False,
-    interpret_date_timestamp_errors="raise", **kwargs):
+    interpret_date_timestamp_errors="raise", approximate_distinct=False, top_k=100, pii_sample=None,
+    pii_detectors=None, profile_sample=None, date_formats=None, compact=False,
+    column_workers=None, percentiles=None, numeric_detail=False, histogram_bins=HISTOGRAM_BINS, **kwargs):
         """
         Create a FileObj instance that has a single attribute, df which is a pandas dataframe
-        supports xls, xlsx, csv, tsv files. Only the first worksheet in an Excel workbook
-        with multiple sheets will be read.
-        param: use any keyword parameters valid in pandas.read_csv()
+        supports xls, xlsx, xlsm, csv, tsv, parquet, feather and arrow files. One worksheet of an Excel workbook is
+        read, the first unless sheet_name is passed.
+        param: use any keyword parameters valid in pandas.read_csv(), or pyarrow.parquet.read_table() and
+            pyarrow.feather.read_table() for parquet, feather and arrow files ex. columns=['a', 'b']
         parameter: dataframe - default None; a pandas DataFrame object to be profiled
         parameter: dataframe_name - default None; a unique string for the DataFrame, will be used as the
             filename for the dataframe profile ex. DataFrame_Name_profile.xlsx
@@ -23,18 +44,41 @@ class _FileObj:
         parameter: interpret_date_timestamp_errors - text default "raise", options are "raise", "ignore", "coerce".
             "raise" will raise errors on values that cannot be converted, "ignore" will not raise errors and returns the 
             input data, "coerce" will return NaT values when they cannot be converted.
+        parameter: approximate_distinct - boolean default False, estimate the distinct values of each text column and
+            report only the most frequent values with error bounds, in fixed memory for each column
+        parameter: top_k - integer > 0 default 100, number of most frequent values reported when approximate_distinct=True
+        parameter: pii_sample - integer > 0 default None, most values of each column searched for PII, chosen at
+            random, a PII Detail column reports the confidence for columns not flagged. All values are searched when None
+        parameter: pii_detectors - list of PIIDetector default None, detectors searched for in addition to the
+            telephone, email and street address detectors
+        parameter: profile_sample - integer > 0 default None, profile this many rows chosen at random instead of every
+            row, text files are read in chunks keeping only the sample and Parquet files read only some row groups
+        parameter: date_formats - dict default None, date format found for each column name by interpret_date_timestamp,
+            shared by the files of a directory so a format found in one file is tried first in the next
+        parameter: compact - boolean default False, once read hold text columns with few distinct values as
+            categoricals, other text columns as Arrow backed strings and integers in the smallest integer dtype,
+            the profile is the same in less memory, see compaction._compact()
+        parameter: column_workers - integer > 0 default None, number of processes the date detection, PII scan and
+            value counts of each column are spread across, see colworkers._column_map()
+        parameter: percentiles - list of numbers from 0 to 1 default None, percentiles reported on the
+            Numeric_Value_Dist sheet, the 25th, 50th and 75th when None. The 50th is always reported
+        parameter: numeric_detail - boolean default False, add the zero, negative and outlier counts of each numeric
+            column to the Numeric_Value_Dist sheet and a Numeric_Histogram sheet
+        parameter: histogram_bins - integer > 0 default 10, equal width bins of each column on the Numeric_Histogram
+            sheet
         """
         # Initialize logging
-        self.log = logging.getLogger()
-        self.log.handlers = []
-        self.log.setLevel(logging.INFO)
-        log_fmt = logging.Formatter('%(levelname)s: %(asctime)s %(thread)d %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-        screen = logging.StreamHandler()
-        screen.setFormatter(log_fmt)
-        self.log.addHandler(screen)
+        self.log = _root_logger()
         
         # df_name must be unique to create unique output filenames
         self.df_name = None
+        self.df = None
+        # statistics read from the file metadata without decoding the values, see columnar._columnar_metadata()
+        self.metadata_stats = None
+        # stage metrics set by ProfileData when metrics are recorded, see metrics._ProfileMetrics
+        self.metrics = None
+        # statistics of the columns of self.df shared by the sheets, see column_stats()
+        self._column_stats = None
 
         # update default replace with underscore characters with user-defined characters
         escape_string = r'\/()[]{},.!?:;-^~`' + colname_chars_replace_underscore
@@ -50,6 +94,7 @@ class _FileObj:
         if interpret_date_timestamp in [True, False] and interpret_date_timestamp_errors in ["raise", "ignore", "coerce"]:
             self.interpret_date_timestamp = interpret_date_timestamp
             self.interpret_date_timestamp_errors = interpret_date_timestamp_errors
+        self.date_formats = {} if date_formats is None else date_formats
         
         # update colname_chars_replace_custom with user-defined dict
         colname_chars_replace_custom_default.update(colname_chars_replace_custom)
@@ -67,7 +112,55 @@ class _FileObj:
             self.sample_data = sample_data
         else: 
             raise Exception('sample_data must be an integer > 0 or None.')
-        
+
+        # set approximate distinct value attributes
+        if approximate_distinct not in [True, False]:
+            raise Exception(f"'{approximate_distinct}' is not a valid value for approximate_distinct.")
+        if not isinstance(top_k, int) or top_k < 1:
+            raise Exception('top_k must be an integer > 0.')
+        self.approximate_distinct = approximate_distinct
+        self.top_k = top_k
+
+        # set PII scanning attributes
+        if not ((isinstance(pii_sample, int) and pii_sample > 0) or pii_sample is None):
+            raise Exception('pii_sample must be an integer > 0 or None.')
+        if pii_detectors is not None and not all(isinstance(detector, PIIDetector) for detector in pii_detectors):
+            raise Exception('pii_detectors must be a list of PIIDetector.')
+        self.pii_sample = pii_sample
+        self.pii_scanner = _PIIScanner(pii_detectors, pii_sample)
+
+        # set profile sampling attributes, total_rows is the rows the sample was chosen from
+        if not ((isinstance(profile_sample, int) and profile_sample > 0) or profile_sample is None):
+            raise Exception('profile_sample must be an integer > 0 or None.')
+        self.profile_sample = profile_sample
+        self.total_rows = None
+
+        # set compaction attribute
+        if compact not in [True, False]:
+            raise Exception(f"'{compact}' is not a valid value for compact.")
+        self.compact = compact
+
+        # set column parallelism attribute
+        if not ((isinstance(column_workers, int) and column_workers > 0) or column_workers is None):
+            raise Exception('column_workers must be an integer > 0 or None.')
+        self.column_workers = column_workers
+
+        # set numeric distribution attributes
+        self.percentiles = _check_percentiles(percentiles)
+        if numeric_detail not in [True, False]:
+            raise Exception(f"'{numeric_detail}' is not a valid value for numeric_detail.")
+        if not isinstance(histogram_bins, int) or isinstance(histogram_bins, bool) or histogram_bins < 1:
+            raise Exception('histogram_bins must be an integer > 0.')
+        self.numeric_detail = numeric_detail
+        self.histogram_bins = histogram_bins
+
+        self._load(path_obj, dataframe=dataframe, dataframe_name=dataframe_name, **kwargs)
+
+
+    def _load(self, path_obj, dataframe=None, dataframe_name=None, **kwargs):
+        """
+        Read the source into self.df, subclasses override this to read the source differently
+        """
         # log.info('Creating FileObj')
         if path_obj == 'dataframe':
             if dataframe is None:
@@ -78,29 +171,99 @@ class _FileObj:
                     raise Exception('If profiling a dataframe, argument dataframe_name must be a unique string')
                 else:
                     self.df_name = dataframe_name
+                if self.profile_sample is not None:
+                    self.df, self.total_rows = _reservoir_sample([dataframe], self.profile_sample)
         elif path_obj.is_file():
-            if path_obj.suffix in('.xls', '.xlsx'):
+            if path_obj.suffix in EXCEL_SUFFIXES:
                 try:
-                    self.df = pd.read_excel(path_obj, **kwargs)
+                    if (self.profile_sample is not None and path_obj.suffix in EXCEL_STREAM_SUFFIXES
+                            and all(key in EXCEL_STREAM_KWARGS for key in kwargs)):
+                        # the sheet is read row by row, only the sample is held
+                        self.df, self.total_rows = _reservoir_sample(_iter_excel(path_obj, SAMPLE_CHUNK_ROWS,
+                            **kwargs), self.profile_sample)
+                    else:
+                        self.df = pd.read_excel(path_obj, **kwargs)
+                        if self.profile_sample is not None:
+                            self.df, self.total_rows = _reservoir_sample([self.df], self.profile_sample)
                 except Exception as error:
-                    self.log.exception(error)
+                    self.log.exception(f'{path_obj.name} was not parsed, please check file format and kwargs - {error}')
 
             elif path_obj.suffix in ['.csv', '.tsv', '.txt']:
                 try:
-                    self.df = pd.read_csv(path_obj, **kwargs)
+                    if self.profile_sample is not None and kwargs.get('engine') != 'pyarrow':
+                        # only the sample is held, each chunk is dropped once its sampled rows are kept
+                        with pd.read_csv(path_obj, chunksize=kwargs.pop('chunksize', SAMPLE_CHUNK_ROWS),
+                                **kwargs) as reader:
+                            self.df, self.total_rows = _reservoir_sample(reader, self.profile_sample)
+                    else:
+                        self.df = pd.read_csv(path_obj, **kwargs)
+                        if self.profile_sample is not None:
+                            self.df, self.total_rows = _reservoir_sample([self.df], self.profile_sample)
+                except Exception as error:
+                    self.log.exception(f'{path_obj.name} was not parsed, please check file format and kwargs - {error}')
+
+            elif path_obj.suffix in COLUMNAR_SUFFIXES:
+                try:
+                    if self.profile_sample is not None and path_obj.suffix == '.parquet':
+                        self.df, self.total_rows = _sample_row_groups(path_obj, self.profile_sample,
+                            kwargs.get('columns'))
+                    elif self.profile_sample is not None:
+                        self.df, self.total_rows = _reservoir_sample(_iter_columnar(path_obj, SAMPLE_CHUNK_ROWS,
+                            kwargs.get('columns')), self.profile_sample)
+                    else:
+                        self.df = _read_columnar(path_obj, **kwargs)
+                        self.metadata_stats = _columnar_metadata(path_obj, kwargs.get('columns'))
                 except Exception as error:
                     self.log.exception(f'{path_obj.name} was not parsed, please check file format and kwargs - {error}')
         else:
             raise Exception(f'{path_obj.name} is not a file.  Please use a valid text or excel file')
+
+        if self.df is not None and self.total_rows is not None:
+            self.log.info(f'Profiling a random sample of {len(self.df)} of {self.total_rows} rows')
             
-        if self.df:
+        if self.df is not None:
             # log.info('Created FileObj')
             self.id_cols = []
             self.dim_cols = []
             self.path_obj = path_obj
-            self.sample_data_export = self.df.copy().head(self.sample_data)
+            # only the rows exported are copied, before compaction so they are written as read
+            self.sample_data_export = (None if self.sample_data is None
+                else _sample_rows(self.df, self.sample_data))
+            if self.compact:
+                self.df = _compact(self.df)
+
+
+    def has_data(self):
+        """
+        returns: True if the source was read and can be profiled
+        """
+        return self.df is not None
+
+
+    def release_data(self):
+        """
+        Drop the data read once the profile sheets are computed, the sheets are written without it
+        """
+        self.df = None
+        self._column_stats = None
+
+
+    def data_shape(self):
+        """
+        returns: tuple of the number of rows and columns profiled
+        """
+        return (0, 0) if self.df is None else self.df.shape
         
         
+    def column_stats(self):
+        """
+        returns: the colstats._ColumnStats of self.df, started again when self.df is replaced
+        """
+        if self._column_stats is None or self._column_stats.df is not self.df:
+            self._column_stats = _ColumnStats(self.df)
+        return self._column_stats
+
+
     def get_columns(self):
         """
         Not currently used as the column list is contained in the more comprehensive Data Types output 
@@ -117,129 +280,127 @@ class _FileObj:
         """
         self.log.info('Retrieving Data Types')
 
-        if self.interpret_date_timestamp:
+        if self.interpret_date_timestamp and self.column_workers is None:
             # attempt explicit date transformation for object cols not automatically detected as dates
             self.df = self.df.apply(lambda x: self.convert_to_datetime(x, self.interpret_date_timestamp_errors))
-                
-        df = pd.DataFrame(self.df.dtypes, columns=['Data Type'])
-        df.index.name = 'Column Name'
-        df = df.reset_index()
+        elif self.interpret_date_timestamp:
+            self._convert_columns()
+
+        # text columns are factorized across the column workers before the lengths and PII scan need them
+        self._factorize_columns([col for col in self.df.columns if _dtype_name(self.df[col].dtype) == 'object'])
+
+        # compute every metric in one vectorized pass per dtype group, converted dates no longer match the metadata
+        stats = _column_stats(self.df, metadata=None if self.interpret_date_timestamp else self.metadata_stats,
+            column_stats=self.column_stats())
+        df = _data_types_frame(stats)
 
         df['Clean Column Name'] = self.clean_column_names(df['Column Name'])
             
         # identify ID columns
-        id_col_pat = re.compile(r"(?:^id$|^ID$)|(?:[-_\s]+id|[-_\s]+ID$)|(?:[a-z]+ID$)|(?:[-_\s]+code)",)
-        df['Potential ID Column'] = df['Column Name'].apply(lambda x: True if re.search(id_col_pat, x) else None)
+        df['Potential ID Column'] = df['Column Name'].apply(lambda x: True if re.search(ID_COL_PAT, x) else None)
         # set FileObj attribute "ID Columns", referenced in dim_cols below
         self.id_cols = df.loc[df['Potential ID Column'] == True, 'Column Name'].tolist()
 
-        # identify the proper data type
-        for col in self.df.columns:
-            # set string representation of pandas series dtype
-            col_dtype = str(self.df[col].dtype)
-
-            if self.df[col].count() > 0:
-                if col_dtype in ['object', 'bool'] or 'datetime' in col_dtype:
-                    col_values_precision_series = self.df[col].astype('str').str.len()
-                    max_precision_value = max(col_values_precision_series)
-                    min_precision_value = min(col_values_precision_series)
-                elif col_dtype in ['int', 'int64', 'int32']:
-                    max_precision_value = self.df[col].max()
-                    min_precision_value = self.df[col].min()
-                elif col_dtype in ['float', 'float64', 'float32']:
-                    col_values_precision_series = self.df[col].astype('str')
-                    col_values_precision_df = col_values_precision_series.str.split('.', expand=True)
-                    # precision
-                    min_precision_value = max(col_values_precision_df[0].str.len() + col_values_precision_df[1].str.len())
-                    # scale
-                    max_precision_value = max(col_values_precision_df[1].str.len())
-                    # check if the Data Type could be int
-                    try:
-                        if col_values_precision_df[1].fillna('0').astype('int64').sum() == 0:
-                            df.loc[df['Column Name'] == col, 'Data Type'] = 'decimal or integer'
-                    except ValueError:
-                        # pass because this should catch INT overflow that has no negative affect on output
-                        pass
-                else:
-                    min_precision_value = 'dtype not supported'
-                    max_precision_value = 'dtype not supported'
-            else:
-                min_precision_value = 0
-                max_precision_value = 0
-                df.loc[df['Column Name'] == col, 'Data Type'] = 'N/A'
-                
-            df.loc[df['Column Name'] == col, 'Min Length|Value/Precision'] = min_precision_value
-            df.loc[df['Column Name'] == col, 'Max Length|Value/Scale'] = max_precision_value
-
-            # check for NULL values
-            if sum(self.df[col].isna()) > 0:
-                nullable_value = True
-            else:
-                nullable_value = None
-            
-            df.loc[df['Column Name'] == col, 'Nullable'] = nullable_value
-
-            # set FileObj attribute "Dim Columns"
-            if self.df[col].dtype == 'object' and col not in self.id_cols:
-                self.dim_cols.append(col)
-
-        # replace obscure data type names with clear names
-        replace_dict = {'datetime64[ns]': 'date/datetime', 'object':'text', 'int': 'integer',
-        'int8': 'integer', 'int32': 'integer', 'int64': 'integer', 'float': 'decimal', 
-        'float32': 'decimal', 'float64': 'decimal',}
-        df['Data Type'] = df['Data Type'].replace(to_replace=replace_dict)
-
-        # identify potential PII columns
-        pii_col_pat = re.compile(r'(?:last|full|first|family|given)\s*\S*(?:name|nm)|' \
-                                r'\S*\s*(?:address|addr)|(?:e\S*\s*mail)|' \
-                                r'(?:tel|tele)\S*(?:phone|no)|(?:phone)', re.IGNORECASE)
-        pii_col_name_df = df['Column Name'].apply(lambda x: True if re.search(pii_col_pat, x) else None)
-        pii_col_name_cols = df.loc[pii_col_name_df.notna(), 'Column Name'].to_list()
-
-        # look for columns containing PII not already flagged as potential PII columns
-        # columns with telephone numbers
-        remaining_columns = [col for col in df['Column Name'] if col not in pii_col_name_cols]
-        telephone_pat = re.compile(r'\d{10,13}') # re.compile(r'(?:\(*\+*\d+\-*\.*\s*\(*\d+\)*\-*\.*\s*\d+\-*\.*\s*\d+)')
-        tel_no_df = (self.df[remaining_columns].replace(to_replace=r'\D', value='', regex=True)
-                        .apply(lambda x: x.astype(str).str.contains(telephone_pat, regex=True), axis=0))
-        tel_no_cols = tel_no_df.any(axis=0)
-        tel_no_cols = list(tel_no_cols[tel_no_cols].index)
-
-        pii_cols = pii_col_name_cols + tel_no_cols
-
-        # columns with email addresses
-        remaining_columns = [col for col in df['Column Name'] if col not in pii_cols]
-        email_pat = re.compile(r'(?:\S+@\S+\.\S+)')
-        email_df = self.df[remaining_columns].apply(lambda x: x.astype(str).str.contains(email_pat, regex=True), axis=0)
-        email_cols = email_df.any(axis=0)
-        email_cols = list(email_cols[email_cols].index)
-
-        # add email_cols to list of potential pii fields
-        pii_cols += email_cols
-
-        # columns with street addresses
-        remaining_columns = []
-        for col in df['Column Name']:
-            if (col not in pii_cols 
-                    and not df[(df['Column Name'] == col) & (df['Data Type'] == 'text')].empty):
-                remaining_columns.append(col)
-            
-        street_address_pat = re.compile(r'(?:\d+\s+[a-zA-Z0-9\-]+\s*[a-zA-Z0-9\-]*)')
-        street_address_df = (self.df[remaining_columns]
-                                        .apply(lambda x: x.astype(str).str.contains(street_address_pat, regex=True), axis=0))
-        street_address_cols = street_address_df.any(axis=0)
-        street_address_cols = list(street_address_cols[street_address_cols].index)
-
-        # add street_address_cols to list of potential pii fields
-        pii_cols += street_address_cols
+        # set FileObj attribute "Dim Columns"
+        self.dim_cols = [col for col, col_dtype in stats['dtype'].items()
+            if col_dtype == 'object' and col not in self.id_cols]
+
+        # identify potential PII columns by name, then search the values of the other columns for every
+        # PII detector in one pass per column
+        pii_cols = []
+        pii_details = {}
+        with _stage(self.metrics, 'pii_scan', 'Data_Types'):
+            cols = df['Column Name'].tolist()
+            for col, (detector, scanned, total) in zip(cols, _column_map(self, '_scan_pii', cols, self.column_workers)):
+                if detector is not None:
+                    pii_cols.append(col)
+                pii_details[col] = _pii_detail(detector, scanned, total)
 
         df['Potential PII Column'] = df['Column Name'].apply(lambda x: True if x in pii_cols else None)
+        df['PII Detail'] = df['Column Name'].map(pii_details)
 
         # set FileObj attribute "PII Columns", referenced in dim_cols below
         self.pii_cols = df.loc[df['Potential PII Column'] == True, 'Column Name'].tolist()
+
+        if self.profile_sample is not None:
+            df = df.join(_sample_estimates(self.df, df, self.total_rows, self.column_stats()), on='Column Name')
         
-        return df[['Column Name', 'Clean Column Name', 'Data Type', 'Min Length|Value/Precision', 
-            'Max Length|Value/Scale', 'Potential ID Column', 'Potential PII Column', 'Nullable']]
+        return df[self.data_types_columns()]
+
+
+    def _convert_columns(self):
+        """
+        Convert the columns holding dates to date/datetime across the column workers, the formats found are kept
+        in self.date_formats as when the columns are converted one at a time
+        """
+        results = _column_map(self, '_convert_column', list(range(self.df.shape[1])), self.column_workers)
+        df = self.df.copy(deep=False)
+        for i, (new_col, date_format) in enumerate(results):
+            if new_col is not None:
+                df.isetitem(i, new_col)
+            if date_format is not None:
+                self.date_formats[df.columns[i]] = date_format
+        self.df = df
+
+
+    def _convert_column(self, i):
+        """
+        returns: tuple of the column at position i converted to date/datetime, None when it is not converted, and
+            the date format kept for its name
+        """
+        col = self.df.iloc[:, i]
+        new_col = self.convert_to_datetime(col, self.interpret_date_timestamp_errors)
+        if new_col is col:
+            return None, None
+        return new_col, self.date_formats.get(col.name)
+
+
+    def _factorize_columns(self, cols):
+        """
+        Factorize the columns not factorized yet across the column workers into self.column_stats()
+        """
+        if self.column_workers is None or not self.df.columns.is_unique:
+            return
+        column_stats = self.column_stats()
+        cols = [col for col in cols if not column_stats.is_factorized(col)]
+        column_stats.add_factorized(dict(zip(cols, _column_map(self, '_factorize_column', cols, self.column_workers))))
+
+
+    def _factorize_column(self, col):
+        return self.column_stats().factorize(col)
+
+
+    def _scan_pii(self, col):
+        """
+        returns: tuple of the PII detector matching the column, the values searched and the non NULL values
+        """
+        if re.search(PII_COL_PAT, col):
+            return 'column name', 0, 0
+        return self.pii_scanner.scan(self.df[col], self._pii_distinct(col))
+
+
+    def _pii_distinct(self, col):
+        """
+        returns: the distinct values of a text column for the PII scan when the Text_Value_Dist sheet counts them
+            anyway, None otherwise
+        """
+        if self.approximate_distinct or not self.df.columns.is_unique or _dtype_name(self.df[col].dtype) != 'object':
+            return None
+        return self.column_stats().distinct(col)
+
+
+    def data_types_columns(self):
+        """
+        returns: list of the Data_Types sheet columns, PII Detail is only included when the PII scan is sampled and
+            the estimates of the null rate and distinct values only when the profile is
+        """
+        columns = ['Column Name', 'Clean Column Name', 'Data Type', 'Min Length|Value/Precision',
+            'Max Length|Value/Scale', 'Potential ID Column', 'Potential PII Column', 'Nullable']
+        if self.pii_sample is not None:
+            columns.insert(columns.index('Potential PII Column') + 1, 'PII Detail')
+        if self.profile_sample is not None:
+            columns += ['Null Rate', 'Null Rate 95% CI', 'Distinct Values', 'Distinct Values Range', 'Estimated']
+        return columns
 
 
     def clean_column_names(self, colname_series):
@@ -279,69 +440,104 @@ class _FileObj:
         """
         self.log.info('Retrieving Text Value Distribution')
         results_dict = {}
-        pandas_numeric_dtype_list = ['int', 'int64', 'int32', 'float', 'float64', 'float32']
-        for col in self.df.columns:
-            if self.df[col].dtype in pandas_numeric_dtype_list and col not in self.id_cols:
-                results_dict[col] = pd.DataFrame(['NA for numeric columns'], columns=[col])
-            else:
-                df = pd.DataFrame(self.df[col].value_counts())
-                df.rename(index=str, column={'count':f'{col}_counts'}, inplace=True)
-                df_null = pd.DataFrame({col: len(self.df[self.df[col].isna()])}, index=['NULL'])
-                df = pd.concat([df_null, df], sort=False)
-                df.index.name = col
-                
-                results_dict[col] = df.reset_index()
+        cols = list(self.df.columns)
+        if self.approximate_distinct:
+            frames = _column_map(self, '_text_distinct_frame', cols, self.column_workers)
+        else:
+            # the counts are derived from the codes, only the factorizing is worth spreading across the workers
+            self._factorize_columns([col for col in cols if self.df[col].dtype not in NUMERIC_DTYPES
+                or col in self.id_cols])
+            frames = [self._text_distinct_frame(col) for col in cols]
+        for col, df in zip(cols, frames):
+            results_dict[col] = df
 
         distinct_text_values_df = pd.concat(results_dict.values(), axis=1, join='outer', sort=True)
-
-        distinct_text_values_df = replace_xml_illegal_characters(distinct_text_values_df)
+        if self.profile_sample is not None:
+            # the counts are of the rows sampled, not of the file
+            distinct_text_values_df.insert(0, 'Basis', _sample_basis(len(self.df), self.total_rows))
         
         # strip timezone from output because Excel does not support localized TZ info
         # return distinct_text_values_df.apply(lambda x: x.dt.tz_localize(None) if 'datetime' in str(x.dtype) else x)
         return distinct_text_values_df
     
     
+    def _text_distinct_frame(self, col):
+        """
+        returns: dataframe of the distinct values of a column and their counts for the Text_Value_Dist sheet
+        """
+        if self.df[col].dtype in NUMERIC_DTYPES and col not in self.id_cols:
+            return pd.DataFrame(['NA for numeric columns'], columns=[col])
+        if self.approximate_distinct:
+            hll = _HyperLogLog()
+            heavy_hitters = _HeavyHitters(self.top_k * HEAVY_HITTERS_FACTOR)
+            # feed the sketches a slice at a time so the counts for a slice are all that is held
+            for start in range(0, len(self.df), SKETCH_ROWS):
+                counts = _value_counts(self.df[col].iloc[start:start + SKETCH_ROWS], sort=False)
+                hll.update(counts.index)
+                heavy_hitters.merge_counts(counts)
+            return _sketch_distinct_values(col, self.column_stats().nulls(col), hll, heavy_hitters, self.top_k)
+        df = pd.DataFrame(self.column_stats().value_counts(col))
+        df.columns = [f'{col}_counts']
+        df_null = pd.DataFrame({f'{col}_counts': self.column_stats().nulls(col)}, index=['NULL'])
+        df = pd.concat([df_null, df], sort=False)
+        df.index.name = col
+        return df.reset_index()
+    
+    
     def get_numeric_value_distribution(self):
         """
         returns: dataframe of descriptive stats for numeric columns
         """
         self.log.info('Retrieving Numeric Value Distribution')
-        df = pd.DataFrame(self.df.describe()).reset_index()
+        df = pd.DataFrame(self.df.describe(percentiles=self.percentiles))
+        numeric = self._numeric_columns(df.columns)
+        if self.numeric_detail and numeric:
+            df = pd.concat([df, _shape_counts(self.df[numeric])])
+        df = df.reset_index()
         df.rename(index=str, columns={'index': 'Stat'}, inplace=True)
+        if self.profile_sample is not None:
+            df.insert(1, 'Basis', _sample_basis(len(self.df), self.total_rows))
         return df
     
     
+    def get_numeric_histogram(self):
+        """
+        returns: dataframe of the count of values in equal width bins from the minimum to the maximum of each
+            numeric column
+        """
+        self.log.info('Retrieving Numeric Histograms')
+        histograms = {col: _histogram(self.df[col].to_numpy(dtype='float64', na_value=np.nan), self.histogram_bins)
+            for col in self._numeric_columns(self.df.columns)}
+        df = _histogram_frame(histograms)
+        if self.profile_sample is not None:
+            df.insert(1, 'Basis', _sample_basis(len(self.df), self.total_rows))
+        return df
+
+
+    def _numeric_columns(self, cols):
+        """
+        returns: list of the columns of cols held as numbers, booleans and dates excluded
+        """
+        return [col for col in cols if str(self.df[col].dtype) in NUMERIC_DTYPES]
+
+
     def get_primary_keys(self):
         """
-        analyzes dataframe to see the maximum number of non-metric columns that can be part of a primary key
-        this is done by checking for columns that when grouped, retain the same number of distinct records as the
-        oringinal dataframe
-        returns: dataframe of suggested primary key(s) and dataframe of potential ID fields"""
+        finds the minimal combinations of ID and text columns whose values are distinct and not NULL in every row,
+        every column of a combination is needed for it to be unique. Rows are fingerprinted by hashing the columns
+        instead of grouping the dataframe, see keys._find_keys()
+        returns: dataframe of suggested primary key(s), one row for each column of each key
+        """
         self.log.info('Looking for Potential Primary Key(s)')
-
-        pk_1 = []
-        pk_2 = []
-        df_len = 0
-        id_cols = self.id_cols.copy()
-        dim_cols = self.dim_cols.copy()
-        for col in id_cols + dim_cols:
-            new_len = len(self.df.groupby(pk_1 + [col], sort=False).count())
-            if new_len > df_len:
-                df_len = new_len
-                pk_1.append(col)
-            else:
-                pass
-            
-        id_cols.reverse()
-        dim_cols.reverse()
-        df_len = 0
-        for col in id_cols + dim_cols:
-            if len(self.df.groupby(pk_2 + [col], sort=False).count()) < df_len:
-                pk_2.append(col)
-            else:
-                pass
-            
-        return pd.DataFrame({'Column Name': list(set(pk_1 + pk_2))})
+        keys, complete = _find_keys(self.df, self.id_cols + self.dim_cols, column_stats=self.column_stats())
+        if not complete:
+            self.log.warning(f'Not every combination of columns was checked for primary keys, at most {MAX_COMBINATIONS} '
+                'combinations of the columns with the most distinct values are checked')
+        df = _keys_frame(keys)
+        if self.profile_sample is not None:
+            # a key of the sample may have duplicates in the rows not sampled
+            df['Basis'] = _sample_basis(len(self.df), self.total_rows)
+        return df
 
     def create_sample(self):
         if self.sample_data is not None:
@@ -350,19 +546,18 @@ class _FileObj:
             return self.sample_data_export
 
     def convert_to_datetime(self, col, interpret_date_timestamp_errors):
-        if str(col.dtype) == "object":
-            try:
-                new_col = pd.to_datetime(col, errors=interpret_date_timestamp_errors, utc=False)
-                # if transformation was completely destructive, reset new_col to col
-                if new_col.count() == 0:
-                    new_col = col
-            except Exception as e:
-                self.log.error(f"Failed to cast {col.name} to date/datetime - {e}")
-                # initialize new_col
-                new_col = col
-        else:
-            new_col = col
-                    
+        """
+        Convert a text column to date/datetime when a probe of its values finds one date format, see
+        dates._convert_to_datetime(). The format found is kept for the column name in self.date_formats.
+        returns: the converted column, or col when it does not hold dates
+        """
+        try:
+            new_col, date_format = _convert_to_datetime(col, interpret_date_timestamp_errors, self.date_formats)
+        except Exception as e:
+            self.log.error(f"Failed to cast {col.name} to date/datetime - {e}")
+            return col
+        if date_format is not None:
+            self.log.debug(f'Converted {col.name} to date/datetime with format {date_format}')
         return new_col
 
 def _modify_camel_case_names(x):
@@ -378,7 +573,23 @@ def replace_xml_illegal_characters(df):
     replace characters that throw ILLEGAL_CHARACTER_ERROR in openpyxl 
     when writing to XLS(X) formats, found regex pattern in openpyxl source here: 
     https://openpyxl.readthedocs.io/en/stable/_modules/openpyxl/cell/cell.html
+    only text columns holding an illegal character are replaced, the dataframe is returned as is when there are none
     """
     ILLEGAL_CHARACTERS_RE = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
 
-    return df.replace(to_replace=ILLEGAL_CHARACTERS_RE, value='~', regex=True)
+    illegal = []
+    for i, col_dtype in enumerate(df.dtypes):
+        if col_dtype != 'object':
+            continue
+        try:
+            if df.iloc[:, i].str.contains(ILLEGAL_CHARACTERS_RE, na=False).any():
+                illegal.append(i)
+        except AttributeError:
+            # no text values in the column
+            pass
+    if not illegal:
+        return df
+    df = df.copy()
+    for i in illegal:
+        df.iloc[:, i] = df.iloc[:, i].replace(to_replace=ILLEGAL_CHARACTERS_RE, value='~', regex=True)
+    return df
@@ -0,0 +1,204 @@
+import math
+import numpy as np
+import pandas as pd
+from .compaction import _value_counts
+
+# rows read from a text file at a time while it is sampled
+SAMPLE_CHUNK_ROWS = 100000
+# fewest row groups of a Parquet file read for a sample, rows of a row group are not independent of each other
+MIN_ROW_GROUPS = 4
+# z score of the confidence intervals, 95% confidence
+CONFIDENCE_Z = 1.959963984540054
+
+
+class _Reservoir:
+    """
+    Rows chosen at random from a dataframe read one chunk at a time, only the sample is held in memory. Every row
+    is given a random key and the rows with the smallest keys are kept, which is reservoir sampling done a chunk
+    at a time instead of a row at a time. The key of a row depends only on the seed and its position, so the
+    sample is the same however the rows are split into chunks, and a sample kept and added to with rows appended
+    to the file later is the sample of the whole file.
+    """
+    def __init__(self, size, seed=0):
+        """
+        parameter: size - integer > 0, rows in the sample
+        parameter: seed - integer default 0, seed of the random keys
+        """
+        self.size = size
+        self.seed = seed
+        self.sample = None
+        self.keys = None
+        self.rows = 0
+
+    def add(self, chunk):
+        """
+        parameter: chunk - pandas DataFrame of the next rows read
+        """
+        chunk_keys = _row_keys(self.seed, self.rows, len(chunk))
+        chunk = chunk.set_axis(pd.RangeIndex(self.rows, self.rows + len(chunk)))
+        self.rows += len(chunk)
+        if self.sample is None:
+            self.sample, self.keys = chunk, chunk_keys
+        else:
+            if len(self.sample) >= self.size:
+                # only rows with a smaller key than the largest kept can enter the sample
+                entering = chunk_keys < self.keys.max()
+                chunk, chunk_keys = chunk[entering], chunk_keys[entering]
+            self.sample = pd.concat([self.sample, chunk])
+            self.keys = np.concatenate([self.keys, chunk_keys])
+        if len(self.sample) > self.size:
+            keep = np.sort(np.argpartition(self.keys, self.size)[:self.size])
+            self.sample, self.keys = self.sample.iloc[keep], self.keys[keep]
+
+    def frame(self):
+        """
+        returns: the sample, its rows in the order they were read, None when no chunk was added
+        """
+        if self.sample is None:
+            return None
+        return self.sample.reset_index(drop=True)
+
+
+def _row_keys(seed, start, count):
+    """
+    returns: array of count random numbers from 0 to 1 for the rows numbered from start, the SplitMix64 hash of the
+        seed and row number so a row gets the same key however the rows are read
+    """
+    with np.errstate(over='ignore'):
+        x = np.arange(start, start + count, dtype='uint64') + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)) * 2.0 ** -53
+
+
+def _reservoir_sample(chunks, size, seed=0):
+    """
+    Choose size rows at random from a dataframe read one chunk at a time, see _Reservoir
+    parameter: chunks - iterable of pandas DataFrames
+    parameter: size - integer > 0, rows in the sample
+    parameter: seed - integer default 0, seed of the random keys
+    returns: tuple of the sample, its rows in the order they were read, and the number of rows read. The sample
+        is None when there were no chunks
+    """
+    reservoir = _Reservoir(size, seed)
+    for chunk in chunks:
+        reservoir.add(chunk)
+    return reservoir.frame(), reservoir.rows
+
+
+def _sample_rows(df, size, seed=0):
+    """
+    returns: a copy of size rows of a dataframe chosen at random, in the order of the dataframe, every row when it
+        has no more than size rows
+    """
+    if len(df) <= size:
+        return df.copy()
+    return df.take(np.sort(np.random.default_rng(seed).choice(len(df), size, replace=False)))
+
+
+def _sample_row_groups(path_obj, size, columns=None, seed=0):
+    """
+    Choose size rows at random from a Parquet file, reading only row groups chosen at random until they hold
+    enough rows, at least MIN_ROW_GROUPS of them
+    parameter: columns - list of column names default None, all columns when None
+    returns: tuple of the sample and the number of rows in the file
+    """
+    import pyarrow
+    import pyarrow.parquet
+    parquet_file = pyarrow.parquet.ParquetFile(pyarrow.memory_map(str(path_obj)))
+    metadata = parquet_file.metadata
+    chosen = []
+    rows = 0
+    for row_group in np.random.default_rng(seed).permutation(metadata.num_row_groups):
+        if rows >= size and len(chosen) >= MIN_ROW_GROUPS:
+            break
+        chosen.append(int(row_group))
+        rows += metadata.row_group(row_group).num_rows
+    table = parquet_file.read_row_groups(sorted(chosen), columns=columns)
+    sample, _ = _reservoir_sample([table.to_pandas(split_blocks=True, self_destruct=True)], size, seed)
+    return sample, metadata.num_rows
+
+
+def _proportion_interval(count, sample_rows, total_rows, z=CONFIDENCE_Z):
+    """
+    Wilson score interval of a proportion seen in a random sample, narrowed by the finite population correction
+    so that a sample of every row gives the exact proportion
+    parameter: count - integer, rows of the sample with the property
+    parameter: sample_rows - integer, rows in the sample
+    parameter: total_rows - integer, rows the sample was chosen from
+    returns: tuple of the lower and upper bound
+    """
+    if sample_rows == 0:
+        return 0.0, 1.0
+    if total_rows > 1:
+        z *= math.sqrt(max(total_rows - sample_rows, 0) / (total_rows - 1))
+    p = count / sample_rows
+    denominator = 1 + z * z / sample_rows
+    centre = (p + z * z / (2 * sample_rows)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / sample_rows + z * z / (4 * sample_rows ** 2)) / denominator
+    return max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+def _distinct_estimate(counts, sample_rows, total_rows):
+    """
+    Estimate the distinct values of a column from the counts of the values in a random sample with the
+    Guaranteed-Error Estimator (Charikar et al.). Values seen more than once are assumed to be all the common
+    values, each value seen once stands for sqrt(total_rows / sample_rows) values. The distinct values are at
+    least those seen, and at most every value seen once standing for total_rows / sample_rows values.
+    parameter: counts - Series of the count of each value in the sample, NULL values excluded
+    returns: tuple of the estimate, lower bound and upper bound
+    """
+    seen = len(counts)
+    if sample_rows == 0 or seen == 0:
+        return 0, 0, 0
+    ratio = total_rows / sample_rows
+    singletons = int((counts == 1).sum())
+    estimate = math.sqrt(ratio) * singletons + seen - singletons
+    upper = min(singletons * ratio + seen - singletons, total_rows)
+    return round(estimate), seen, round(upper)
+
+
+def _sample_estimates(df, data_types, total_rows, column_stats=None):
+    """
+    Estimates for the Data_Types sheet of a dataframe sampled from total_rows rows
+    parameter: df - the sampled dataframe
+    parameter: data_types - the Data_Types sheet computed from df
+    parameter: column_stats - colstats._ColumnStats of df default None, the NULL and value counts are taken from it
+    returns: dataframe indexed by column name with the null rate and distinct values and their intervals, and the
+        metrics that are estimated rather than exact
+    """
+    sample_rows = len(df)
+    exact = sample_rows >= total_rows
+    results = {}
+    for col, nullable, pii in data_types[['Column Name', 'Nullable', 'Potential PII Column']].itertuples(index=False):
+        if column_stats is None:
+            nulls = int(df[col].isna().sum())
+            counts = _value_counts(df[col])
+        else:
+            nulls = int(column_stats.nulls(col))
+            counts = column_stats.value_counts(col)
+        null_low, null_high = _proportion_interval(nulls, sample_rows, total_rows)
+        distinct, distinct_low, distinct_high = _distinct_estimate(counts, sample_rows, total_rows)
+        estimated = []
+        if not exact:
+            estimated = ['Data Type', 'Min|Max']
+            # a NULL value or a PII value found in the sample is found in the file too
+            if nullable is not True:
+                estimated.append('Nullable')
+            if pii is not True:
+                estimated.append('Potential PII')
+            estimated += ['Null Rate', 'Distinct Values']
+        results[col] = {'Null Rate': nulls / sample_rows if sample_rows else None,
+            'Null Rate 95% CI': f'{null_low:.4f} - {null_high:.4f}', 'Distinct Values': distinct,
+            'Distinct Values Range': f'{distinct_low} - {distinct_high}', 'Estimated': ', '.join(estimated) or None}
+    return pd.DataFrame.from_dict(results, orient='index')
+
+
+def _sample_basis(sample_rows, total_rows):
+    """
+    returns: text describing whether the metrics of a sheet are exact or estimated from a sample
+    """
+    if sample_rows >= total_rows:
+        return 'exact'
+    return f'estimated from a random sample of {sample_rows} of {total_rows} rows'
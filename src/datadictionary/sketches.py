@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+
+# values counted by a heavy hitters summary for each value reported, more counters give tighter counts
+HEAVY_HITTERS_FACTOR = 10
+
+
+class _HyperLogLog:
+    """
+    HyperLogLog estimate of the number of distinct values in a column, in fixed memory of
+    2 ** precision one byte registers. Sketches of the same precision can be merged.
+    """
+    def __init__(self, precision=14):
+        """
+        parameter: precision - integer 4 to 18 default 14, higher is more accurate and uses more memory,
+            the relative standard error is 1.04 / sqrt(2 ** precision), 0.8% at the default
+        """
+        if not isinstance(precision, int) or not 4 <= precision <= 18:
+            raise Exception('precision must be an integer from 4 to 18.')
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype='uint8')
+
+    def update(self, values):
+        """
+        parameter: values - pandas series or index of values to add, NULL values are ignored
+        """
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        # the first bits of the hash choose the register, the rank of the first set bit in the rest is kept
+        index = (hashes >> np.uint64(64 - self.precision)).astype('int64')
+        rest = hashes << np.uint64(self.precision)
+        rank = np.minimum(65 - _bit_length(rest), 64 - self.precision + 1)
+        np.maximum.at(self.registers, index, rank.astype('uint8'))
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise Exception('Only HyperLogLog sketches of the same precision can be merged.')
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """
+        returns: estimated number of distinct values
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m ** 2 / np.sum(2.0 ** -self.registers.astype('float64'))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            # linear counting is more accurate for small cardinalities
+            return m * np.log(m / zeros)
+        return raw
+
+    def standard_error(self):
+        """
+        returns: standard error of estimate() in number of distinct values
+        """
+        return 1.04 / np.sqrt(len(self.registers)) * self.estimate()
+
+
+class _HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent values in a column, the mergeable counterpart of Space-Saving.
+    At most capacity values are counted. A reported count is never more than the true count and never
+    less than the true count minus max_error, which is at most rows / (capacity + 1).
+    """
+    def __init__(self, capacity=100):
+        """
+        parameter: capacity - integer > 0 default 100, number of values counted
+        """
+        if not isinstance(capacity, int) or capacity < 1:
+            raise Exception('capacity must be an integer > 0.')
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.max_error = 0
+        self.rows = 0
+
+    def update(self, values):
+        """
+        parameter: values - pandas series of values to add, NULL values are ignored
+        """
+        self.merge_counts(values.value_counts(sort=False))
+
+    def merge_counts(self, counts):
+        """
+        Merge exact counts of a chunk, any number of values, into the summary
+        parameter: counts - pandas series of counts indexed by value
+        """
+        self.rows += int(counts.sum())
+        if self.counts.empty:
+            combined = counts
+        else:
+            combined = pd.concat([self.counts, counts]).groupby(level=0, sort=False).sum()
+        if len(combined) > self.capacity:
+            # subtract the count of the first value that does not fit from every value and drop the rest
+            cutoff = combined.nlargest(self.capacity + 1, keep='first').iloc[-1]
+            combined = combined[combined > cutoff] - cutoff
+            self.max_error += int(cutoff)
+        self.counts = combined
+
+    def merge(self, other):
+        self.max_error += other.max_error
+        rows = self.rows + other.rows
+        self.merge_counts(other.counts)
+        self.rows = rows
+
+    def top(self, k=None):
+        """
+        parameter: k - None or integer > 0 default None, number of values to return, all counted values when None
+        returns: pandas series of counts for the most frequent values, most frequent first
+        """
+        return self.counts.sort_values(ascending=False, kind='stable').head(k)
+
+
+class _TDigest:
+    """
+    Merging t-digest of the values of a numeric column, quantiles and the cumulative distribution estimated
+    from at most about compression / 2 weighted centroids. Centroids are smallest at the tails, so extreme
+    quantiles are the most accurate. Digests can be merged in any order.
+    """
+    def __init__(self, compression=200):
+        """
+        parameter: compression - integer > 0 default 200, higher is more accurate and uses more memory
+        """
+        if not isinstance(compression, int) or compression < 1:
+            raise Exception('compression must be an integer > 0.')
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.n = 0
+        self.min_value = np.inf
+        self.max_value = -np.inf
+
+    def update(self, values):
+        """
+        parameter: values - array of numbers to add, NaN values are ignored
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.min_value = min(self.min_value, values.min())
+            self.max_value = max(self.max_value, values.max())
+            self._compress(values, np.ones(len(values)))
+
+    def merge(self, other):
+        if other.n:
+            self.min_value = min(self.min_value, other.min_value)
+            self.max_value = max(self.max_value, other.max_value)
+            self._compress(other.means, other.weights)
+
+    def _compress(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        self.n = weights.sum()
+        # the k1 scale function maps the share of values left of a centroid to its cluster, a cluster spans one
+        # unit of k, which is few values near the tails and many near the median
+        q = (np.cumsum(weights) - weights) / self.n
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cluster = np.floor(k - k[0]).astype('int64')
+        self.weights = np.bincount(cluster, weights)
+        kept = self.weights > 0
+        self.means = np.bincount(cluster, weights * means)[kept] / self.weights[kept]
+        self.weights = self.weights[kept]
+
+    def _points(self):
+        """
+        returns: tuple of arrays of values and the number of values at or below each, from the minimum through
+            the centroids to the maximum
+        """
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return (np.concatenate([[self.min_value], self.means, [self.max_value]]),
+            np.concatenate([[0], centers, [self.n]]))
+
+    def quantile(self, q):
+        """
+        returns: estimated q quantile, NaN when no values were added
+        """
+        if self.n == 0:
+            return np.nan
+        values, ranks = self._points()
+        return float(np.interp(q * self.n, ranks, values))
+
+    def cdf(self, x):
+        """
+        returns: estimated share of the values at or below each of x, an array for an array of x
+        """
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)
+        values, ranks = self._points()
+        return np.interp(x, values, ranks) / self.n
+
+
+def _sketch_distinct_values(col, nulls, hll, heavy_hitters, top_k, distinct=None):
+    """
+    Build the Text_Value_Dist columns for one column from its sketches: the NULL count and the
+    estimated number of distinct values, then the most frequent values with their counts and the
+    most each count could be short of the true count
+    parameter: col - the column name
+    parameter: nulls - the number of NULL values
+    parameter: hll - _HyperLogLog of the column
+    parameter: heavy_hitters - _HeavyHitters of the column
+    parameter: top_k - number of most frequent values to include
+    parameter: distinct - integer default None, exact number of distinct values reported in place of the estimate
+    returns: dataframe with columns col, col_counts and col_max_error
+    """
+    top = heavy_hitters.top(top_k)
+    df = pd.DataFrame({f'{col}_counts': top, f'{col}_max_error': heavy_hitters.max_error})
+    if distinct is None:
+        df_meta = pd.DataFrame({f'{col}_counts': [nulls, round(hll.estimate())],
+            f'{col}_max_error': [0, round(2 * hll.standard_error())]}, index=['NULL', 'DISTINCT (estimated)'])
+    else:
+        df_meta = pd.DataFrame({f'{col}_counts': [nulls, distinct], f'{col}_max_error': [0, 0]},
+            index=['NULL', 'DISTINCT'])
+    df = pd.concat([df_meta, df], sort=False)
+    df.index.name = col
+    return df.reset_index()
+
+
+def _bit_length(values):
+    """
+    returns: array of the number of bits needed to represent each unsigned 64 bit value
+    """
+    values = values.copy()
+    length = np.zeros(len(values), dtype='int64')
+    for shift in [32, 16, 8, 4, 2, 1]:
+        high = values >= np.uint64(1 << shift)
+        length[high] += shift
+        values[high] >>= np.uint64(shift)
+    return length + (values > 0)
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from .streaming import _StreamingFileObj, PROBE_ROWS
+from .sampling import _Reservoir
+
+# savepoint the aggregate query runs under, so its failure does not abort the transaction of the connection
+PUSHDOWN_SAVEPOINT = 'datadictionary_pushdown'
+
+
+class _QueryFileObj(_StreamingFileObj):
+    def __init__(self, connection, query, query_name, params=None, pushdown=True, max_memory_mb=256, **kwargs):
+        """
+        Create a FileObj instance that profiles the rows of a query on a DB-API 2.0 connection (sqlite3,
+        psycopg, pyodbc, oracledb and others). Rows are fetched in batches sized from the memory budget and
+        fed to the same running statistics as a streamed file, the result set is never held in memory.
+        The rows and the distinct values of each column are counted by the database.
+        parameter: connection - open DB-API connection, not closed or committed
+        parameter: query - text, a SELECT statement
+        parameter: query_name - text, used to name the profile ex. Query_Name_profile.xlsx
+        parameter: params - sequence or dict default None, parameters of the query in the paramstyle of the driver
+        parameter: pushdown - boolean default True, compute COUNT(*) and the COUNT DISTINCT of each column in the
+            database, they give exact distinct counts and single column keys where the distinct values are too
+            many to count in max_memory_mb or are sketched with approximate_distinct
+        parameter: max_memory_mb - integer > 0 default 256, memory budget for profiling the rows
+        kwargs: the _FileObj keyword arguments
+        """
+        if pushdown not in [True, False]:
+            raise Exception(f"'{pushdown}' is not a valid value for pushdown.")
+        if kwargs.get('profile_sample') is not None:
+            raise Exception('profile_sample cannot be used with a query, sample the rows in the query instead')
+        self.connection = connection
+        self.query = query
+        self.params = params
+        self.pushdown = pushdown
+        # dataframe of the distinct values of each column and the rows, None when not pushed down
+        self.pushed = None
+        super().__init__('query', max_memory_mb=max_memory_mb, dataframe_name=query_name, **kwargs)
+
+
+    def _load(self, path_obj, dataframe=None, dataframe_name=None, **kwargs):
+        """
+        Push the aggregates down to the database, then fetch the rows of the query in batches and feed each batch
+        to the accumulators
+        """
+        if kwargs:
+            raise Exception(f'{list(kwargs)} cannot be used with a query')
+        self.df_name = dataframe_name
+        try:
+            if self.pushdown:
+                self.pushed = self._push_aggregates()
+            cursor = _open_cursor(self.connection)
+            if cursor is None:
+                self.log.warning(f'{dataframe_name} is fetched with a client side cursor, which holds every row of '
+                    'the query, named cursors cannot be used on an autocommit connection')
+                cursor = self.connection.cursor()
+            try:
+                self._execute(cursor, self.query, self.params)
+                # a named psycopg2 cursor only has a description once the first rows are fetched
+                rows = cursor.fetchmany(PROBE_ROWS)
+                columns = [description[0] for description in cursor.description]
+                probe = _records_frame(rows, columns)
+                chunksize, distinct_limit = self._plan_from_probe(probe)
+                self.log.info(f'Fetching {dataframe_name} in batches of {chunksize} rows')
+                self.reservoir = None if self.sample_data is None else _Reservoir(self.sample_data)
+                self._read_chunks(_fetch_frames(cursor, columns, chunksize, probe), distinct_limit)
+            finally:
+                cursor.close()
+        except Exception as error:
+            self.accumulator = None
+            self.log.exception(f'{dataframe_name} was not read, please check the query and connection - {error}')
+            return
+
+        self.id_cols = []
+        self.dim_cols = []
+        self.path_obj = None
+        self.sample_data_export = None if self.reservoir is None else self.reservoir.frame()
+        truncated = [col for col in self.accumulator.columns if self.accumulator[col].counts_truncated]
+        if truncated:
+            self.log.warning(f'Only the {distinct_limit} most frequent values were counted for {truncated}')
+        if self.pushed is not None and self.pushed['rows'].iloc[0] != self.accumulator.rows:
+            self.log.warning(f'{dataframe_name} returned {self.accumulator.rows} rows, the database counted '
+                f'{self.pushed["rows"].iloc[0]}. The rows changed while they were read')
+
+
+    def _execute(self, cursor, statement, params=None):
+        if params is None:
+            cursor.execute(statement)
+        else:
+            cursor.execute(statement, params)
+
+
+    def _push_aggregates(self):
+        """
+        Count the rows and the distinct values of every column of the query in one aggregate query over it. The
+        NULL counts, minimum and maximum are computed from the rows as they are fetched, so they are not asked
+        for. A database that cannot count the distinct values of a column type (a BLOB or JSON column on some
+        databases) fails the whole query, the columns are then counted from the rows only. The statements run
+        under a savepoint that is rolled back on failure, so a transaction the caller has open on the connection
+        is kept. A connection without savepoints is not pushed down.
+        returns: dataframe indexed by column name, None when the database could not compute it
+        """
+        subquery = f'({self.query}) datadictionary_query'
+        cursor = self.connection.cursor()
+        try:
+            try:
+                cursor.execute(f'SAVEPOINT {PUSHDOWN_SAVEPOINT}')
+            except Exception as error:
+                self.log.warning(f'Aggregates of {self.df_name} were not pushed down, the connection does not '
+                    f'support savepoints - {error}')
+                return None
+            try:
+                self._execute(cursor, f'SELECT * FROM {subquery} WHERE 1 = 0', self.params)
+                columns = [description[0] for description in cursor.description]
+                cursor.fetchall()
+                aggregates = ['COUNT(*)'] + [f'COUNT(DISTINCT {_quote_identifier(col)})' for col in columns]
+                self._execute(cursor, f'SELECT {", ".join(aggregates)} FROM {subquery}', self.params)
+                row = cursor.fetchone()
+            except Exception as error:
+                self.log.warning(f'Aggregates of {self.df_name} could not be pushed down, they are counted from '
+                    f'the rows - {error}')
+                # a failed statement aborts the transaction on some databases, only the savepoint is undone
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {PUSHDOWN_SAVEPOINT}')
+                return None
+            finally:
+                try:
+                    cursor.execute(f'RELEASE SAVEPOINT {PUSHDOWN_SAVEPOINT}')
+                except Exception:
+                    # Oracle has no RELEASE, its savepoints end with the transaction
+                    pass
+        finally:
+            cursor.close()
+        pushed = pd.DataFrame({'distinct': row[1:]}, index=columns)
+        pushed['rows'] = row[0]
+        return pushed
+
+
+    def _source_distinct(self, col):
+        if self.pushed is None or col not in self.pushed.index:
+            return None
+        return int(self.pushed.loc[col, 'distinct'])
+
+
+def _open_cursor(connection):
+    """
+    returns: a cursor that fetches rows from the server as they are requested. psycopg cursors are client side
+        unless named, the cursors of most other drivers fetch arraysize rows at a time. None for a psycopg
+        connection in autocommit mode, where a named cursor cannot be used outside a transaction
+    """
+    if type(connection).__module__.split('.')[0] in ['psycopg', 'psycopg2']:
+        if getattr(connection, 'autocommit', False):
+            return None
+        return connection.cursor(name='datadictionary')
+    return connection.cursor()
+
+
+def _fetch_frames(cursor, columns, batch_rows, first=None):
+    """
+    returns: generator of pandas DataFrames of at most batch_rows rows fetched from an executed cursor, first
+        is yielded before them
+    """
+    if first is not None:
+        yield first
+    cursor.arraysize = batch_rows
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        yield _records_frame(rows, columns)
+
+
+def _records_frame(rows, columns):
+    # DECIMAL values are read as floats, columns of values of one type get its dtype
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    for i in range(df.shape[1]):
+        values = df.iloc[:, i]
+        # NULL is fetched as None, pandas readers give NaN
+        if values.dtype == object and values.isna().any():
+            df.isetitem(i, values.mask(values.isna(), np.nan))
+    return df.infer_objects()
+
+
+def _quote_identifier(name):
+    """
+    returns: name as an SQL delimited identifier, in double quotes as in standard SQL
+    """
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _table_query(table, columns=None):
+    """
+    returns: SELECT statement of the columns of a table, every column when columns is None. A table name with a
+        schema, schema.table, is quoted one part at a time
+    """
+    select = '*' if columns is None else ', '.join(_quote_identifier(col) for col in columns)
+    return f'SELECT {select} FROM {".".join(_quote_identifier(part) for part in table.split("."))}'
@@ -0,0 +1,338 @@
+import pandas as pd
+import numpy as np
+import re
+from .profiler import _FileObj
+from .accumulators import _ProfileAccumulator
+from .patterns import ID_COL_PAT, NUMERIC_DTYPES
+from .datatypes import _data_types_frame
+from .sketches import _sketch_distinct_values
+from .keys import _keys_frame
+from .numeric import _percentile_label, _histogram_frame
+from .columnar import _iter_columnar, _iter_arrow_csv, COLUMNAR_SUFFIXES, ARROW_CSV_KWARGS
+from .excel import _iter_excel, _excel_stream_kwargs, EXCEL_STREAM_SUFFIXES
+from .sampling import _Reservoir
+
+# number of rows read up front to estimate the memory used by each row
+PROBE_ROWS = 1000
+# rough memory used by one counted distinct value, value and count included
+DISTINCT_VALUE_BYTES = 128
+
+
+class _StreamingFileObj(_FileObj):
+    def __init__(self, path_obj, max_memory_mb=256, resume_state=None, **kwargs):
+        """
+        Create a FileObj instance that reads a text, columnar or xlsx file in chunks and profiles it with running
+        statistics instead of holding the whole file in a dataframe. Peak memory is held near max_memory_mb: half of it
+        is used for the chunk being read, the other half for the distinct values counted for each column.
+        parameter: max_memory_mb - integer > 0 default 256, memory budget for profiling the file
+        parameter: resume_state - dict default None, state from cache_state() of an earlier profile of the file,
+            only the rows after its 'offset' in bytes are read and merged into it
+        kwargs: the _FileObj keyword arguments and pandas keyword arguments to read text files, or the
+            excel.EXCEL_STREAM_KWARGS to read a sheet of an xlsx workbook
+        """
+        if not isinstance(max_memory_mb, (int, float)) or max_memory_mb <= 0:
+            raise Exception('max_memory_mb must be a number > 0.')
+        self.max_memory_mb = max_memory_mb
+        self.resume_state = resume_state
+        self.accumulator = None
+        # bytes of a text file read, the rows after it are not in the statistics. None for other files
+        self.offset = None
+        # rows chosen at random for the Sample_Data sheet, see sampling._Reservoir
+        self.reservoir = None
+        super().__init__(path_obj, **kwargs)
+
+
+    def _load(self, path_obj, dataframe=None, dataframe_name=None, **kwargs):
+        """
+        Read the file in chunks sized from the memory budget and feed each chunk to the accumulators
+        """
+        if not path_obj.is_file():
+            raise Exception(f'{path_obj.name} is not a file.  Please use a valid text or excel file')
+        if path_obj.suffix not in ['.csv', '.tsv', '.txt'] + COLUMNAR_SUFFIXES + EXCEL_STREAM_SUFFIXES:
+            raise Exception(f'{path_obj.name} cannot be streamed, only text, parquet, feather, arrow and xlsx files '
+                'are supported')
+
+        try:
+            chunksize, distinct_limit = self._plan_chunks(path_obj, **kwargs)
+            chunksize = kwargs.pop('chunksize', chunksize)
+            self.log.info(f'Streaming {path_obj.name} in chunks of {chunksize} rows')
+
+            self.reservoir = None if self.sample_data is None else _Reservoir(self.sample_data)
+            if self.resume_state is None and path_obj.suffix in COLUMNAR_SUFFIXES:
+                self._read_chunks(_iter_columnar(path_obj, chunksize, kwargs.get('columns')), distinct_limit)
+            elif self.resume_state is None and path_obj.suffix in EXCEL_STREAM_SUFFIXES:
+                self._read_chunks(_iter_excel(path_obj, chunksize, **_excel_stream_kwargs(path_obj, kwargs)),
+                    distinct_limit)
+            elif self.resume_state is None and kwargs.get('engine') == 'pyarrow':
+                with open(path_obj, 'rb') as handle:
+                    self._read_chunks(_iter_arrow_csv(path_obj, self._block_bytes(path_obj, chunksize),
+                        handle=handle, **_arrow_csv_kwargs(kwargs)), distinct_limit)
+                    # rows appended to the file while it was read may be read too, the statistics cover every byte
+                    # read until the reader reached the end of the file
+                    self.offset = handle.tell()
+            elif self.resume_state is None:
+                with open(path_obj, 'rb') as handle:
+                    with pd.read_csv(handle, chunksize=chunksize, **kwargs) as reader:
+                        self._read_chunks(reader, distinct_limit)
+                    self.offset = handle.tell()
+            else:
+                self.accumulator = self.resume_state['accumulator']
+                self.reservoir = self.resume_state['sample']
+                offset = self.resume_state['offset']
+                self.log.info(f'Streaming the {path_obj.stat().st_size - offset} bytes appended to {path_obj.name}')
+                with open(path_obj, 'rb') as handle:
+                    handle.seek(offset)
+                    # the pyarrow engine does not read in chunks, the appended rows are read by the default engine
+                    kwargs.pop('engine', None)
+                    with pd.read_csv(handle, header=None, names=self.accumulator.columns, chunksize=chunksize,
+                            **kwargs) as reader:
+                        self._read_chunks(reader, distinct_limit)
+                    self.offset = handle.tell()
+        except Exception as error:
+            self.accumulator = None
+            self.log.exception(f'{path_obj.name} was not parsed, please check file format and kwargs - {error}')
+            return
+
+        if self.accumulator is not None:
+            self.id_cols = []
+            self.dim_cols = []
+            self.path_obj = path_obj
+            self.sample_data_export = None if self.reservoir is None else self.reservoir.frame()
+            truncated = [col for col in self.accumulator.columns if self.accumulator[col].counts_truncated]
+            if truncated:
+                self.log.warning(f'{truncated} have more than {distinct_limit} distinct values, their distinct values '
+                    'and value counts are estimated')
+
+
+    def _read_chunks(self, reader, distinct_limit):
+        """
+        Feed every chunk of a reader to the accumulators and the reservoir of the rows chosen for the sample
+        """
+        for chunk in reader:
+            if self.accumulator is None:
+                self.accumulator = _ProfileAccumulator(chunk.columns, distinct_limit,
+                    self.approximate_distinct, self.top_k, self.pii_scanner)
+            if self.reservoir is not None:
+                self.reservoir.add(chunk)
+            if self.interpret_date_timestamp:
+                chunk = chunk.apply(lambda x: self.convert_to_datetime(x, self.interpret_date_timestamp_errors))
+            self.accumulator.update(chunk)
+
+
+    def cache_state(self):
+        """
+        returns: dict of the accumulated statistics, the reservoir of the sample and the offset in bytes of the end
+            of the rows read, enough to profile rows appended to the file later. None when the file is not a text
+            file whose rows can be appended to
+        """
+        if self.offset is None:
+            return None
+        return {'accumulator': self.accumulator, 'sample': self.reservoir, 'offset': self.offset}
+
+
+    def _plan_chunks(self, path_obj, **kwargs):
+        """
+        Estimate the bytes per row from the first rows of the file
+        returns: tuple of the chunk size in rows and the distinct values to count per column
+        """
+        if path_obj.suffix in COLUMNAR_SUFFIXES:
+            probe = next(_iter_columnar(path_obj, PROBE_ROWS, kwargs.get('columns')), pd.DataFrame())
+        elif path_obj.suffix in EXCEL_STREAM_SUFFIXES:
+            probe = next(_iter_excel(path_obj, PROBE_ROWS, **_excel_stream_kwargs(path_obj, kwargs)), pd.DataFrame())
+        else:
+            # the pyarrow engine does not read a number of rows, the default engine reads the probe
+            probe_kwargs = {key: value for key, value in kwargs.items() if key not in ['chunksize', 'iterator', 'engine']}
+            probe_kwargs['nrows'] = min(probe_kwargs.get('nrows') or PROBE_ROWS, PROBE_ROWS)
+            probe = pd.read_csv(path_obj, **probe_kwargs)
+        return self._plan_from_probe(probe)
+
+
+    def _plan_from_probe(self, probe):
+        """
+        Size the chunks and the distinct values counted from the memory used by the first rows of the source
+        returns: tuple of the chunk size in rows and the distinct values to count per column
+        """
+        budget = self.max_memory_mb * 2 ** 20 / 2
+        row_bytes = max(probe.memory_usage(index=False, deep=True).sum() / max(len(probe), 1), 1)
+        # parsing a chunk takes roughly twice the memory of the parsed chunk
+        chunksize = max(int(budget / (row_bytes * 2)), 1)
+        distinct_limit = max(int(budget / (max(len(probe.columns), 1) * DISTINCT_VALUE_BYTES)), 100)
+        return chunksize, distinct_limit
+
+
+    def _block_bytes(self, path_obj, chunksize):
+        """
+        returns: bytes of a text file that hold about chunksize rows, from the length of the lines in its first block
+        """
+        with open(path_obj, 'rb') as handle:
+            head = handle.read(2 ** 20)
+        line_bytes = len(head) / max(head.count(b'\n'), 1)
+        return max(int(line_bytes * chunksize), 2 ** 16)
+
+
+    def _source_distinct(self, col):
+        """
+        returns: number of distinct values of a column counted by the source of the rows, None when the source
+            does not count them and they are counted from the chunks
+        """
+        return None
+
+
+    def _estimated(self, col):
+        """
+        returns: list of the metrics of a column estimated from sketches, the distinct values counted by the source
+            are exact
+        """
+        estimated = self.accumulator[col].estimated()
+        if self._source_distinct(col) is not None:
+            estimated = [metric for metric in estimated if metric != 'Distinct Values']
+        return estimated
+
+
+    def data_types_columns(self):
+        """
+        returns: the _FileObj columns, with the distinct values of each column when the source counted them and the
+            metrics estimated from sketches when any column was sketched
+        """
+        columns = super().data_types_columns()
+        if any(self._source_distinct(col) is not None for col in self.accumulator.columns):
+            columns.append('Distinct Values')
+        if any(self._estimated(col) for col in self.accumulator.columns):
+            columns.append('Estimated')
+        return columns
+
+
+    def has_data(self):
+        return self.accumulator is not None
+
+
+    def data_shape(self):
+        return (0, 0) if self.accumulator is None else (self.accumulator.rows, len(self.accumulator.columns))
+
+
+    def get_columns(self):
+        self.log.info('Retrieving Columns')
+        return pd.DataFrame(self.accumulator.columns, columns=['Columns'])
+
+
+    def get_data_types(self):
+        """
+        method that sets values for self.id_cols and self.dim_cols from the accumulated statistics
+        returns: dataframe of column names and their data types
+        """
+        self.log.info('Retrieving Data Types')
+        df = _data_types_frame(self.accumulator.stats())
+        df['Potential ID Column'] = df['Column Name'].apply(lambda x: True if re.search(ID_COL_PAT, x) else None)
+        df['Potential PII Column'] = [True if self.accumulator[col].pii_hits else None for col in df['Column Name']]
+        df['PII Detail'] = [self.accumulator[col].pii_detail() for col in df['Column Name']]
+        df['Clean Column Name'] = self.clean_column_names(df['Column Name'])
+        if 'Distinct Values' in self.data_types_columns():
+            df['Distinct Values'] = [self._source_distinct(col) for col in df['Column Name']]
+        if 'Estimated' in self.data_types_columns():
+            df['Estimated'] = [', '.join(self._estimated(col)) or None for col in df['Column Name']]
+
+        self.id_cols = df.loc[df['Potential ID Column'] == True, 'Column Name'].tolist()
+        self.dim_cols = [col for col in self.accumulator.columns
+            if self.accumulator[col].final_dtype() == 'object' and col not in self.id_cols]
+        self.pii_cols = df.loc[df['Potential PII Column'] == True, 'Column Name'].tolist()
+
+        return df[self.data_types_columns()]
+
+
+    def get_text_distinct_values(self):
+        """
+        returns: dataframe of column names and series of distinct values
+        """
+        self.log.info('Retrieving Text Value Distribution')
+        results_dict = {}
+        for col in self.accumulator.columns:
+            acc = self.accumulator[col]
+            if acc.final_dtype() in NUMERIC_DTYPES and col not in self.id_cols:
+                results_dict[col] = pd.DataFrame(['NA for numeric columns'], columns=[col])
+            elif acc.hll is not None:
+                results_dict[col] = _sketch_distinct_values(col, acc.nulls, acc.hll, acc.heavy_hitters, self.top_k,
+                    self._source_distinct(col))
+            else:
+                df = pd.DataFrame({f'{col}_counts': acc.sorted_counts()})
+                df_null = pd.DataFrame({f'{col}_counts': acc.nulls}, index=['NULL'])
+                df = pd.concat([df_null, df], sort=False)
+                df.index.name = col
+                results_dict[col] = df.reset_index()
+
+        return pd.concat(results_dict.values(), axis=1, join='outer', sort=True)
+
+
+    def get_numeric_value_distribution(self):
+        """
+        returns: dataframe of descriptive stats for numeric columns, the same stats as pandas.DataFrame.describe()
+        """
+        self.log.info('Retrieving Numeric Value Distribution')
+        numeric_cols = [col for col in self.accumulator.columns if self.accumulator[col].final_dtype() in NUMERIC_DTYPES]
+        results_dict = {}
+        if numeric_cols:
+            stats = (['count', 'mean', 'std', 'min'] + [_percentile_label(q) for q in self.percentiles] + ['max']
+                + (['zeros', 'negatives', 'outliers'] if self.numeric_detail else []))
+            for col in numeric_cols:
+                acc = self.accumulator[col]
+                results_dict[col] = ([acc.n, acc.mean if acc.n else np.nan, acc.std(),
+                    acc.min_value if acc.n else np.nan] + [acc.quantile(q) for q in self.percentiles]
+                    + [acc.max_value if acc.n else np.nan])
+                if self.numeric_detail:
+                    results_dict[col] += [acc.zeros, acc.negatives, acc.outliers()]
+        else:
+            # describe() reports count, unique, top and freq when a dataframe has no numeric columns
+            stats = ['count', 'unique', 'top', 'freq']
+            for col in self.accumulator.columns:
+                acc = self.accumulator[col]
+                counts = acc.sorted_counts()
+                distinct = self._source_distinct(col)
+                results_dict[col] = [acc.non_null, acc.distinct() if distinct is None else distinct,
+                    counts.index[0] if len(counts) else np.nan, counts.iloc[0] if len(counts) else np.nan]
+        df = pd.DataFrame(results_dict, index=stats).reset_index()
+        df.rename(index=str, columns={'index': 'Stat'}, inplace=True)
+        return df
+
+
+    def get_numeric_histogram(self):
+        """
+        returns: dataframe of the count of values in equal width bins of each numeric column, estimated from the
+            t-digest of the columns whose distinct values were not all counted
+        """
+        self.log.info('Retrieving Numeric Histograms')
+        return _histogram_frame({col: self.accumulator[col].histogram(self.histogram_bins)
+            for col in self.accumulator.columns if self.accumulator[col].final_dtype() in NUMERIC_DTYPES})
+
+
+    def get_primary_keys(self):
+        """
+        a streamed file is not held in memory to group by combinations of columns, so only single ID or
+        dimension columns with a distinct, non NULL value in every row are suggested. With approximate_distinct
+        a column is suggested when its estimated distinct values are within two standard errors of the rows. A
+        column whose distinct values were counted by the source is suggested from that exact count.
+        returns: dataframe of suggested primary key(s)
+        """
+        self.log.info('Looking for Potential Primary Key(s)')
+        pk = []
+        for col in self.id_cols + self.dim_cols:
+            acc = self.accumulator[col]
+            distinct = self._source_distinct(col)
+            if distinct is not None:
+                if acc.nulls == 0 and distinct == self.accumulator.rows:
+                    pk.append(col)
+            elif acc.hll is not None:
+                if acc.nulls == 0 and acc.hll.estimate() + 2 * acc.hll.standard_error() >= self.accumulator.rows:
+                    pk.append(col)
+            elif acc.exact_counts() and acc.nulls == 0 and len(acc.value_counts) == self.accumulator.rows:
+                pk.append(col)
+        return _keys_frame([(col,) for col in pk])
+
+
+def _arrow_csv_kwargs(kwargs):
+    """
+    returns: the read_csv keyword arguments the Arrow CSV reader understands, raises an Exception for any others
+    """
+    unsupported = [key for key in kwargs if key not in ARROW_CSV_KWARGS]
+    if unsupported:
+        raise Exception(f'{unsupported} cannot be used to stream a text file with engine="pyarrow", '
+            f'only {ARROW_CSV_KWARGS} are supported')
+    return {key: value for key, value in kwargs.items() if key in ARROW_CSV_KWARGS}
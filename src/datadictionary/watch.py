@@ -0,0 +1,146 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from .parallel import _profile_file, SUMMARY_COLUMNS
+from .excel import _sheet_units, _unit_name
+
+
+def _file_signature(path_obj):
+    """
+    returns: tuple of the size and modification time of a file, a file whose signature changed was written to
+    """
+    stat = path_obj.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _LandingDirectory:
+    """
+    The files of a directory that are new or changed since they were queued to be profiled. A file is ready once
+    its size and modification time are the same on two polls in a row, so a file still being written or copied
+    into the directory is not read half written
+    """
+    def __init__(self, list_files):
+        """
+        parameter: list_files - callable returning the paths of the files of the directory to profile
+        """
+        self.list_files = list_files
+        # signature of each file on the last poll
+        self.seen = {}
+        # signature of each file when it was last queued, a file is queued again once it changes
+        self.queued = {}
+
+    def poll(self):
+        """
+        returns: list of tuples of the path and signature of the files ready to be profiled, they are marked as queued
+        """
+        seen = {}
+        for path_obj in self.list_files():
+            try:
+                seen[path_obj] = _file_signature(path_obj)
+            except OSError:
+                # moved or removed since it was listed
+                continue
+        ready = [(path_obj, signature) for path_obj, signature in seen.items()
+            if self.seen.get(path_obj) == signature and self.queued.get(path_obj) != signature]
+        self.seen = seen
+        # removed files are forgotten, a file landed again under the same name is profiled again
+        self.queued = {path_obj: signature for path_obj, signature in self.queued.items() if path_obj in seen}
+        self.queued.update(ready)
+        return ready
+
+
+def _watch(profiler, poll_seconds, workers=None, max_polls=None, file_callback=None, **kwargs):
+    """
+    Poll profiler.source_dir and profile the files that land in it or change into profiler.destination_dir, in this
+    process or across a pool of worker processes kept for the whole run, so each file is profiled by a process that
+    has already imported pandas. A file that fails, or a worker that dies, does not stop the others. Stops after
+    max_polls polls, or on KeyboardInterrupt once the files in progress finish.
+    parameter: profiler - ProfileData with source_dir, destination_dir and the contain or not_contain filter set
+    parameter: poll_seconds - number > 0, seconds from the start of one poll to the next
+    parameter: workers - None or integer > 0, number of processes, the files are profiled in this process when None or 1
+    parameter: max_polls - None or integer > 0, polls before returning, None to run until interrupted
+    parameter: file_callback - callable default None, called with a dict of the SUMMARY_COLUMNS of each file profiled
+    kwargs: keyword arguments passed to ProfileData._process_file
+    returns: number of files finished, profiled or not
+    """
+    log = profiler.log
+    landing = _LandingDirectory(profiler._list_files)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 else None
+    running = {}
+    finished = 0
+
+    def report(name, size, status, seconds=None, error=None):
+        nonlocal finished
+        finished += 1
+        row = dict(zip(SUMMARY_COLUMNS, [name, round(size / 2 ** 20, 3), status,
+            None if seconds is None else round(seconds, 3), error]))
+        if error is None:
+            log.info(f'{name} {status} in {seconds:.2f}s')
+        else:
+            log.error(f'{name} failed - {error}')
+        if file_callback is not None:
+            file_callback(row)
+
+    def collect(timeout):
+        # report the files finished within timeout seconds, None to wait for the next one
+        nonlocal executor
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        broken = False
+        for future in done:
+            path_obj, sheet, size = running.pop(future)
+            try:
+                status, seconds = future.result()
+                report(_unit_name(path_obj, sheet), size, status, seconds)
+            except BrokenProcessPool as error:
+                broken = True
+                report(_unit_name(path_obj, sheet), size, 'failed', error=f'worker process died - {error}')
+            except Exception as error:
+                report(_unit_name(path_obj, sheet), size, 'failed', error=str(error))
+        if broken:
+            # files still running in the broken pool fail on the next wait, new files go to a new pool
+            executor.shutdown(wait=False)
+            executor = ProcessPoolExecutor(max_workers=workers)
+
+    log.info(f'Watching {profiler.source_dir} every {poll_seconds}s, profiles are written to '
+        f'{profiler.destination_dir}')
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            next_poll = time.monotonic() + poll_seconds
+            ready = landing.poll()
+            polls += 1
+            sizes = {path_obj: signature[0] for path_obj, signature in ready}
+            units = _sheet_units([path_obj for path_obj, _ in ready], kwargs.get('sheet_name', 0))
+            if units:
+                log.info(f'{len(units)} files to profile, {len(running)} in progress')
+            for path_obj, sheet in units:
+                if executor is None:
+                    start = time.perf_counter()
+                    try:
+                        status = profiler._process_file(path_obj, sheet, **kwargs)
+                        report(_unit_name(path_obj, sheet), sizes[path_obj], status, time.perf_counter() - start)
+                    except Exception as error:
+                        report(_unit_name(path_obj, sheet), sizes[path_obj], 'failed', error=str(error))
+                else:
+                    future = executor.submit(_profile_file, path_obj, sheet, profiler.destination_dir, kwargs)
+                    running[future] = (path_obj, sheet, sizes[path_obj])
+            if max_polls is not None and polls >= max_polls:
+                break
+            while running and time.monotonic() < next_poll:
+                collect(next_poll - time.monotonic())
+            time.sleep(max(next_poll - time.monotonic(), 0))
+        while running:
+            collect(None)
+    except KeyboardInterrupt:
+        log.info(f'Stopping, waiting for the {len(running)} files in progress')
+        # files not yet started are dropped, they are queued again when the watch restarts
+        for future in list(running):
+            if future.cancel():
+                running.pop(future)
+        while running:
+            collect(None)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    log.info(f'Stopped watching {profiler.source_dir}, {finished} files finished')
+    return finished
@@ -0,0 +1,208 @@
+import importlib.util
+import json
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from .profiler import replace_xml_illegal_characters
+
+
+class _ProfileWriter:
+    """
+    Writes the sheets of a profile one at a time, each subclass writes one output format.
+    Use as a context manager: with _JsonWriter(dest_dir, stem) as writer: writer.write_sheet(name, df)
+    """
+    suffix = ''
+
+    def __init__(self, dest_dir, stem):
+        """
+        parameter: dest_dir - directory for the profile to be written
+        parameter: stem - file name of the profile without _profile and the suffix
+        """
+        self.path = dest_dir / f'{stem}_profile{self.suffix}'
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        pass
+
+    def write_sheet(self, name, df):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class _ExcelWriter(_ProfileWriter):
+    """
+    XLSX workbook written by pandas.ExcelWriter, the whole workbook is held in memory until it is closed
+    """
+    suffix = '.xlsx'
+
+    def open(self):
+        self.excel_writer = pd.ExcelWriter(self.path)
+
+    def write_sheet(self, name, df):
+        replace_xml_illegal_characters(df).to_excel(self.excel_writer, sheet_name=name, index=False)
+
+    def close(self):
+        self.excel_writer.close()
+
+
+class _StreamingExcelWriter(_ProfileWriter):
+    """
+    XLSX workbook written row by row in constant memory, with xlsxwriter when it is installed and openpyxl in
+    write only mode otherwise
+    """
+    suffix = '.xlsx'
+
+    def open(self):
+        try:
+            import xlsxwriter
+        except ImportError:
+            from openpyxl import Workbook
+            self.workbook = Workbook(write_only=True)
+            self.xlsxwriter = False
+        else:
+            self.workbook = xlsxwriter.Workbook(str(self.path), {'constant_memory': True,
+                'nan_inf_to_errors': True, 'strings_to_numbers': False, 'strings_to_formulas': False,
+                'strings_to_urls': False, 'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+            self.xlsxwriter = True
+
+    def write_sheet(self, name, df):
+        df = replace_xml_illegal_characters(df)
+        header = [_excel_value(col) for col in df.columns]
+        rows = (map(_excel_value, row) for row in df.itertuples(index=False, name=None))
+        if self.xlsxwriter:
+            worksheet = self.workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, header)
+            for number, row in enumerate(rows, 1):
+                worksheet.write_row(number, 0, list(row))
+        else:
+            worksheet = self.workbook.create_sheet(name)
+            worksheet.append(header)
+            for row in rows:
+                worksheet.append(list(row))
+
+    def close(self):
+        if self.xlsxwriter:
+            self.workbook.close()
+        else:
+            self.workbook.save(self.path)
+
+
+class _JsonWriter(_ProfileWriter):
+    """
+    One JSON object with a list of records for each sheet, NULL values are written as null and dates in ISO format
+    """
+    suffix = '.json'
+
+    def open(self):
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.file.write('{')
+        self.sheets = 0
+
+    def write_sheet(self, name, df):
+        if self.sheets:
+            self.file.write(',\n')
+        self.file.write(f'{json.dumps(name)}: ')
+        self.file.write(df.to_json(orient='records', date_format='iso', default_handler=str))
+        self.sheets += 1
+
+    def close(self):
+        self.file.write('}\n')
+        self.file.close()
+
+
+class _ParquetWriter(_ProfileWriter):
+    """
+    A directory with a Parquet file for each sheet, requires pyarrow
+    """
+    sheet_suffix = '.parquet'
+
+    def open(self):
+        if importlib.util.find_spec('pyarrow') is None:
+            raise Exception(f'output_format="{self.output_format}" requires pyarrow, install it with: pip install pyarrow')
+        self.path.mkdir(exist_ok=True)
+        # sheets of an earlier profile, Sample_Data may not be written again
+        for item in self.path.glob(f'*{self.sheet_suffix}'):
+            item.unlink()
+
+    @property
+    def output_format(self):
+        return self.sheet_suffix.strip('.')
+
+    def write_sheet(self, name, df):
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(_arrow_table(df), self.path / f'{name}{self.sheet_suffix}')
+
+
+class _ArrowWriter(_ParquetWriter):
+    """
+    A directory with an Arrow IPC (Feather version 2) file for each sheet, requires pyarrow
+    """
+    sheet_suffix = '.arrow'
+
+    def write_sheet(self, name, df):
+        import pyarrow.feather
+        pyarrow.feather.write_feather(_arrow_table(df), self.path / f'{name}{self.sheet_suffix}')
+
+
+WRITERS = {'xlsx': _ExcelWriter, 'xlsx_streaming': _StreamingExcelWriter, 'json': _JsonWriter,
+    'parquet': _ParquetWriter, 'arrow': _ArrowWriter}
+
+# names of files written by the writers, not profiled when found in a source directory
+PROFILE_SUFFIXES = tuple(dict.fromkeys(f"_profile{writer.suffix}" for writer in WRITERS.values() if writer.suffix))
+
+
+def _check_output_format(output_format):
+    if output_format not in WRITERS:
+        raise Exception(f"'{output_format}' is not a valid value for output_format, options are {list(WRITERS)}.")
+
+
+def _profile_writer(output_format, dest_dir, stem):
+    """
+    returns: _ProfileWriter for the output format
+    """
+    _check_output_format(output_format)
+    return WRITERS[output_format](dest_dir, stem)
+
+
+def _excel_value(value):
+    """
+    returns: the value as a type written to a cell, None for NULL values
+    """
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        # numpy numbers held in text columns, as the counts of the Numeric_Value_Dist sheet of a date column
+        value = value.item()
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, (str, int)):
+        return value
+    if isinstance(value, datetime):
+        # Excel does not support time zones
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return value
+    return str(value)
+
+
+def _arrow_table(df):
+    """
+    returns: pyarrow Table of the dataframe, columns mixing types (numbers and text) are written as text
+    """
+    import pyarrow
+    arrays = []
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        try:
+            arrays.append(pyarrow.Array.from_pandas(col))
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            arrays.append(pyarrow.Array.from_pandas(col.astype(str).where(col.notna(), None)))
+    return pyarrow.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
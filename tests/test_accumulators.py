@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary.accumulators import _ColumnAccumulator
+from datadictionary.sketches import _HeavyHitters, _HyperLogLog
+
+
+@pytest.fixture
+def values():
+    # a few frequent values and a long tail of rare ones
+    rng = np.random.default_rng(0)
+    return pd.Series(np.concatenate([rng.integers(0, 5, 20000), np.arange(100, 5100)])).astype(str)
+
+
+def _accumulate(series, chunk_rows=1000, **kwargs):
+    acc = _ColumnAccumulator('code', **kwargs)
+    for start in range(0, len(series), chunk_rows):
+        acc.update(series.iloc[start:start + chunk_rows])
+    return acc
+
+
+def test_exact_below_distinct_limit(values):
+    acc = _accumulate(values)
+    assert acc.exact_counts()
+    assert acc.estimated() == []
+    assert acc.distinct() == values.nunique()
+    assert acc.sorted_counts().to_dict() == values.value_counts().to_dict()
+
+
+def test_truncated_counts_are_sketched(values):
+    acc = _accumulate(values, distinct_limit=100)
+    assert acc.counts_truncated
+    assert not acc.exact_counts()
+    assert acc.estimated() == ['Distinct Values', 'Value Counts']
+    # every value seen before the truncation reached the distinct sketch
+    assert abs(acc.distinct() - values.nunique()) <= 2 * acc.hll.standard_error()
+    _check_heavy_hitters(acc.heavy_hitters, values.value_counts())
+
+
+def _check_heavy_hitters(heavy_hitters, true_counts):
+    top = heavy_hitters.top()
+    assert heavy_hitters.max_error <= true_counts.sum() / (heavy_hitters.capacity + 1)
+    for value, count in top.items():
+        assert true_counts[value] - heavy_hitters.max_error <= count <= true_counts[value]
+    # a value more frequent than the error is always kept
+    assert set(true_counts[true_counts > heavy_hitters.max_error].index) <= set(top.index)
+
+
+@pytest.mark.parametrize('capacity', [10, 50, 200])
+def test_heavy_hitters_error_bound(values, capacity):
+    heavy_hitters = _HeavyHitters(capacity)
+    for start in range(0, len(values), 700):
+        heavy_hitters.update(values.iloc[start:start + 700])
+    _check_heavy_hitters(heavy_hitters, values.value_counts())
+
+
+@pytest.mark.parametrize('distinct', [1000, 50000])
+def test_hyperloglog_error_bound(distinct):
+    hll = _HyperLogLog()
+    hll.update(pd.Index(np.arange(distinct).astype(str)))
+    assert abs(hll.estimate() - distinct) <= 3 * hll.standard_error()
+
+
+def test_merge_exact_into_sketched(values):
+    half = len(values) // 2
+    exact = _accumulate(values.iloc[:half])
+    sketched = _accumulate(values.iloc[half:], approximate_distinct=True)
+    for left, right in [(exact, sketched), (_accumulate(values.iloc[half:], approximate_distinct=True),
+            _accumulate(values.iloc[:half]))]:
+        left.merge(right)
+        assert left.value_counts is None
+        assert left.rows == len(values)
+        assert abs(left.distinct() - values.nunique()) <= 2 * left.hll.standard_error()
+        _check_heavy_hitters(left.heavy_hitters, values.value_counts())
+
+
+def test_merge_truncated(values):
+    half = len(values) // 2
+    acc = _accumulate(values.iloc[:half], distinct_limit=100)
+    acc.merge(_accumulate(values.iloc[half:]))
+    assert acc.counts_truncated
+    assert abs(acc.distinct() - values.nunique()) <= 2 * acc.hll.standard_error()
+    _check_heavy_hitters(acc.heavy_hitters, values.value_counts())
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+from datadictionary import ProfileData
+from datadictionary.cache import _ProfileCache, _options_key
+from datadictionary.streaming import _StreamingFileObj
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    source, dest = tmp_path / 'landing', tmp_path / 'profiles'
+    source.mkdir()
+    dest.mkdir()
+    pd.DataFrame({'id': range(20000), 'code': [f'c{i % 13}' for i in range(20000)]}).to_csv(source / 'feed.csv',
+        index=False)
+    return source, dest
+
+
+def _profile(source, dest):
+    summary = ProfileData().process_directory(source, dest, streaming=True, cache=True, output_format='json')
+    return summary['Status'].iloc[0]
+
+
+def _data_types(dest):
+    return pd.read_json(dest / 'feed_profile.json', typ='series')
+
+
+def test_unchanged_file_is_skipped(dirs):
+    assert _profile(*dirs) == 'profiled'
+    assert _profile(*dirs) == 'cached'
+
+
+def test_appended_rows_are_merged(dirs, tmp_path):
+    source, dest = dirs
+    assert _profile(source, dest) == 'profiled'
+    with open(source / 'feed.csv', 'a') as handle:
+        handle.writelines(f'{i},c{i % 13}\n' for i in range(20000, 20500))
+    assert _profile(source, dest) == 'appended'
+    appended = (dest / 'feed_profile.json').read_text()
+
+    full = tmp_path / 'full'
+    full.mkdir()
+    ProfileData().process_file(source / 'feed.csv', full, streaming=True, output_format='json')
+    assert appended == (full / 'feed_profile.json').read_text()
+
+
+def test_edit_before_append_is_profiled_in_full(dirs):
+    source, dest = dirs
+    assert _profile(source, dest) == 'profiled'
+    # the same size edit in the middle leaves the first and last bytes of the file as they were
+    text = (source / 'feed.csv').read_text()
+    middle = text.index('\n10000,') + 1
+    (source / 'feed.csv').write_text(text[:middle] + '9' + text[middle + 1:] + '20000,c0\n')
+    assert _profile(source, dest) == 'profiled'
+
+
+def test_cache_is_kept_out_of_dest_dir(dirs, tmp_path):
+    source, dest = dirs
+    _profile(source, dest)
+    assert [path.name for path in dest.iterdir()] == ['feed_profile.json']
+    cache_dir = tmp_path / 'cache' / 'datadictionary'
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    assert _ProfileCache(dest).path.parent == cache_dir
+
+
+def test_options_key_stable_for_functions():
+    def parse(value):
+        return value.strip()
+    key = _options_key({'converters': {'code': parse}, 'sep': ','})
+    assert 'at 0x' not in repr(key)
+    assert key == _options_key({'sep': ',', 'converters': {'code': parse}})
+    assert key != _options_key({'converters': {'code': lambda value: value}, 'sep': ','})
+
+
+def _append(path, start, stop):
+    with open(path, 'a') as handle:
+        handle.writelines(f'{i},c{i % 13}\n' for i in range(start, stop))
+
+
+def _full_profile(path, tmp_path):
+    full = tmp_path / 'full'
+    full.mkdir()
+    ProfileData().process_file(path, full, streaming=True, output_format='json')
+    return (full / 'feed_profile.json').read_text()
+
+
+def test_rows_appended_after_reading_are_profiled_next_run(dirs, tmp_path, monkeypatch):
+    source, dest = dirs
+    finish_file = ProfileData._finish_file
+
+    def append_then_finish(self, job, results_file):
+        # rows written between the end of the read and the cache entry being saved
+        _append(source / 'feed.csv', 20000, 20500)
+        return finish_file(self, job, results_file)
+    monkeypatch.setattr(ProfileData, '_finish_file', append_then_finish)
+    assert _profile(source, dest) == 'profiled'
+    monkeypatch.setattr(ProfileData, '_finish_file', finish_file)
+
+    assert _profile(source, dest) == 'appended'
+    assert (dest / 'feed_profile.json').read_text() == _full_profile(source / 'feed.csv', tmp_path)
+
+
+def test_rows_appended_while_reading_are_not_lost(dirs, tmp_path, monkeypatch):
+    source, dest = dirs
+    read_chunks = _StreamingFileObj._read_chunks
+
+    def append_while_reading(self, reader, distinct_limit):
+        def chunks():
+            for i, chunk in enumerate(reader):
+                if i == 1:
+                    _append(source / 'feed.csv', 20000, 20500)
+                yield chunk
+        return read_chunks(self, chunks(), distinct_limit)
+    monkeypatch.setattr(_StreamingFileObj, '_read_chunks', append_while_reading)
+    monkeypatch.setattr(_StreamingFileObj, '_plan_chunks', lambda self, path_obj, **kwargs: (1000, 1000))
+    assert _profile(source, dest) == 'profiled'
+    monkeypatch.undo()
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+    # whether the reader reached the appended rows or not, the next run profiles the rows it did not read
+    assert _profile(source, dest) in ['appended', 'profiled']
+    assert (dest / 'feed_profile.json').read_text() == _full_profile(source / 'feed.csv', tmp_path)
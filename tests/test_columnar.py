@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary import profiler
+from datadictionary.profiler import _FileObj
+from datadictionary.streaming import _StreamingFileObj
+
+SHEETS = ['get_data_types', 'get_text_distinct_values', 'get_numeric_value_distribution', 'get_numeric_histogram',
+    'get_primary_keys']
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    rows = 5000
+    return pd.DataFrame({'RowID': np.arange(rows), 'code': rng.choice(['a', 'b', 'c', None], rows),
+        'amount': rng.normal(100, 20, rows).round(2), 'qty': rng.integers(-5, 50, rows),
+        'sparse': np.where(rng.random(rows) < .05, rng.integers(0, 9, rows), np.nan),
+        'flag': rng.choice([True, False], rows), 'email': [f'user{i}@example.com' for i in range(rows)]})
+
+
+@pytest.fixture(params=['.parquet', '.feather'])
+def columnar(request, frame, tmp_path):
+    path = tmp_path / f'mixed{request.param}'
+    if request.param == '.parquet':
+        # several row groups, the metadata statistics are combined across them
+        frame.to_parquet(path, row_group_size=1000)
+    else:
+        frame.to_feather(path, chunksize=1000)
+    return path
+
+
+def _assert_same_sheets(left, right):
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(getattr(left, sheet)(), getattr(right, sheet)(), check_dtype=False, obj=sheet)
+
+
+@pytest.mark.parametrize('chunk_rows', [97, 10 ** 6])
+def test_streaming_same_sheets(columnar, monkeypatch, chunk_rows):
+    whole = _FileObj(columnar)
+    monkeypatch.setattr(_StreamingFileObj, '_plan_chunks', lambda self, path_obj, **kwargs: (chunk_rows, 10 ** 6))
+    _assert_same_sheets(_StreamingFileObj(columnar), whole)
+
+
+def test_metadata_same_sheets(columnar, monkeypatch):
+    with_metadata = _FileObj(columnar)
+    if columnar.suffix == '.parquet':
+        known = with_metadata.metadata_stats
+        assert known.loc['code', 'non_null'] == with_metadata.df['code'].count()
+        assert (known.loc['RowID', 'min_value'], known.loc['RowID', 'max_value']) == (0, 4999)
+        # NaN may be stored as a value of a floating point column, its count is not taken from the metadata
+        assert pd.isna(known.loc['sparse', 'non_null'])
+    monkeypatch.setattr(profiler, '_columnar_metadata', lambda path_obj, columns=None: None)
+    _assert_same_sheets(with_metadata, _FileObj(columnar))
+
+
+def test_projection(columnar):
+    projected = _FileObj(columnar, columns=['qty', 'code'])
+    assert list(projected.df.columns) == ['qty', 'code']
+    whole = _FileObj(columnar).get_data_types().set_index('Column Name')
+    data_types = projected.get_data_types().set_index('Column Name')
+    pd.testing.assert_frame_equal(data_types, whole.loc[['qty', 'code']], check_dtype=False)
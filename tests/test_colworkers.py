@@ -0,0 +1,68 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary import colworkers
+from datadictionary.profiler import _FileObj
+
+
+@pytest.fixture
+def people(tmp_path):
+    rows = 2000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'CustomerID': np.arange(rows), 'name': rng.choice(['ann', 'bob', 'cy', None], rows),
+        'email': [f'user{i}@example.com' for i in range(rows)],
+        'phone': rng.choice(['555-123-4567', '(555) 987-6543', None], rows),
+        'joined': pd.date_range('2020-01-01', periods=rows, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+        'amount': np.where(np.arange(rows) % 9 == 0, np.nan, rng.normal(100, 20, rows)),
+        'region': rng.choice(['north', 'south'], rows)})
+    path = tmp_path / 'people.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def _sheets(path, **kwargs):
+    fo = _FileObj(path, interpret_date_timestamp=True, numeric_detail=True, **kwargs)
+    return {'Data_Types': fo.get_data_types(), 'Text_Value_Dist': fo.get_text_distinct_values(),
+        'Numeric_Value_Dist': fo.get_numeric_value_distribution(), 'Numeric_Histogram': fo.get_numeric_histogram(),
+        'Potential_Primary_Keys': fo.get_primary_keys()}
+
+
+class _CountingPool:
+    """
+    Wrap an executor class of colworkers, counting the pools made
+    """
+    def __init__(self, executor):
+        self.executor = executor
+        self.pools = 0
+
+    def __call__(self, *args, **kwargs):
+        self.pools += 1
+        return self.executor(*args, **kwargs)
+
+
+@pytest.mark.parametrize('approximate_distinct', [False, True])
+@pytest.mark.parametrize('mode', ['process', 'thread'])
+def test_column_workers_give_the_same_sheets(people, monkeypatch, mode, approximate_distinct):
+    expected = _sheets(people, approximate_distinct=approximate_distinct)
+    processes = _CountingPool(colworkers.ProcessPoolExecutor)
+    threads = _CountingPool(colworkers.ThreadPoolExecutor)
+    monkeypatch.setattr(colworkers, 'ProcessPoolExecutor', processes)
+    monkeypatch.setattr(colworkers, 'ThreadPoolExecutor', threads)
+
+    # another running thread, as the reader and writer threads of a pipeline, switches the workers to threads
+    done = threading.Event()
+    other = threading.Thread(target=done.wait)
+    if mode == 'thread':
+        other.start()
+    try:
+        sheets = _sheets(people, approximate_distinct=approximate_distinct, column_workers=2)
+    finally:
+        done.set()
+        if mode == 'thread':
+            other.join()
+
+    assert (processes.pools > 0, threads.pools > 0) == ((True, False) if mode == 'process' else (False, True))
+    assert list(sheets) == list(expected)
+    for name, frame in sheets.items():
+        pd.testing.assert_frame_equal(frame, expected[name], obj=name)
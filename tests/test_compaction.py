@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary.profiler import _FileObj
+
+SHEETS = ['get_data_types', 'get_text_distinct_values', 'get_numeric_value_distribution', 'get_numeric_histogram',
+    'get_primary_keys']
+
+
+@pytest.fixture
+def orders(tmp_path):
+    rows = 6000
+    rng = np.random.default_rng(0)
+    path = tmp_path / 'orders.csv'
+    pd.DataFrame({'OrderID': np.arange(rows) + 10 ** 6,
+        'status': rng.choice(['open', 'shipped', 'returned', None], rows),
+        'reference': [f'ref-{i:06d}' if i % 11 else None for i in range(rows)],
+        'qty': rng.integers(-20, 100, rows),
+        'stock': np.where(rng.random(rows) < .1, np.nan, rng.integers(0, 40000, rows)),
+        'price': rng.normal(50, 10, rows).round(2)}).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('approximate_distinct', [False, True])
+def test_compact_same_sheets(orders, approximate_distinct):
+    whole = _FileObj(orders, numeric_detail=True, approximate_distinct=approximate_distinct)
+    compact = _FileObj(orders, numeric_detail=True, approximate_distinct=approximate_distinct, compact=True)
+    dtypes = compact.df.dtypes.astype(str).to_dict()
+    assert dtypes['status'] == 'category'
+    assert dtypes['reference'] in ['string', 'object']
+    assert dtypes['qty'] == 'int8'
+    assert dtypes['OrderID'] == 'int32'
+    # integers with NULL values are read as float and kept as they are
+    assert dtypes['stock'] == 'float64'
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(getattr(compact, sheet)(), getattr(whole, sheet)(), obj=sheet)
+
+
+def test_compact_uses_less_memory(orders):
+    whole = _FileObj(orders).df.memory_usage(deep=True).sum()
+    compact = _FileObj(orders, compact=True).df.memory_usage(deep=True).sum()
+    assert compact < whole / 2
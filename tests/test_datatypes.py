@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary.patterns import DATA_TYPE_NAMES
+from datadictionary.profiler import _FileObj
+
+COLUMNS = ['Column Name', 'Data Type', 'Min Length|Value/Precision', 'Max Length|Value/Scale', 'Nullable']
+
+
+@pytest.fixture
+def mixed():
+    rows = 1000
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'count': rng.integers(-500, 500, rows),
+        'small': rng.integers(0, 9, rows).astype('int32'),
+        'amount': np.where(np.arange(rows) % 13 == 0, np.nan, rng.normal(0, 1000, rows).round(3)),
+        'whole': np.where(np.arange(rows) % 17 == 0, np.nan, rng.integers(-99, 99999, rows)).astype('float64'),
+        'tiny': rng.random(rows).round(6) - 0.5,
+        'name': rng.choice(['ann', 'bartholomew', None, ''], rows),
+        'mixed': rng.choice(['x', 7, 2.5, None], rows),
+        'flag': rng.choice([True, False], rows),
+        'placed': pd.Series(pd.date_range('2020-01-01', periods=rows, freq='37min')).where(
+            np.arange(rows) % 11 != 0),
+        'empty': np.nan,
+        'blank_text': pd.Series([None] * rows, dtype='object')})
+
+
+def _baseline_data_types(df):
+    """
+    returns: the Data_Types columns computed one column at a time, as before the statistics were vectorized.
+        The precision of a decimal column is taken over its non NULL values, max() of lengths holding NaN returned
+        NaN or a length depending on the row of the first NULL
+    """
+    results = pd.DataFrame(df.dtypes, columns=['Data Type'])
+    results.index.name = 'Column Name'
+    results = results.reset_index()
+    for col in df.columns:
+        col_dtype = str(df[col].dtype)
+        if df[col].count() > 0:
+            if col_dtype in ['object', 'bool'] or 'datetime' in col_dtype:
+                lengths = df[col].astype('str').str.len()
+                max_value, min_value = max(lengths), min(lengths)
+            elif col_dtype in ['int', 'int64', 'int32']:
+                max_value, min_value = df[col].max(), df[col].min()
+            elif col_dtype in ['float', 'float64', 'float32']:
+                parts = df[col].dropna().astype('str').str.split('.', expand=True)
+                # precision and scale
+                min_value = max(parts[0].str.len() + parts[1].str.len())
+                max_value = max(parts[1].str.len())
+                if parts[1].fillna('0').astype('int64').sum() == 0:
+                    results.loc[results['Column Name'] == col, 'Data Type'] = 'decimal or integer'
+            else:
+                min_value = max_value = 'dtype not supported'
+        else:
+            min_value = max_value = 0
+            results.loc[results['Column Name'] == col, 'Data Type'] = 'N/A'
+        results.loc[results['Column Name'] == col, 'Min Length|Value/Precision'] = min_value
+        results.loc[results['Column Name'] == col, 'Max Length|Value/Scale'] = max_value
+        results.loc[results['Column Name'] == col, 'Nullable'] = True if df[col].isna().sum() > 0 else None
+    results['Data Type'] = results['Data Type'].astype(str).replace(to_replace=DATA_TYPE_NAMES)
+    return results[COLUMNS]
+
+
+def test_vectorized_data_types_match_baseline(mixed):
+    data_types = _FileObj('dataframe', dataframe=mixed, dataframe_name='mixed').get_data_types()[COLUMNS]
+    expected = _baseline_data_types(mixed)
+    # the baseline holds floats where the integers of other columns made the column float
+    pd.testing.assert_frame_equal(data_types.map(_number), expected.map(_number))
+
+
+def _number(value):
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+        return float(value)
+    return value
@@ -0,0 +1,54 @@
+from pathlib import Path
+import pandas as pd
+import pytest
+from datadictionary.dates import _convert_to_datetime
+
+TEST_FILE = Path(__file__).parent / 'test1.csv'
+
+
+@pytest.fixture(scope='module')
+def test1():
+    return pd.read_csv(TEST_FILE)
+
+
+@pytest.mark.parametrize('errors', ['raise', 'ignore', 'coerce'])
+@pytest.mark.parametrize('column', ['Start date ', 'date_PAID'])
+def test_two_digit_years_are_dates(test1, column, errors):
+    converted, date_format = _convert_to_datetime(test1[column], errors)
+    assert pd.api.types.is_datetime64_any_dtype(converted)
+    assert date_format is not None
+    pd.testing.assert_series_equal(converted, pd.to_datetime(test1[column]))
+
+
+@pytest.mark.parametrize('errors', ['raise', 'ignore', 'coerce'])
+def test_same_columns_converted_as_to_datetime(test1, errors):
+    # the columns pandas converts without a format, as the profiler did before formats were detected
+    for column in test1.columns:
+        converted, _ = _convert_to_datetime(test1[column], errors)
+        try:
+            expected = pd.to_datetime(test1[column], errors=errors) if test1[column].dtype == object else None
+        except (ValueError, TypeError):
+            expected = None
+        converts = (expected is not None and expected.count() > 0
+            and pd.api.types.is_datetime64_any_dtype(expected))
+        assert pd.api.types.is_datetime64_any_dtype(converted) == converts, column
+
+
+def test_abbreviated_month_names():
+    converted, _ = _convert_to_datetime(pd.Series(['10-Mar-97', '11-Apr-98', None]), 'raise')
+    assert converted.tolist()[:2] == [pd.Timestamp('1997-03-10'), pd.Timestamp('1998-04-11')]
+
+
+def test_text_is_not_converted():
+    col = pd.Series(['123 Fake Ave', 'manager@company.com', 'Canada'])
+    converted, date_format = _convert_to_datetime(col, 'raise')
+    assert converted is col
+    assert date_format is None
+
+
+def test_known_format_is_tried_first():
+    date_formats = {'when': '%Y-%m-%d'}
+    converted, date_format = _convert_to_datetime(pd.Series(['2021-01-02', '2021-03-04'], name='when'), 'raise',
+        date_formats)
+    assert date_format == '%Y-%m-%d'
+    assert converted.iloc[1] == pd.Timestamp('2021-03-04')
@@ -0,0 +1,54 @@
+import datetime
+import openpyxl
+import pandas as pd
+import pytest
+from datadictionary.excel import _iter_excel, DEFAULT_NA_VALUES
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'nulls.xlsx'
+    pd.DataFrame({'num': [1, None, 3, 4], 'txt': ['a', 'NULL', None, 'N/A'], 'mix': [1.5, 'NA', 2, None],
+        'day': [datetime.datetime(2020, 1, 1), None, datetime.datetime(2021, 1, 1), None], 'blank': [None] * 4,
+        'code': ['x', '-999', 'y', 'z']}).to_excel(path, index=False)
+    return path
+
+
+# chunks of only blank cells are concatenated as pandas warns
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+@pytest.mark.parametrize('chunk_rows', [1, 3, 10])
+def test_rows_read_as_read_excel(workbook, chunk_rows):
+    streamed = pd.concat(list(_iter_excel(workbook, chunk_rows)), ignore_index=True)
+    expected = pd.read_excel(workbook)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=chunk_rows > 3)
+
+
+def test_na_values(workbook):
+    streamed = pd.concat(list(_iter_excel(workbook, 10, na_values={'code': ['-999']})), ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, pd.read_excel(workbook, na_values={'code': ['-999']}))
+
+
+@pytest.mark.parametrize('keep_default_na', [True, False])
+def test_default_na_values(tmp_path, keep_default_na):
+    path = tmp_path / 'defaults.xlsx'
+    # every text pandas reads as NULL by default, and text close to it that is not
+    values = DEFAULT_NA_VALUES + ['n/A', 'NULLS', 'none', '#N/A ', 'value']
+    pd.DataFrame({'id': range(len(values)), 'txt': values}).to_excel(path, index=False)
+    streamed = pd.concat(list(_iter_excel(path, 10, keep_default_na=keep_default_na)), ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, pd.read_excel(path, keep_default_na=keep_default_na))
+
+
+@pytest.mark.parametrize('header', [0, None])
+def test_blank_rows(tmp_path, header):
+    path = tmp_path / 'blank_rows.xlsx'
+    workbook = openpyxl.Workbook()
+    for number, row in {3: ['a', 'b'], 4: [1, 2], 6: [3, None], 7: [None, 'x']}.items():
+        for column, value in enumerate(row, 1):
+            workbook.active.cell(number, column, value)
+    # a formatted blank cell at the end of the sheet
+    workbook.active.cell(10, 1).number_format = '0.00'
+    workbook.save(path)
+    streamed = pd.concat(list(_iter_excel(path, 2, header=header)), ignore_index=True)
+    # the blank rows before the header are skipped, pandas.read_excel reads them as data
+    expected = pd.read_excel(path, header=header, skiprows=2)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
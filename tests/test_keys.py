@@ -0,0 +1,48 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary.keys import _find_keys
+
+
+def _unique(df, key):
+    return not df.duplicated(list(key)).any()
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(0)
+    rows = 3000
+    df = pd.DataFrame({'store': rng.integers(0, 30, rows), 'day': rng.integers(0, 100, rows)})
+    df = df.drop_duplicates().reset_index(drop=True)
+    df['order_id'] = np.arange(len(df))
+    df['region'] = df['store'] % 5
+    df['store_day'] = df['store'].astype(str) + '-' + df['day'].astype(str)
+    df['note'] = rng.choice(['a', 'b', None], len(df))
+    return df
+
+
+def test_keys_are_unique_and_minimal(orders):
+    keys, complete = _find_keys(orders, list(orders.columns))
+    assert complete
+    for key in keys:
+        assert _unique(orders, key)
+        # no column of a key can be dropped
+        for size in range(1, len(key)):
+            assert not any(_unique(orders, subset) for subset in itertools.combinations(key, size))
+
+
+def test_every_minimal_key_found(orders):
+    keys, _ = _find_keys(orders, list(orders.columns))
+    found = {frozenset(key) for key in keys}
+    assert {frozenset(['order_id']), frozenset(['store_day']), frozenset(['store', 'day'])} <= found
+    # a key holding another key is not minimal
+    assert frozenset(['store', 'day', 'region']) not in found
+    # columns with NULL values are never part of a key
+    assert not any('note' in key for key in found)
+
+
+def test_screening_sample_does_not_change_keys(orders):
+    screened, _ = _find_keys(orders, list(orders.columns), screen_rows=100)
+    keys, _ = _find_keys(orders, list(orders.columns))
+    assert {frozenset(key) for key in screened} == {frozenset(key) for key in keys}
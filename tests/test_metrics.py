@@ -0,0 +1,64 @@
+import threading
+import pytest
+from datadictionary.metrics import _ProfileMetrics, _peak_rss_mb
+
+
+def test_stages_record_peak():
+    metrics = _ProfileMetrics('a.csv')
+    with metrics.stage('read'):
+        with metrics.stage('data_types'):
+            pass
+    metrics.finish()
+    if _peak_rss_mb() is not None:
+        assert all(record['peak_rss_mb'] is not None for record in metrics.records)
+
+
+@pytest.mark.skipif(_peak_rss_mb() is None, reason='peak memory is not available on this platform')
+def test_concurrent_stages_have_no_peak():
+    first, second = _ProfileMetrics('a.csv'), _ProfileMetrics('b.csv')
+    started, done = threading.Event(), threading.Event()
+
+    def profile():
+        with second.stage('read'):
+            started.set()
+            done.wait(10)
+
+    thread = threading.Thread(target=profile)
+    thread.start()
+    started.wait(10)
+    with first.stage('write'):
+        pass
+    done.set()
+    thread.join()
+    with first.stage('close'):
+        pass
+    assert [record['peak_rss_mb'] is None for record in first.records + second.records] == [True, False, True]
+
+
+def test_concurrent_stages_have_no_cpu_seconds():
+    first, second = _ProfileMetrics('a.csv'), _ProfileMetrics('b.csv')
+    started, done = threading.Event(), threading.Event()
+
+    def profile():
+        with second.stage('read'):
+            started.set()
+            done.wait(10)
+
+    thread = threading.Thread(target=profile)
+    thread.start()
+    started.wait(10)
+    with first.stage('write'):
+        pass
+    done.set()
+    thread.join()
+    with first.stage('close'):
+        pass
+    first.finish()
+    alone = _ProfileMetrics('c.csv')
+    with alone.stage('read'):
+        sum(range(10 ** 5))
+    alone.finish()
+    # the process time of a stage includes the other file's stage running in the other thread
+    assert [record['cpu_seconds'] is None for record in first.records + second.records] == [True, False, True,
+        True]
+    assert all(record['cpu_seconds'] is not None for record in alone.records)
@@ -0,0 +1,106 @@
+import logging
+import os
+import time
+import pytest
+from datadictionary import ProfileData
+from datadictionary.parallel import _run_pool
+
+log = logging.getLogger()
+
+
+@pytest.fixture
+def landing(tmp_path):
+    source = tmp_path / 'landing'
+    source.mkdir()
+    for name, rows in [('small.csv', 10), ('large.csv', 3000), ('medium.csv', 300)]:
+        (source / name).write_text('id,code\n' + ''.join(f'{i},c{i % 7}\n' for i in range(rows)))
+    return source
+
+
+def _units(source, *names):
+    return [(source / name, None) for name in names]
+
+
+def _fake_process_file(events):
+    """
+    returns: replacement of ProfileData._process_file the forked workers run, appending when each file starts and
+        ends to the events file
+    """
+    def process_file(self, path_obj, sheet=None, **kwargs):
+        with open(events, 'a') as handle:
+            handle.write(f'start {path_obj.name}\n')
+        time.sleep(0.3)
+        with open(events, 'a') as handle:
+            handle.write(f'end {path_obj.name}\n')
+        return 'profiled'
+    return process_file
+
+
+def test_largest_files_first(landing, tmp_path, monkeypatch):
+    events = tmp_path / 'events.txt'
+    monkeypatch.setattr(ProfileData, '_process_file', _fake_process_file(events))
+    summary = _run_pool(_units(landing, 'small.csv', 'large.csv', 'medium.csv'), tmp_path, 1, None, log)
+    assert summary['File'].tolist() == ['large.csv', 'medium.csv', 'small.csv']
+    assert (summary['Status'] == 'profiled').all()
+
+
+def test_memory_budget(landing, tmp_path, monkeypatch):
+    events = tmp_path / 'events.txt'
+    monkeypatch.setattr(ProfileData, '_process_file', _fake_process_file(events))
+    estimates = {'large.csv': 60, 'medium.csv': 50, 'small.csv': 40}
+    monkeypatch.setattr('datadictionary.parallel._estimate_memory_mb',
+        lambda path_obj, size, streaming=False, max_memory_mb=256: estimates[path_obj.name])
+    summary = _run_pool(_units(landing, 'small.csv', 'large.csv', 'medium.csv'), tmp_path, 3, 100, log)
+    assert (summary['Status'] == 'profiled').all()
+    lines = events.read_text().splitlines()
+    # large and small fit the budget together, medium waits for one of them to end
+    assert sorted(lines[:2]) == ['start large.csv', 'start small.csv']
+    assert lines.index('start medium.csv') > min(lines.index('end large.csv'), lines.index('end small.csv'))
+
+
+def test_worker_killed_mid_run(landing, tmp_path, monkeypatch):
+    events = tmp_path / 'events.txt'
+    process_file = _fake_process_file(events)
+
+    def kill_on_large(self, path_obj, sheet=None, **kwargs):
+        if path_obj.name == 'large.csv':
+            # the worker dies while the other files of its pool are running
+            time.sleep(0.1)
+            os._exit(1)
+        return process_file(self, path_obj, sheet, **kwargs)
+    monkeypatch.setattr(ProfileData, '_process_file', kill_on_large)
+    summary = _run_pool(_units(landing, 'small.csv', 'large.csv', 'medium.csv'), tmp_path, 3, None, log)
+    status = dict(zip(summary['File'], summary['Status']))
+    assert status == {'large.csv': 'failed', 'medium.csv': 'profiled', 'small.csv': 'profiled'}
+    error = summary.loc[summary['File'] == 'large.csv', 'Error'].iloc[0]
+    assert error.startswith('worker process died')
+
+
+def test_size_of_a_file_moved_once_profiled(landing, tmp_path, monkeypatch):
+    moved = tmp_path / 'moved'
+    moved.mkdir()
+
+    def move_away(self, path_obj, sheet=None, **kwargs):
+        path_obj.rename(moved / path_obj.name)
+        return 'profiled'
+    monkeypatch.setattr(ProfileData, '_process_file', move_away)
+    size_mb = round((landing / 'large.csv').stat().st_size / 2 ** 20, 3)
+    summary = _run_pool(_units(landing, 'large.csv', 'small.csv'), tmp_path, 2, None, log)
+    assert summary.set_index('File').loc['large.csv', 'Size MB'] == size_mb
+    assert (summary['Status'] == 'profiled').all()
+
+
+def test_size_of_a_file_moved_once_profiled_in_a_pipeline(landing, tmp_path, monkeypatch):
+    moved, dest = tmp_path / 'moved', tmp_path / 'profiles'
+    moved.mkdir()
+    dest.mkdir()
+    finish_file = ProfileData._finish_file
+
+    def move_away(self, job, results_file):
+        job['path_obj'].rename(moved / job['path_obj'].name)
+        return finish_file(self, job, results_file)
+    monkeypatch.setattr(ProfileData, '_finish_file', move_away)
+    sizes = {path_obj.name: round(path_obj.stat().st_size / 2 ** 20, 3) for path_obj in landing.iterdir()}
+    summary = ProfileData().process_directory(landing, dest, pipeline_depth=2, output_format='json')
+    assert (summary['Status'] == 'profiled').all()
+    assert dict(zip(summary['File'], summary['Size MB'])) == sizes
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary import pii, register_pii_detector, PIIDetector
+from datadictionary.patterns import PII_COL_PAT, TELEPHONE_PAT, EMAIL_PAT, STREET_ADDRESS_PAT
+from datadictionary.profiler import _FileObj
+
+
+@pytest.fixture
+def contacts():
+    rows = 3000
+    rng = np.random.default_rng(0)
+    # one value of a kind near the end of a column of otherwise harmless values
+    def hidden(value, filler):
+        values = [filler(i) for i in range(rows)]
+        values[rows - 7] = value
+        return values
+    return pd.DataFrame({'EmailAddress': [f'user{i}@example.com' for i in range(rows)],
+        'contact': hidden('(555) 123-4567', lambda i: f'desk {i % 9}'),
+        'reach': hidden('user@example.org', lambda i: f'team-{i % 5}'),
+        'location': hidden('221 Baker Street', lambda i: f'zone-{i % 4}'),
+        'phone_digits': rng.integers(10 ** 9, 10 ** 10, rows),
+        'ratio': rng.random(rows).round(4),
+        'code': rng.choice(['a', 'b', None], rows),
+        'label': [f'item{i}' for i in range(rows)],
+        'ssn_like': hidden('123-45-6789', lambda i: f'x{i}'),
+        'flag': rng.choice([True, False], rows)})
+
+
+def _baseline_pii_cols(df):
+    """
+    returns: set of the columns the per pattern loop flagged before the detectors were fused, by name, then
+        telephone numbers in any column with the non digits removed, emails in any column and street addresses
+        in text columns
+    """
+    pii_cols = [col for col in df.columns if PII_COL_PAT.search(col)]
+    remaining = [col for col in df.columns if col not in pii_cols]
+    telephone = (df[remaining].replace(to_replace=r'\D', value='', regex=True)
+        .apply(lambda x: x.astype(str).str.contains(TELEPHONE_PAT, regex=True), axis=0)).any(axis=0)
+    pii_cols += list(telephone[telephone].index)
+    remaining = [col for col in df.columns if col not in pii_cols]
+    email = df[remaining].apply(lambda x: x.astype(str).str.contains(EMAIL_PAT, regex=True), axis=0).any(axis=0)
+    pii_cols += list(email[email].index)
+    remaining = [col for col in df.columns if col not in pii_cols and df[col].dtype == 'object']
+    address = df[remaining].apply(lambda x: x.astype(str).str.contains(STREET_ADDRESS_PAT, regex=True),
+        axis=0).any(axis=0)
+    pii_cols += list(address[address].index)
+    return set(pii_cols)
+
+
+def _pii_cols(df, **kwargs):
+    data_types = _FileObj('dataframe', dataframe=df, dataframe_name='contacts', **kwargs).get_data_types()
+    return data_types.set_index('Column Name')['Potential PII Column'].eq(True)
+
+
+def test_fused_detectors_flag_the_baseline_columns(contacts):
+    flagged = _pii_cols(contacts)
+    assert set(flagged[flagged].index) == _baseline_pii_cols(contacts)
+    assert {'EmailAddress', 'contact', 'reach', 'location', 'phone_digits'} <= set(flagged[flagged].index)
+
+
+@pytest.fixture
+def ssn_detector(monkeypatch):
+    monkeypatch.setattr(pii, 'PII_DETECTORS', list(pii.PII_DETECTORS))
+    return register_pii_detector('ssn', r'\b\d{3}-\d{2}-\d{4}\b')
+
+
+def test_registered_detector(contacts, ssn_detector):
+    assert ssn_detector in pii.PII_DETECTORS
+    assert _pii_cols(contacts)['ssn_like']
+
+
+def test_detector_passed_with_pii_sample(contacts):
+    ssn = PIIDetector('ssn', r'\b\d{3}-\d{2}-\d{4}\b')
+    # the only match is not in a small sample, every value is searched when the column is sampled in full
+    frame = contacts[['ssn_like', 'label']]
+    data_types = _FileObj('dataframe', dataframe=frame, dataframe_name='contacts', pii_detectors=[ssn],
+        pii_sample=len(frame)).get_data_types().set_index('Column Name')
+    assert data_types.loc['ssn_like', 'PII Detail'] == 'ssn'
+    assert data_types.loc['ssn_like', 'Potential PII Column']
+    sampled = _FileObj('dataframe', dataframe=frame, dataframe_name='contacts', pii_detectors=[ssn],
+        pii_sample=100).get_data_types().set_index('Column Name')
+    detail = sampled.loc['label', 'PII Detail']
+    assert detail.startswith('no match in 100 of 3000 values')
+    assert not _pii_cols(contacts)['ssn_like']
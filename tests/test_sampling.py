@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary import ProfileData
+from datadictionary.sampling import _Reservoir, _reservoir_sample, _sample_rows
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'n': np.arange(10000)})
+
+
+def test_sample_rows_random_in_file_order(frame):
+    sample = _sample_rows(frame, 500)
+    assert len(sample) == 500
+    assert sample['n'].is_monotonic_increasing
+    # rows come from the whole file, not its start
+    assert sample['n'].max() > 5000
+
+
+def test_sample_rows_small_frame(frame):
+    assert _sample_rows(frame.head(10), 500).equals(frame.head(10))
+
+
+def test_reservoir_spans_chunks(frame):
+    sample, rows = _reservoir_sample([frame.iloc[i:i + 700] for i in range(0, len(frame), 700)], 300)
+    assert rows == len(frame)
+    assert len(sample) == 300
+    assert sample['n'].is_monotonic_increasing
+    assert sample['n'].nunique() == 300
+    assert sample['n'].min() < 1000 and sample['n'].max() > 9000
+
+
+def test_reservoir_independent_of_chunking(frame):
+    whole, _ = _reservoir_sample([frame], 300)
+    chunked, _ = _reservoir_sample([frame.iloc[i:i + 700] for i in range(0, len(frame), 700)], 300)
+    assert chunked['n'].tolist() == whole['n'].tolist()
+
+
+def test_empty_reservoir():
+    assert _Reservoir(10).frame() is None
+
+
+def test_every_sheet_of_a_sampled_profile_is_marked(tmp_path):
+    path = tmp_path / 'sampled.csv'
+    pd.DataFrame({'RowID': np.arange(5000), 'code': [f'c{i % 7}' for i in range(5000)],
+        'amount': np.where(np.arange(5000) % 10 == 0, np.nan, np.arange(5000) * 0.5)}).to_csv(path, index=False)
+    ProfileData().process_file(path, tmp_path, profile_sample=500, numeric_detail=True, sample_data=5)
+    sheets = pd.read_excel(tmp_path / 'sampled_profile.xlsx', sheet_name=None)
+    basis = 'estimated from a random sample of 500 of 5000 rows'
+
+    data_types = sheets.pop('Data_Types')
+    assert data_types['Null Rate 95% CI'].notna().all()
+    assert data_types['Distinct Values Range'].notna().all()
+    assert data_types['Estimated'].str.contains('Null Rate, Distinct Values').all()
+    # the rows of the sample are not metrics
+    sheets.pop('Sample_Data')
+    assert sorted(sheets) == ['Numeric_Histogram', 'Numeric_Value_Dist', 'Potential_Primary_Keys', 'Text_Value_Dist']
+    for name, sheet in sheets.items():
+        assert (sheet['Basis'] == basis).all(), name
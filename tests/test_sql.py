@@ -0,0 +1,121 @@
+import sqlite3
+import pandas as pd
+import pytest
+from datadictionary import ProfileData
+from datadictionary.sql import _QueryFileObj
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    frame = pd.DataFrame({'id': range(1000), 'code': [f'c{i % 7}' for i in range(1000)],
+        'amount': [i / 4 if i % 10 else None for i in range(1000)]})
+    frame.to_sql('sales', connection, index=False)
+    yield connection
+    connection.close()
+
+
+def test_pushdown_counts_distinct(connection):
+    fileobj = _QueryFileObj(connection, 'SELECT * FROM sales', 'sales')
+    assert fileobj.pushed['rows'].iloc[0] == 1000
+    assert fileobj.pushed['distinct'].to_dict() == {'id': 1000, 'code': 7, 'amount': 900}
+    types = fileobj.get_data_types().set_index('Column Name')
+    assert types['Distinct Values'].to_dict() == {'id': 1000, 'code': 7, 'amount': 900}
+
+
+def test_pushdown_same_profile(connection):
+    pushed = _QueryFileObj(connection, 'SELECT * FROM sales', 'sales')
+    fetched = _QueryFileObj(connection, 'SELECT * FROM sales', 'sales', pushdown=False)
+    assert fetched.pushed is None
+    pd.testing.assert_frame_equal(pushed.get_data_types().drop(columns='Distinct Values'),
+        fetched.get_data_types())
+    pd.testing.assert_frame_equal(pushed.get_numeric_value_distribution(), fetched.get_numeric_value_distribution())
+
+
+def test_primary_key_from_pushdown(connection):
+    # a budget too small to count the id values still finds the key from the database count
+    fileobj = _QueryFileObj(connection, 'SELECT * FROM sales', 'sales', max_memory_mb=0.05)
+    assert fileobj.accumulator['id'].counts_truncated
+    fileobj.get_data_types()
+    assert fileobj.get_primary_keys()['Column Name'].tolist() == ['id']
+
+
+def test_failed_pushdown_keeps_transaction(connection):
+    connection.execute('INSERT INTO sales VALUES (1000, ?, 1.0)', ('c0',))
+    assert connection.in_transaction
+    # the trailing comment breaks the aggregate query wrapped around the query, the query itself still runs
+    fileobj = _QueryFileObj(connection, 'SELECT id, code FROM sales -- all rows', 'sales')
+    assert fileobj.pushed is None
+    assert fileobj.accumulator.rows == 1001
+    assert connection.in_transaction
+    assert connection.execute('SELECT COUNT(*) FROM sales').fetchone()[0] == 1001
+
+
+def test_process_table(connection, tmp_path):
+    ProfileData().process_table(connection, 'sales', tmp_path, output_format='json', columns=['id', 'code'])
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+
+
+def test_null_is_nan(connection):
+    connection.execute('CREATE TABLE notes (note TEXT, empty TEXT)')
+    connection.executemany('INSERT INTO notes VALUES (?, NULL)', [('a',), (None,), ('b',)])
+    fileobj = _QueryFileObj(connection, 'SELECT * FROM notes', 'notes', pushdown=False, sample_data=10)
+    sample = fileobj.create_sample()
+    assert sample['note'].isna().tolist() == [False, True, False]
+    assert sample['note'].iloc[1] is not None
+    assert sample['empty'].dtype == 'float64'
+
+
+class _NamedCursor:
+    """
+    sqlite3 cursor acting as a named psycopg2 cursor, which has no description until rows are fetched
+    """
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.fetched = False
+        self.arraysize = 1
+
+    @property
+    def description(self):
+        return self.cursor.description if self.fetched else None
+
+    def execute(self, *args):
+        self.cursor.execute(*args)
+
+    def fetchmany(self, size):
+        self.fetched = True
+        return self.cursor.fetchmany(size)
+
+    def close(self):
+        self.cursor.close()
+
+
+class _Psycopg2Connection:
+    """
+    sqlite3 connection named like a psycopg2 connection, named cursors fail in autocommit mode as in psycopg2
+    """
+    __module__ = 'psycopg2.extensions'
+
+    def __init__(self, connection, autocommit=False):
+        self.connection = connection
+        self.autocommit = autocommit
+        self.named = 0
+
+    def cursor(self, name=None):
+        if name is None:
+            return self.connection.cursor()
+        if self.autocommit:
+            raise Exception('can\'t use a named cursor outside of transactions')
+        self.named += 1
+        return _NamedCursor(self.connection.cursor())
+
+
+@pytest.mark.parametrize('autocommit', [False, True])
+def test_psycopg2_cursor(connection, autocommit):
+    expected = _QueryFileObj(connection, 'SELECT * FROM sales', 'sales', pushdown=False).get_data_types()
+    wrapped = _Psycopg2Connection(connection, autocommit)
+    fileobj = _QueryFileObj(wrapped, 'SELECT * FROM sales', 'sales', pushdown=False)
+    assert fileobj.accumulator.rows == 1000
+    assert wrapped.named == (0 if autocommit else 1)
+    pd.testing.assert_frame_equal(fileobj.get_data_types(), expected)
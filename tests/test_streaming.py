@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from datadictionary.profiler import _FileObj
+from datadictionary.streaming import _StreamingFileObj
+
+SHEETS = ['get_data_types', 'get_text_distinct_values', 'get_numeric_value_distribution', 'get_numeric_histogram',
+    'get_primary_keys']
+
+
+@pytest.fixture
+def mixed(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 5000
+    df = pd.DataFrame({'RowID': np.arange(rows), 'code': rng.choice(['a', 'b', 'c', None], rows),
+        'amount': rng.normal(100, 20, rows).round(2), 'qty': rng.integers(-5, 50, rows),
+        'sparse': np.where(rng.random(rows) < .05, rng.integers(0, 9, rows), np.nan),
+        'flag': rng.choice([True, False], rows), 'email': [f'user{i}@example.com' for i in range(rows)],
+        'empty': np.nan})
+    # a chunk with no value in a column reads it as float, later chunks as int
+    df.loc[:999, 'qty'] = np.nan
+    path = tmp_path / 'mixed.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(params=[97, 1000, 10 ** 6])
+def chunk_rows(request, monkeypatch):
+    monkeypatch.setattr(_StreamingFileObj, '_plan_chunks', lambda self, path_obj, **kwargs: (request.param, 10 ** 6))
+    return request.param
+
+
+@pytest.mark.parametrize('name', ['mixed', 'test1'])
+def test_streaming_same_sheets(name, mixed, chunk_rows):
+    path = mixed if name == 'mixed' else Path(__file__).parent / 'test1.csv'
+    whole, streamed = _FileObj(path), _StreamingFileObj(path)
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(getattr(streamed, sheet)(), getattr(whole, sheet)(), check_dtype=False,
+            obj=sheet)
+
+
+def test_streaming_same_dates(chunk_rows):
+    path = Path(__file__).parent / 'test1.csv'
+    whole = _FileObj(path, interpret_date_timestamp=True)
+    streamed = _StreamingFileObj(path, interpret_date_timestamp=True)
+    pd.testing.assert_frame_equal(streamed.get_data_types(), whole.get_data_types(), check_dtype=False)
+
+
+def test_truncated_columns_marked(mixed, monkeypatch):
+    monkeypatch.setattr(_StreamingFileObj, '_plan_chunks', lambda self, path_obj, **kwargs: (500, 100))
+    streamed = _StreamingFileObj(mixed)
+    estimated = streamed.get_data_types().set_index('Column Name')['Estimated']
+    assert estimated['RowID'] == 'Distinct Values, Value Counts, Quantiles'
+    assert estimated['email'] == 'Distinct Values, Value Counts'
+    assert pd.isna(estimated['code'])
+    text = streamed.get_text_distinct_values()
+    assert 'email_max_error' in text.columns
+    assert text['email'].iloc[1] == 'DISTINCT (estimated)'
+    # unique columns are still suggested as keys from their estimated distinct values
+    assert streamed.get_primary_keys()['Column Name'].tolist() == ['RowID', 'email']
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from datadictionary import ProfileData
+from datadictionary.profiler import _FileObj
+
+PROFILE_KWARGS = {'interpret_date_timestamp': True, 'numeric_detail': True, 'sample_data': 20}
+
+
+@pytest.fixture
+def orders(tmp_path):
+    rows = 300
+    path = tmp_path / 'orders.csv'
+    # \x01 cannot be written to an XLSX file
+    pd.DataFrame({'OrderID': np.arange(rows), 'note': [f'a\x01b{i % 5}' if i % 3 else None for i in range(rows)],
+        'placed': pd.date_range('2021-01-01', periods=rows, freq='D').strftime('%Y-%m-%d'),
+        'amount': np.where(np.arange(rows) % 7 == 0, np.nan, np.arange(rows) * 1.5),
+        'qty': np.arange(rows) % 4}).to_csv(path, index=False)
+    return path
+
+
+def _write(path, dest, output_format):
+    dest.mkdir()
+    ProfileData().process_file(path, dest, output_format=output_format, **PROFILE_KWARGS)
+    return dest / f'{path.stem}_profile'
+
+
+def _cell(value):
+    """
+    returns: the value as it reads back from any output format, dates in ISO format and numbers as floats, numbers
+        and booleans of columns mixing types are written as text
+    """
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, (datetime, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return pd.Timestamp(value).isoformat()
+        except ValueError:
+            return value
+    return float(value)
+
+
+def _normalized(df):
+    return df.reset_index(drop=True).map(_cell)
+
+
+def test_streaming_excel_matches_excel(orders, tmp_path):
+    excel = pd.read_excel(_write(orders, tmp_path / 'xlsx', 'xlsx').with_suffix('.xlsx'), sheet_name=None)
+    streamed = pd.read_excel(_write(orders, tmp_path / 'streamed', 'xlsx_streaming').with_suffix('.xlsx'),
+        sheet_name=None)
+    assert list(streamed) == list(excel)
+    for name, sheet in excel.items():
+        pd.testing.assert_frame_equal(streamed[name], sheet, obj=name)
+    assert 'a~b1' in excel['Text_Value_Dist']['note'].tolist()
+
+
+@pytest.mark.parametrize('output_format', ['json', 'parquet', 'arrow'])
+def test_sheets_round_trip(orders, tmp_path, output_format):
+    sheets = dict(ProfileData()._profile_sheets(_FileObj(orders, **PROFILE_KWARGS)))
+    profile = _write(orders, tmp_path / output_format, output_format)
+    if output_format == 'json':
+        records = json.loads(profile.with_suffix('.json').read_text())
+        written = {name: pd.DataFrame(rows, columns=sheets[name].columns) for name, rows in records.items()}
+    else:
+        read = pd.read_parquet if output_format == 'parquet' else pd.read_feather
+        written = {item.stem: read(item) for item in sorted(profile.iterdir())}
+    assert sorted(written) == sorted(sheets)
+    for name, sheet in sheets.items():
+        assert list(written[name].columns) == list(sheet.columns), name
+        pd.testing.assert_frame_equal(_normalized(written[name]), _normalized(sheet), obj=name)
+    # only XLSX files cannot hold control characters
+    assert 'a\x01b1' in written['Text_Value_Dist']['note'].tolist()